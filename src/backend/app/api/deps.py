@@ -0,0 +1,187 @@
+"""Shared API dependencies -- tenant (business) ownership and public slug resolution.
+
+get_owned_business replaces the per-router _get_owned_business helpers:
+
+- Ownership is checked against the cached principal first; a business the
+  principal does not list is confirmed against the database before the
+  404, since the principal may predate a recent create or transfer.
+- The Business row is memoized per request by FastAPI's dependency cache
+  and, when BUSINESS_CACHE_ENABLED, cached across requests (in-process LRU,
+  then Redis). Cache keys carry the row version (updated_at) taken from
+  the principal, so update_business/delete_business invalidate by bumping
+  the version -- stale rows are never read, they just expire.
+
+get_public_business resolves the slug of the public booking pages. Slugs
+carry no version, so those entries (keyed by slug, active businesses only)
+expire after PUBLIC_CACHE_TTL_SECONDS and are dropped after commit by
+invalidate_public_business() when the business changes.
+
+The returned Business is detached when it comes from the cache: handlers
+may read it and pass it to services, but must re-load it to modify it.
+"""
+
+import json
+import logging
+from datetime import datetime
+
+from fastapi import Depends, HTTPException, Request
+from sqlalchemy import DateTime, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
+
+from app.core.cache import LocalTTLCache, get_redis, invalidate_after_commit, wait_for_invalidation
+from app.core.config import get_settings
+from app.core.database import get_db
+from app.core.principal import Principal, business_version, evict_principal
+from app.core.security import get_current_principal
+from app.models.business import Business
+from app.services.public_catalog import invalidate_public_catalog
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Credentials stay out of the cache; reading them from a cached Business
+# raises instead of silently returning None
+UNCACHED_BUSINESS_FIELDS = frozenset({"anaf_oauth_token"})
+
+_local_businesses = LocalTTLCache(
+    max_entries=settings.BUSINESS_CACHE_LOCAL_MAX_ENTRIES,
+    ttl_seconds=settings.BUSINESS_CACHE_TTL_SECONDS,
+)
+
+# Slug entries are not versioned: the short local TTL bounds how long other
+# worker processes keep serving a business after it changes
+_local_public_businesses = LocalTTLCache(
+    max_entries=settings.PUBLIC_CACHE_LOCAL_MAX_ENTRIES,
+    ttl_seconds=settings.PUBLIC_CACHE_LOCAL_TTL_SECONDS,
+)
+
+
+def business_cache_key(business_id: int, version: str) -> str:
+    return f"business:{business_id}:{version}"
+
+
+def public_business_key(slug: str) -> str:
+    return f"business_slug:{slug}"
+
+
+def invalidate_public_business(db: AsyncSession, biz: Business) -> None:
+    """Drop the cached slug resolution and booking bootstrap of a business after commit."""
+    invalidate_after_commit(db, public_business_key(biz.slug))
+    invalidate_public_catalog(db, biz.id)
+
+
+def _snapshot(biz: Business) -> dict:
+    snapshot = {}
+    for column in Business.__table__.columns:
+        if column.key in UNCACHED_BUSINESS_FIELDS:
+            continue
+        value = getattr(biz, column.key)
+        snapshot[column.key] = value.isoformat() if isinstance(value, datetime) else value
+    return snapshot
+
+
+def _from_snapshot(snapshot: dict) -> Business:
+    values = dict(snapshot)
+    for column in Business.__table__.columns:
+        if isinstance(column.type, DateTime) and values.get(column.key):
+            values[column.key] = datetime.fromisoformat(values[column.key])
+    biz = Business(**values)
+    make_transient_to_detached(biz)
+    return biz
+
+
+async def _read_cached(key: str, local_cache: LocalTTLCache) -> dict | None:
+    snapshot = local_cache.get(key)
+    if snapshot is not None:
+        return snapshot
+    redis = get_redis()
+    if redis is None:
+        return None
+    await wait_for_invalidation(key)
+    try:
+        raw = await redis.get(key)
+    except Exception as cache_error:
+        logger.warning("Business cache read failed: %s", cache_error)
+        return None
+    if not raw:
+        return None
+    snapshot = json.loads(raw)
+    local_cache.set(key, snapshot)
+    return snapshot
+
+
+async def _write_cached(key: str, snapshot: dict, local_cache: LocalTTLCache, ttl_seconds: int) -> None:
+    local_cache.set(key, snapshot)
+    redis = get_redis()
+    if redis is None:
+        return
+    try:
+        await redis.set(key, json.dumps(snapshot), ex=ttl_seconds)
+    except Exception as cache_error:
+        logger.warning("Business cache write failed: %s", cache_error)
+
+
+async def _load_owned_business(db: AsyncSession, business_id: int, user_id: int) -> Business:
+    result = await db.execute(
+        select(Business).where(Business.id == business_id, Business.owner_id == user_id)
+    )
+    biz = result.scalar_one_or_none()
+    if not biz:
+        raise HTTPException(status_code=404, detail="Afacere negasita")
+    return biz
+
+
+async def get_owned_business(
+    business_id: int,
+    request: Request,
+    principal: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db),
+) -> Business:
+    """Resolve the business from the path and require that the current user owns it."""
+    # Tenant context for logging/metrics
+    request.state.business_id = business_id
+
+    if not principal.owns(business_id):
+        # The principal may predate a business created or transferred through
+        # another process: only that process evicts its local copy, the others
+        # keep theirs for PRINCIPAL_LOCAL_TTL_SECONDS. Ask the database before
+        # rejecting, and drop the stale principal when it was wrong.
+        biz = await _load_owned_business(db, business_id, principal.user.id)
+        await evict_principal(principal.user.id)
+        return biz
+
+    version = principal.business_versions[business_id]
+    key = business_cache_key(business_id, version)
+    if settings.BUSINESS_CACHE_ENABLED:
+        snapshot = await _read_cached(key, _local_businesses)
+        if snapshot is not None:
+            return _from_snapshot(snapshot)
+
+    biz = await _load_owned_business(db, business_id, principal.user.id)
+
+    # Only cache under the version the principal expects; a newer row is
+    # cached once the principal itself has been refreshed
+    if settings.BUSINESS_CACHE_ENABLED and business_version(biz.updated_at) == version:
+        await _write_cached(key, _snapshot(biz), _local_businesses, settings.BUSINESS_CACHE_TTL_SECONDS)
+    return biz
+
+
+async def get_public_business(slug: str, db: AsyncSession = Depends(get_db)) -> Business:
+    """Resolve an active business by its public slug (no auth)."""
+    key = public_business_key(slug)
+    if settings.PUBLIC_CACHE_ENABLED:
+        snapshot = await _read_cached(key, _local_public_businesses)
+        if snapshot is not None:
+            return _from_snapshot(snapshot)
+
+    result = await db.execute(
+        select(Business).where(Business.slug == slug, Business.is_active == True)
+    )
+    biz = result.scalar_one_or_none()
+    if not biz:
+        raise HTTPException(status_code=404, detail="Afacere negasita")
+
+    if settings.PUBLIC_CACHE_ENABLED:
+        await _write_cached(key, _snapshot(biz), _local_public_businesses, settings.PUBLIC_CACHE_TTL_SECONDS)
+    return biz
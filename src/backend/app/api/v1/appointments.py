@@ -1,75 +1,100 @@
 """Appointment CRUD + availability + conflict detection."""
 
-from datetime import datetime, timedelta, timezone
+import base64
+from datetime import date as date_type, datetime, timedelta, timezone
+from typing import Literal
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import and_, select
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import select, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.deps import get_owned_business
 from app.core.database import get_db
-from app.core.security import get_current_user
 from app.models.appointment import Appointment
 from app.models.business import Business
 from app.models.client import Client
 from app.models.employee import Employee
 from app.models.service import Service
-from app.models.user import User
 from app.schemas.appointment import (
     AppointmentCancel,
     AppointmentCreate,
     AppointmentResponse,
+    AppointmentCalendarEvent,
+    AppointmentStatus,
     AppointmentUpdate,
     AvailabilityResponse,
-    TimeSlot,
+    CalendarViewResponse,
+    MultiEmployeeAvailabilityResponse,
 )
+from app.services.availability import (
+    MAX_RANGE_DAYS,
+    get_day_slots,
+    get_team_availability,
+    invalidate_employee_days,
+)
+from app.services.booking import BookingConflictError, flush_booking, has_external_block
+
+SLOT_CONFLICT_DETAIL = "Conflict de programare - interval ocupat"
+
+# Fallback calendar color (matches the Employee/Service column default)
+DEFAULT_CALENDAR_COLOR = "#2563eb"
+
+# Page size for list_appointments (keyset pagination)
+LIST_DEFAULT_LIMIT = 1000
+LIST_MAX_LIMIT = 5000
 
 router = APIRouter()
 
 
-async def _get_owned_business(business_id: int, user: User, db: AsyncSession) -> Business:
-    result = await db.execute(
-        select(Business).where(Business.id == business_id, Business.owner_id == user.id)
-    )
-    biz = result.scalar_one_or_none()
-    if not biz:
-        raise HTTPException(status_code=404, detail="Afacere negasita")
-    return biz
-
-
-async def _check_conflict(
-    db: AsyncSession,
-    employee_id: int,
-    start: datetime,
-    end: datetime,
-    exclude_id: int | None = None,
-) -> bool:
-    """Check if employee has overlapping appointments."""
-    query = select(Appointment).where(
-        and_(
-            Appointment.employee_id == employee_id,
-            Appointment.status.in_(["pending", "confirmed", "in_progress"]),
-            Appointment.start_time < end,
-            Appointment.end_time > start,
-        )
-    )
-    if exclude_id:
-        query = query.where(Appointment.id != exclude_id)
-    result = await db.execute(query)
-    return result.scalar_one_or_none() is not None
+def _encode_cursor(start_time: datetime, appointment_id: int) -> str:
+    raw = f"{start_time.isoformat()}|{appointment_id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+        start_raw, id_raw = raw.rsplit("|", 1)
+        return datetime.fromisoformat(start_raw), int(id_raw)
+    except (ValueError, UnicodeError):
+        raise HTTPException(status_code=400, detail="Cursor de paginare invalid")
 
 
 @router.get("/", response_model=list[AppointmentResponse])
 async def list_appointments(
     business_id: int,
+    response: Response,
     date_from: str | None = Query(None, description="YYYY-MM-DD"),
     date_to: str | None = Query(None, description="YYYY-MM-DD"),
     employee_id: int | None = Query(None),
     status: str | None = Query(None),
-    user: User = Depends(get_current_user),
+    limit: int = Query(LIST_DEFAULT_LIMIT, ge=1, le=LIST_MAX_LIMIT),
+    cursor: str | None = Query(None, description="Value of X-Next-Cursor from the previous page"),
+    biz: Business = Depends(get_owned_business),
     db: AsyncSession = Depends(get_db),
 ):
-    await _get_owned_business(business_id, user, db)
-    query = select(Appointment).where(Appointment.business_id == business_id)
+    """List appointments ordered by (start_time, id) with keyset pagination.
+
+    Employee, service and client names are resolved with outer joins in the
+    same query. When more rows exist, the X-Next-Cursor response header holds
+    the cursor for the next page.
+    """
+    query = (
+        select(
+            Appointment,
+            Employee.display_name.label("employee_display_name"),
+            Employee.full_name.label("employee_full_name"),
+            Employee.color.label("employee_color"),
+            Service.name.label("service_name"),
+            Service.color.label("service_color"),
+            Client.full_name.label("client_full_name"),
+            Client.phone.label("client_phone"),
+        )
+        .outerjoin(Employee, Appointment.employee_id == Employee.id)
+        .outerjoin(Service, Appointment.service_id == Service.id)
+        .outerjoin(Client, Appointment.client_id == Client.id)
+        .where(Appointment.business_id == business_id)
+    )
 
     if date_from:
         query = query.where(Appointment.start_time >= datetime.fromisoformat(date_from))
@@ -80,39 +105,144 @@ async def list_appointments(
         query = query.where(Appointment.employee_id == employee_id)
     if status:
         query = query.where(Appointment.status == status)
+    if cursor:
+        cursor_start, cursor_id = _decode_cursor(cursor)
+        query = query.where(tuple_(Appointment.start_time, Appointment.id) > (cursor_start, cursor_id))
 
-    query = query.order_by(Appointment.start_time)
+    # Fetch one extra row to know whether another page exists
+    query = query.order_by(Appointment.start_time, Appointment.id).limit(limit + 1)
     result = await db.execute(query)
-    appointments = result.scalars().all()
-
-    # Enrich with names
-    response = []
-    for apt in appointments:
-        data = AppointmentResponse.model_validate(apt)
-        # Load related names
-        emp = await db.get(Employee, apt.employee_id)
-        svc = await db.get(Service, apt.service_id)
-        data.employee_name = emp.display_name or emp.full_name if emp else None
-        data.service_name = svc.name if svc else None
-        if apt.client_id:
-            cli = await db.get(Client, apt.client_id)
-            data.client_name = cli.full_name if cli else apt.walk_in_name
+    rows = result.all()
+
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1].Appointment
+        response.headers["X-Next-Cursor"] = _encode_cursor(last.start_time, last.id)
+
+    items = []
+    for row in rows:
+        data = AppointmentResponse.model_validate(row.Appointment)
+        data.employee_name = row.employee_display_name or row.employee_full_name
+        data.employee_color = row.employee_color
+        data.service_name = row.service_name
+        data.service_color = row.service_color
+        data.client_name = row.client_full_name or row.Appointment.walk_in_name
+        data.client_phone = row.client_phone or row.Appointment.walk_in_phone
+        items.append(data)
+
+    return items
+
+
+def _calendar_range(view: str, center: date_type) -> tuple[date_type, date_type]:
+    """Return the [first, last] days shown by a day/week/month view."""
+    if view == "day":
+        return center, center
+    if view == "week":
+        week_start = center - timedelta(days=center.weekday())  # Monday
+        return week_start, week_start + timedelta(days=6)
+    month_start = center.replace(day=1)
+    next_month = (month_start + timedelta(days=32)).replace(day=1)
+    return month_start, next_month - timedelta(days=1)
+
+
+@router.get("/calendar", response_model=CalendarViewResponse)
+async def get_calendar_view(
+    business_id: int,
+    date: str = Query(..., description="Center date YYYY-MM-DD"),
+    view: Literal["day", "week", "month"] = Query("week"),
+    employee_ids: list[int] | None = Query(None, description="None = all employees"),
+    statuses: list[AppointmentStatus] | None = Query(None, description="None = all statuses"),
+    biz: Business = Depends(get_owned_business),
+    db: AsyncSession = Depends(get_db),
+):
+    """Calendar events for a day/week/month view.
+
+    Selects only the columns the calendar renders (no ORM entities are
+    hydrated) and serializes rows straight into AppointmentCalendarEvent.
+    """
+
+    first_day, last_day = _calendar_range(view, datetime.fromisoformat(date).date())
+    range_start = datetime(first_day.year, first_day.month, first_day.day, tzinfo=timezone.utc)
+    range_end = datetime(last_day.year, last_day.month, last_day.day, tzinfo=timezone.utc) + timedelta(days=1)
+
+    query = (
+        select(
+            Appointment.id,
+            Appointment.employee_id,
+            Appointment.start_time,
+            Appointment.end_time,
+            Appointment.status,
+            Appointment.source,
+            Appointment.final_price,
+            Appointment.payment_status,
+            Appointment.walk_in_name,
+            Employee.display_name.label("employee_display_name"),
+            Employee.full_name.label("employee_full_name"),
+            Employee.color.label("employee_color"),
+            Service.name.label("service_name"),
+            Service.color.label("service_color"),
+            Client.full_name.label("client_full_name"),
+        )
+        .outerjoin(Employee, Appointment.employee_id == Employee.id)
+        .outerjoin(Service, Appointment.service_id == Service.id)
+        .outerjoin(Client, Appointment.client_id == Client.id)
+        .where(
+            Appointment.business_id == business_id,
+            Appointment.start_time < range_end,
+            Appointment.end_time > range_start,
+        )
+        .order_by(Appointment.start_time, Appointment.id)
+    )
+    if employee_ids:
+        query = query.where(Appointment.employee_id.in_(employee_ids))
+    if statuses:
+        query = query.where(Appointment.status.in_([status.value for status in statuses]))
+
+    result = await db.execute(query)
+
+    events = []
+    for row in result.all():
+        client_name = row.client_full_name or row.walk_in_name
+        if row.service_name:
+            title = row.service_name
         else:
-            data.client_name = apt.walk_in_name
-        response.append(data)
+            title = "Blocat" if row.source == "ical_block" else "Programare"
+        if client_name:
+            title = f"{title} - {client_name}"
+        events.append(
+            AppointmentCalendarEvent(
+                id=row.id,
+                employee_id=row.employee_id,
+                start_time=row.start_time,
+                end_time=row.end_time,
+                status=row.status,
+                source=row.source,
+                title=title,
+                color=row.employee_color or row.service_color or DEFAULT_CALENDAR_COLOR,
+                employee_name=row.employee_display_name or row.employee_full_name,
+                client_name=client_name,
+                service_name=row.service_name,
+                final_price=row.final_price,
+                payment_status=row.payment_status,
+            )
+        )
 
-    return response
+    return CalendarViewResponse(
+        view=view,
+        date_from=first_day.isoformat(),
+        date_to=last_day.isoformat(),
+        events=events,
+        total_events=len(events),
+    )
 
 
 @router.post("/", response_model=AppointmentResponse, status_code=201)
 async def create_appointment(
     business_id: int,
     body: AppointmentCreate,
-    user: User = Depends(get_current_user),
+    biz: Business = Depends(get_owned_business),
     db: AsyncSession = Depends(get_db),
 ):
-    biz = await _get_owned_business(business_id, user, db)
-
     # Get service for duration and price
     svc = await db.get(Service, body.service_id)
     if not svc or svc.business_id != business_id:
@@ -121,9 +251,10 @@ async def create_appointment(
     duration = svc.duration_minutes
     end_time = body.start_time + timedelta(minutes=duration + svc.buffer_after_minutes)
 
-    # Conflict detection
-    if await _check_conflict(db, body.employee_id, body.start_time, end_time):
-        raise HTTPException(status_code=409, detail="Conflict de programare - interval ocupat")
+    # Overlaps with other bookings are rejected by the exclusion constraint on
+    # insert; only imported iCal blocks need an explicit check
+    if await has_external_block(db, body.employee_id, body.start_time, end_time):
+        raise HTTPException(status_code=409, detail=SLOT_CONFLICT_DETAIL)
 
     price = body.price if body.price is not None else svc.price
     discount = body.discount_percent or 0.0
@@ -150,7 +281,11 @@ async def create_appointment(
         status="confirmed" if biz.auto_confirm_bookings else "pending",
     )
     db.add(apt)
-    await db.flush()
+    try:
+        await flush_booking(db)
+    except BookingConflictError:
+        raise HTTPException(status_code=409, detail=SLOT_CONFLICT_DETAIL)
+    invalidate_employee_days(db, apt.employee_id, apt.start_time, apt.end_time)
     return apt
 
 
@@ -159,10 +294,9 @@ async def update_appointment(
     business_id: int,
     appointment_id: int,
     body: AppointmentUpdate,
-    user: User = Depends(get_current_user),
+    biz: Business = Depends(get_owned_business),
     db: AsyncSession = Depends(get_db),
 ):
-    await _get_owned_business(business_id, user, db)
     result = await db.execute(
         select(Appointment).where(
             Appointment.id == appointment_id, Appointment.business_id == business_id
@@ -172,18 +306,33 @@ async def update_appointment(
     if not apt:
         raise HTTPException(status_code=404, detail="Programare negasita")
 
-    # If rescheduling, check conflicts
+    # Availability of both the old and the new slot changes
+    invalidate_employee_days(db, apt.employee_id, apt.start_time, apt.end_time)
+
+    # If rescheduling or reassigning, check external blocks; overlaps with
+    # other bookings are rejected by the exclusion constraint on flush
+    new_employee_id = body.employee_id or apt.employee_id
+    new_start, new_end = apt.start_time, apt.end_time
     if body.start_time and body.start_time != apt.start_time:
         svc = await db.get(Service, body.service_id or apt.service_id)
+        new_start = body.start_time
         new_end = body.start_time + timedelta(minutes=svc.duration_minutes + svc.buffer_after_minutes)
-        emp_id = body.employee_id or apt.employee_id
-        if await _check_conflict(db, emp_id, body.start_time, new_end, exclude_id=apt.id):
-            raise HTTPException(status_code=409, detail="Conflict de programare - interval ocupat")
-        apt.end_time = new_end
+    if (new_employee_id, new_start) != (apt.employee_id, apt.start_time):
+        if await has_external_block(db, new_employee_id, new_start, new_end):
+            raise HTTPException(status_code=409, detail=SLOT_CONFLICT_DETAIL)
+    apt.end_time = new_end
+    if new_start != apt.start_time:
+        # Reminders sent for the old time do not count for the new one
+        apt.reminder_24h_sent_at = None
+        apt.reminder_1h_sent_at = None
 
     for key, value in body.model_dump(exclude_unset=True).items():
         setattr(apt, key, value)
-    await db.flush()
+    try:
+        await flush_booking(db)
+    except BookingConflictError:
+        raise HTTPException(status_code=409, detail=SLOT_CONFLICT_DETAIL)
+    invalidate_employee_days(db, apt.employee_id, apt.start_time, apt.end_time)
     return apt
 
 
@@ -192,10 +341,9 @@ async def cancel_appointment(
     business_id: int,
     appointment_id: int,
     body: AppointmentCancel,
-    user: User = Depends(get_current_user),
+    biz: Business = Depends(get_owned_business),
     db: AsyncSession = Depends(get_db),
 ):
-    await _get_owned_business(business_id, user, db)
     result = await db.execute(
         select(Appointment).where(
             Appointment.id == appointment_id, Appointment.business_id == business_id
@@ -213,6 +361,7 @@ async def cancel_appointment(
     apt.cancelled_by = body.cancelled_by
     apt.cancellation_reason = body.reason
     await db.flush()
+    invalidate_employee_days(db, apt.employee_id, apt.start_time, apt.end_time)
     return apt
 
 
@@ -222,11 +371,10 @@ async def update_appointment_status(
     appointment_id: int,
     new_status: str = Query(..., description="New status: confirmed|in_progress|completed|no_show"),
     payment_method: str | None = Query(None),
-    user: User = Depends(get_current_user),
+    biz: Business = Depends(get_owned_business),
     db: AsyncSession = Depends(get_db),
 ):
     """Transition appointment to a new status."""
-    await _get_owned_business(business_id, user, db)
     result = await db.execute(
         select(Appointment).where(
             Appointment.id == appointment_id, Appointment.business_id == business_id
@@ -257,6 +405,7 @@ async def update_appointment_status(
             apt.payment_method = payment_method
 
     await db.flush()
+    invalidate_employee_days(db, apt.employee_id, apt.start_time, apt.end_time)
     return {"id": apt.id, "status": apt.status, "payment_status": apt.payment_status}
 
 
@@ -266,12 +415,10 @@ async def get_availability(
     employee_id: int = Query(...),
     service_id: int = Query(...),
     date: str = Query(..., description="YYYY-MM-DD"),
-    user: User = Depends(get_current_user),
+    biz: Business = Depends(get_owned_business),
     db: AsyncSession = Depends(get_db),
 ):
     """Get available time slots for an employee on a given date."""
-    await _get_owned_business(business_id, user, db)
-
     emp = await db.get(Employee, employee_id)
     if not emp or emp.business_id != business_id:
         raise HTTPException(status_code=404, detail="Angajat negasit")
@@ -280,49 +427,44 @@ async def get_availability(
     if not svc or svc.business_id != business_id:
         raise HTTPException(status_code=404, detail="Serviciu negasit")
 
-    # Get day of week schedule
-    day_map = {"0": "mon", "1": "tue", "2": "wed", "3": "thu", "4": "fri", "5": "sat", "6": "sun"}
     target_date = datetime.fromisoformat(date).date()
-    day_key = day_map[str(target_date.weekday())]
-    schedule_intervals = emp.weekly_schedule.get(day_key, [])
-
-    if not schedule_intervals:
-        return AvailabilityResponse(employee_id=employee_id, date=date, slots=[])
-
-    # Get existing appointments for that day
-    day_start = datetime(target_date.year, target_date.month, target_date.day, tzinfo=timezone.utc)
-    day_end = day_start + timedelta(days=1)
-
-    result = await db.execute(
-        select(Appointment).where(
-            and_(
-                Appointment.employee_id == employee_id,
-                Appointment.status.in_(["pending", "confirmed", "in_progress"]),
-                Appointment.start_time >= day_start,
-                Appointment.start_time < day_end,
-            )
-        ).order_by(Appointment.start_time)
+    slots = await get_day_slots(
+        db,
+        employee_id,
+        emp.weekly_schedule,
+        target_date,
+        svc.duration_minutes + svc.buffer_after_minutes,
+    )
+    return AvailabilityResponse(
+        employee_id=employee_id,
+        date=date,
+        slots=slots,
+        total_available=sum(1 for slot in slots if slot.available),
+        total_slots=len(slots),
     )
-    existing = result.scalars().all()
-
-    # Generate slots
-    slot_duration = svc.duration_minutes + svc.buffer_after_minutes
-    slots: list[TimeSlot] = []
-
-    for interval in schedule_intervals:
-        h_start, m_start = map(int, interval["start"].split(":"))
-        h_end, m_end = map(int, interval["end"].split(":"))
 
-        current = day_start.replace(hour=h_start, minute=m_start)
-        interval_end = day_start.replace(hour=h_end, minute=m_end)
 
-        while current + timedelta(minutes=slot_duration) <= interval_end:
-            slot_end = current + timedelta(minutes=slot_duration)
-            # Check against existing appointments
-            available = not any(
-                apt.start_time < slot_end and apt.end_time > current for apt in existing
-            )
-            slots.append(TimeSlot(start=current, end=slot_end, available=available))
-            current += timedelta(minutes=30)  # 30-min step
+@router.get("/availability/team", response_model=MultiEmployeeAvailabilityResponse)
+async def get_multi_availability(
+    business_id: int,
+    service_id: int = Query(...),
+    date: str = Query(..., description="YYYY-MM-DD (first day)"),
+    days: int = Query(1, ge=1, le=MAX_RANGE_DAYS),
+    employee_ids: list[int] | None = Query(None, description="None = all active employees"),
+    biz: Business = Depends(get_owned_business),
+    db: AsyncSession = Depends(get_db),
+):
+    """Get available slots for several employees over a date range in one call."""
+    svc = await db.get(Service, service_id)
+    if not svc or svc.business_id != business_id:
+        raise HTTPException(status_code=404, detail="Serviciu negasit")
 
-    return AvailabilityResponse(employee_id=employee_id, date=date, slots=slots)
+    return await get_team_availability(
+        db,
+        business_id=business_id,
+        service_id=service_id,
+        slot_minutes=svc.duration_minutes + svc.buffer_after_minutes,
+        date_from=datetime.fromisoformat(date).date(),
+        days=days,
+        employee_ids=employee_ids,
+    )
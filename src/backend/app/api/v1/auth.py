@@ -10,8 +10,9 @@ from app.core.security import (
     create_refresh_token,
     decode_token,
     get_current_user,
-    hash_password,
-    verify_password,
+    hash_password_async,
+    password_needs_rehash,
+    verify_password_async,
 )
 from app.models.user import User
 from app.schemas.auth import (
@@ -33,7 +34,7 @@ async def register(body: RegisterRequest, db: AsyncSession = Depends(get_db)):
 
     user = User(
         email=body.email,
-        hashed_password=hash_password(body.password),
+        hashed_password=await hash_password_async(body.password),
         full_name=body.full_name,
         phone=body.phone,
         role="business_owner",
@@ -51,11 +52,15 @@ async def register(body: RegisterRequest, db: AsyncSession = Depends(get_db)):
 async def login(body: LoginRequest, db: AsyncSession = Depends(get_db)):
     result = await db.execute(select(User).where(User.email == body.email))
     user = result.scalar_one_or_none()
-    if not user or not verify_password(body.password, user.hashed_password):
+    if not user or not await verify_password_async(body.password, user.hashed_password):
         raise HTTPException(status_code=401, detail="Email sau parola incorecta")
     if not user.is_active:
         raise HTTPException(status_code=403, detail="Cont dezactivat")
 
+    # Transparently upgrade hashes made with an older cost factor
+    if password_needs_rehash(user.hashed_password):
+        user.hashed_password = await hash_password_async(body.password)
+
     return TokenResponse(
         access_token=create_access_token({"sub": str(user.id)}),
         refresh_token=create_refresh_token({"sub": str(user.id)}),
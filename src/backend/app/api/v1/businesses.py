@@ -5,8 +5,11 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.deps import get_owned_business, invalidate_public_business
 from app.core.database import get_db
-from app.core.security import get_current_user
+from app.core.http_cache import conditional_get
+from app.core.principal import Principal, business_version
+from app.core.security import get_current_principal, get_current_user
 from app.models.business import Business
 from app.models.user import User
 from app.schemas.business import BusinessCreate, BusinessResponse, BusinessUpdate
@@ -21,7 +24,20 @@ def _slugify(name: str) -> str:
     return re.sub(r"-+", "-", slug).strip("-")
 
 
-@router.get("/", response_model=list[BusinessResponse])
+# Both validators come from the cached principal -- a 304 costs no query
+def _businesses_version(principal: Principal = Depends(get_current_principal)):
+    return sorted(principal.business_versions.items())
+
+
+def _business_version(biz: Business = Depends(get_owned_business)):
+    return business_version(biz.updated_at)
+
+
+@router.get(
+    "/",
+    response_model=list[BusinessResponse],
+    dependencies=[Depends(conditional_get("businesses", _businesses_version))],
+)
 async def list_businesses(
     user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
@@ -54,18 +70,12 @@ async def create_business(
     return biz
 
 
-@router.get("/{business_id}", response_model=BusinessResponse)
-async def get_business(
-    business_id: int,
-    user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
-):
-    result = await db.execute(
-        select(Business).where(Business.id == business_id, Business.owner_id == user.id)
-    )
-    biz = result.scalar_one_or_none()
-    if not biz:
-        raise HTTPException(status_code=404, detail="Afacere negasita")
+@router.get(
+    "/{business_id}",
+    response_model=BusinessResponse,
+    dependencies=[Depends(conditional_get("business", _business_version))],
+)
+async def get_business(biz: Business = Depends(get_owned_business)):
     return biz
 
 
@@ -76,6 +86,8 @@ async def update_business(
     user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
+    # Loaded from the database (not the cache) so the row can be modified.
+    # The flush bumps updated_at, which versions out every cached copy.
     result = await db.execute(
         select(Business).where(Business.id == business_id, Business.owner_id == user.id)
     )
@@ -83,10 +95,13 @@ async def update_business(
     if not biz:
         raise HTTPException(status_code=404, detail="Afacere negasita")
 
+    # Before and after the update: a changed slug leaves the old one cached otherwise
+    invalidate_public_business(db, biz)
     for key, value in body.model_dump(exclude_unset=True).items():
         setattr(biz, key, value)
 
     await db.flush()
+    invalidate_public_business(db, biz)
     return biz
 
 
@@ -102,4 +117,6 @@ async def delete_business(
     biz = result.scalar_one_or_none()
     if not biz:
         raise HTTPException(status_code=404, detail="Afacere negasita")
+    # Deleting drops the business from the owner's cached principal
+    invalidate_public_business(db, biz)
     await db.delete(biz)
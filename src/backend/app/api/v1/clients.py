@@ -6,26 +6,15 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.deps import get_owned_business
 from app.core.database import get_db
-from app.core.security import get_current_user
 from app.models.business import Business
 from app.models.client import Client
-from app.models.user import User
 from app.schemas.client import ClientCreate, ClientListResponse, ClientResponse, ClientUpdate
 
 router = APIRouter()
 
 
-async def _get_owned_business(business_id: int, user: User, db: AsyncSession) -> Business:
-    result = await db.execute(
-        select(Business).where(Business.id == business_id, Business.owner_id == user.id)
-    )
-    biz = result.scalar_one_or_none()
-    if not biz:
-        raise HTTPException(status_code=404, detail="Afacere negasita")
-    return biz
-
-
 @router.get("/", response_model=list[ClientListResponse])
 async def list_clients(
     business_id: int,
@@ -34,10 +23,9 @@ async def list_clients(
     blocked: bool | None = Query(None),
     page: int = Query(1, ge=1),
     per_page: int = Query(50, ge=1, le=200),
-    user: User = Depends(get_current_user),
+    biz: Business = Depends(get_owned_business),
     db: AsyncSession = Depends(get_db),
 ):
-    await _get_owned_business(business_id, user, db)
     query = select(Client).where(Client.business_id == business_id)
 
     if search:
@@ -61,10 +49,9 @@ async def list_clients(
 async def create_client(
     business_id: int,
     body: ClientCreate,
-    user: User = Depends(get_current_user),
+    biz: Business = Depends(get_owned_business),
     db: AsyncSession = Depends(get_db),
 ):
-    await _get_owned_business(business_id, user, db)
     client = Client(
         business_id=business_id,
         gdpr_consent_date=datetime.now(timezone.utc) if body.gdpr_consent else None,
@@ -80,10 +67,9 @@ async def create_client(
 async def get_client(
     business_id: int,
     client_id: int,
-    user: User = Depends(get_current_user),
+    biz: Business = Depends(get_owned_business),
     db: AsyncSession = Depends(get_db),
 ):
-    await _get_owned_business(business_id, user, db)
     result = await db.execute(
         select(Client).where(Client.id == client_id, Client.business_id == business_id)
     )
@@ -98,10 +84,9 @@ async def update_client(
     business_id: int,
     client_id: int,
     body: ClientUpdate,
-    user: User = Depends(get_current_user),
+    biz: Business = Depends(get_owned_business),
     db: AsyncSession = Depends(get_db),
 ):
-    await _get_owned_business(business_id, user, db)
     result = await db.execute(
         select(Client).where(Client.id == client_id, Client.business_id == business_id)
     )
@@ -118,10 +103,9 @@ async def update_client(
 @router.get("/stats/summary")
 async def client_stats(
     business_id: int,
-    user: User = Depends(get_current_user),
+    biz: Business = Depends(get_owned_business),
     db: AsyncSession = Depends(get_db),
 ):
-    await _get_owned_business(business_id, user, db)
     result = await db.execute(
         select(
             func.count(Client.id).label("total_clients"),
@@ -2,46 +2,50 @@
 
 from datetime import datetime, timedelta, timezone
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends
 from sqlalchemy import and_, func, select, extract
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.deps import get_owned_business
 from app.core.database import get_db
-from app.core.security import get_current_user
 from app.models.appointment import Appointment
 from app.models.business import Business
 from app.models.client import Client
+from app.models.daily_business_stats import DailyBusinessStats
 from app.models.notification import NotificationLog
 from app.models.service import Service
-from app.models.user import User
 
 router = APIRouter()
 
 RO_MONTHS = ["Ian", "Feb", "Mar", "Apr", "Mai", "Iun", "Iul", "Aug", "Sep", "Oct", "Nov", "Dec"]
 
 
-async def _get_owned_business(business_id: int, user: User, db: AsyncSession) -> Business:
-    result = await db.execute(
-        select(Business).where(Business.id == business_id, Business.owner_id == user.id)
-    )
-    biz = result.scalar_one_or_none()
-    if not biz:
-        raise HTTPException(status_code=404, detail="Afacere negasita")
-    return biz
+def _next_month(month_start: datetime) -> datetime:
+    """Return the first day of the month following month_start."""
+    if month_start.month == 12:
+        return month_start.replace(year=month_start.year + 1, month=1)
+    return month_start.replace(month=month_start.month + 1)
 
 
 @router.get("/")
 async def get_dashboard_stats(
     business_id: int,
-    user: User = Depends(get_current_user),
+    biz: Business = Depends(get_owned_business),
     db: AsyncSession = Depends(get_db),
 ):
-    """Compute aggregated dashboard statistics."""
-    await _get_owned_business(business_id, user, db)
+    """Compute aggregated dashboard statistics.
+
+    Today is computed live from the raw tables; every other day (rest of the
+    week, month, all-time totals, the 6-month chart, channel costs) is summed
+    from the daily_business_stats rollup, so the cost of this endpoint does
+    not grow with the tenant's history. Rollup rows lag by at most one
+    refresh interval (see app.tasks.rollup_tasks).
+    """
 
     now = datetime.now(timezone.utc)
     today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
     today_end = today_start + timedelta(days=1)
+    today = today_start.date()
 
     # Week boundaries (Monday to Sunday)
     days_since_monday = now.weekday()
@@ -50,14 +54,18 @@ async def get_dashboard_stats(
 
     # Month boundaries
     month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-    if now.month == 12:
-        month_end = now.replace(year=now.year + 1, month=1, day=1, hour=0, minute=0, second=0, microsecond=0)
-    else:
-        month_end = now.replace(month=now.month + 1, day=1, hour=0, minute=0, second=0, microsecond=0)
+    month_end = _next_month(month_start)
 
     biz_filter = Appointment.business_id == business_id
 
-    # === TODAY STATS ===
+    # Revenue chart buckets: the current month and the 5 before it
+    chart_months = []
+    for months_back in range(5, -1, -1):
+        year, month = divmod(now.year * 12 + now.month - 1 - months_back, 12)
+        chart_start = datetime(year, month + 1, 1, tzinfo=timezone.utc)
+        chart_months.append((chart_start, _next_month(chart_start)))
+
+    # === TODAY (live) ===
     today_result = await db.execute(
         select(
             func.count(Appointment.id).label("total"),
@@ -65,8 +73,22 @@ async def get_dashboard_stats(
             func.count(Appointment.id).filter(Appointment.status == "in_progress").label("in_progress"),
             func.count(Appointment.id).filter(Appointment.status == "confirmed").label("confirmed"),
             func.count(Appointment.id).filter(Appointment.status == "pending").label("pending"),
-            func.coalesce(func.sum(Appointment.final_price).filter(Appointment.status == "completed"), 0).label("revenue_today"),
-            func.coalesce(func.sum(Appointment.final_price).filter(Appointment.status.notin_(["cancelled"])), 0).label("revenue_expected"),
+            func.count(Appointment.id).filter(Appointment.status == "cancelled").label("cancelled"),
+            func.count(Appointment.id).filter(Appointment.status == "no_show").label("no_shows"),
+            func.coalesce(
+                func.sum(Appointment.final_price).filter(Appointment.status == "completed"), 0
+            ).label("revenue"),
+            func.coalesce(
+                func.sum(Appointment.final_price).filter(Appointment.status.notin_(["cancelled"])), 0
+            ).label("revenue_expected"),
+            select(func.count(Client.id))
+            .where(
+                Client.business_id == business_id,
+                Client.created_at >= today_start,
+                Client.created_at < today_end,
+            )
+            .scalar_subquery()
+            .label("new_clients"),
         ).where(
             biz_filter,
             Appointment.start_time >= today_start,
@@ -75,99 +97,76 @@ async def get_dashboard_stats(
     )
     today_row = today_result.one()
 
-    # === WEEK STATS ===
-    week_apt_result = await db.execute(
-        select(
-            func.count(Appointment.id).label("appointments"),
-            func.coalesce(func.sum(Appointment.final_price).filter(Appointment.status == "completed"), 0).label("revenue"),
-            func.count(Appointment.id).filter(Appointment.status == "no_show").label("no_shows"),
-        ).where(
-            biz_filter,
-            Appointment.start_time >= week_start,
-            Appointment.start_time < week_end,
+    # === EVERY OTHER DAY (rollup): week / month / total / chart in one pass ===
+    def in_days(start: datetime, end: datetime):
+        return and_(
+            DailyBusinessStats.day >= start.date(),
+            DailyBusinessStats.day < end.date(),
+            DailyBusinessStats.day != today,
         )
-    )
-    week_row = week_apt_result.one()
 
-    week_new_clients = await db.execute(
-        select(func.count(Client.id)).where(
-            Client.business_id == business_id,
-            Client.created_at >= week_start,
-            Client.created_at < week_end,
-        )
-    )
-    week_new_clients_count = week_new_clients.scalar() or 0
+    def rollup_sum(column, *conditions):
+        return func.coalesce(func.sum(column).filter(*conditions), 0)
 
-    # === MONTH STATS ===
-    month_apt_result = await db.execute(
+    not_today = DailyBusinessStats.day != today
+    is_week = in_days(week_start, week_end)
+    is_month = in_days(month_start, month_end)
+    stats = DailyBusinessStats
+
+    rollup_result = await db.execute(
         select(
-            func.count(Appointment.id).label("appointments"),
-            func.coalesce(func.sum(Appointment.final_price).filter(Appointment.status == "completed"), 0).label("revenue"),
-            func.count(Appointment.id).filter(Appointment.status == "no_show").label("no_shows"),
-            func.count(Appointment.id).filter(Appointment.status == "completed").label("completed_count"),
-            func.count(Appointment.id).filter(Appointment.status.notin_(["cancelled"])).label("non_cancelled"),
-            func.count(Appointment.id).filter(Appointment.status.in_(["completed", "in_progress"])).label("served"),
-        ).where(
-            biz_filter,
-            Appointment.start_time >= month_start,
-            Appointment.start_time < month_end,
-        )
+            # Week
+            rollup_sum(stats.appointments_total, is_week).label("week_appointments"),
+            rollup_sum(stats.revenue, is_week).label("week_revenue"),
+            rollup_sum(stats.no_shows, is_week).label("week_no_shows"),
+            rollup_sum(stats.new_clients, is_week).label("week_new_clients"),
+            # Month
+            rollup_sum(stats.appointments_total, is_month).label("month_appointments"),
+            rollup_sum(stats.revenue, is_month).label("month_revenue"),
+            rollup_sum(stats.no_shows, is_month).label("month_no_shows"),
+            rollup_sum(stats.completed, is_month).label("month_completed"),
+            rollup_sum(stats.cancelled, is_month).label("month_cancelled"),
+            rollup_sum(stats.in_progress, is_month).label("month_in_progress"),
+            rollup_sum(stats.new_clients, is_month).label("month_new_clients"),
+            # Total
+            rollup_sum(stats.appointments_total, not_today).label("total_appointments"),
+            rollup_sum(stats.revenue, not_today).label("total_revenue"),
+            rollup_sum(stats.no_shows, not_today).label("total_no_shows"),
+            rollup_sum(stats.new_clients, not_today).label("total_clients"),
+            # Revenue chart
+            *(
+                rollup_sum(stats.revenue, in_days(chart_start, chart_end)).label(f"chart_{index}")
+                for index, (chart_start, chart_end) in enumerate(chart_months)
+            ),
+        ).where(stats.business_id == business_id)
     )
-    month_row = month_apt_result.one()
+    rollup_row = rollup_result.one()
 
-    month_new_clients = await db.execute(
-        select(func.count(Client.id)).where(
-            Client.business_id == business_id,
-            Client.created_at >= month_start,
-            Client.created_at < month_end,
-        )
-    )
-    month_new_clients_count = month_new_clients.scalar() or 0
+    today_total = int(today_row.total)
+    today_revenue = float(today_row.revenue)
+    today_no_shows = int(today_row.no_shows)
+    today_new_clients = int(today_row.new_clients)
 
-    month_revenue = float(month_row.revenue)
-    month_completed = int(month_row.completed_count)
-    month_non_cancelled = int(month_row.non_cancelled)
-    month_served = int(month_row.served)
+    month_appointments = int(rollup_row.month_appointments) + today_total
+    month_revenue = float(rollup_row.month_revenue) + today_revenue
+    month_completed = int(rollup_row.month_completed) + int(today_row.completed)
+    month_non_cancelled = month_appointments - int(rollup_row.month_cancelled) - int(today_row.cancelled)
+    month_served = month_completed + int(rollup_row.month_in_progress) + int(today_row.in_progress)
     avg_ticket = round(month_revenue / month_completed, 2) if month_completed > 0 else 0
     occupancy_rate = round((month_served / month_non_cancelled) * 100) if month_non_cancelled > 0 else 0
 
-    # === TOTAL STATS ===
-    total_clients = await db.execute(
-        select(func.count(Client.id)).where(Client.business_id == business_id)
-    )
-    total_apt_result = await db.execute(
-        select(
-            func.count(Appointment.id).label("appointments"),
-            func.coalesce(func.sum(Appointment.final_price).filter(Appointment.status == "completed"), 0).label("revenue"),
-            func.count(Appointment.id).filter(Appointment.status == "no_show").label("no_shows"),
-        ).where(biz_filter)
-    )
-    total_row = total_apt_result.one()
-
-    # === REVENUE CHART (last 6 months) ===
-    revenue_chart = []
-    for i in range(5, -1, -1):
-        chart_date = now - timedelta(days=30 * i)
-        chart_month_start = chart_date.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-        if chart_date.month == 12:
-            chart_month_end = chart_date.replace(year=chart_date.year + 1, month=1, day=1, hour=0, minute=0, second=0, microsecond=0)
-        else:
-            chart_month_end = chart_date.replace(month=chart_date.month + 1, day=1, hour=0, minute=0, second=0, microsecond=0)
-
-        rev_result = await db.execute(
-            select(
-                func.coalesce(func.sum(Appointment.final_price).filter(Appointment.status == "completed"), 0)
-            ).where(
-                biz_filter,
-                Appointment.start_time >= chart_month_start,
-                Appointment.start_time < chart_month_end,
-            )
-        )
-        month_rev = float(rev_result.scalar() or 0)
-        revenue_chart.append({
-            "month": RO_MONTHS[chart_month_start.month - 1],
-            "revenue": round(month_rev, 2),
-        })
+    # Today always falls in the last chart bucket (the current month)
+    revenue_chart = [
+        {
+            "month": RO_MONTHS[chart_start.month - 1],
+            "revenue": round(
+                float(getattr(rollup_row, f"chart_{index}"))
+                + (today_revenue if index == len(chart_months) - 1 else 0),
+                2,
+            ),
+        }
+        for index, (chart_start, _) in enumerate(chart_months)
+    ]
 
     # === TOP SERVICES (this month, top 5) ===
     top_svc_result = await db.execute(
@@ -192,8 +191,20 @@ async def get_dashboard_stats(
         for row in top_svc_result.all()
     ]
 
-    # === CHANNEL BREAKDOWN (this month) ===
-    channel_result = await db.execute(
+    # === CHANNEL BREAKDOWN (this month: rollup for earlier days, live for today) ===
+    channel_totals: dict[str, dict] = {}
+    channel_days = await db.execute(
+        select(DailyBusinessStats.notifications_by_channel).where(
+            DailyBusinessStats.business_id == business_id, is_month
+        )
+    )
+    for by_channel in channel_days.scalars().all():
+        for channel, values in (by_channel or {}).items():
+            totals = channel_totals.setdefault(channel, {"count": 0, "cost": 0.0})
+            totals["count"] += int(values.get("count", 0))
+            totals["cost"] += float(values.get("cost", 0))
+
+    today_channels = await db.execute(
         select(
             NotificationLog.channel,
             func.count(NotificationLog.id).label("count"),
@@ -201,46 +212,50 @@ async def get_dashboard_stats(
         )
         .where(
             NotificationLog.business_id == business_id,
-            NotificationLog.created_at >= month_start,
-            NotificationLog.created_at < month_end,
+            NotificationLog.created_at >= today_start,
+            NotificationLog.created_at < today_end,
         )
         .group_by(NotificationLog.channel)
-        .order_by(func.count(NotificationLog.id).desc())
     )
+    for row in today_channels.all():
+        totals = channel_totals.setdefault(row.channel, {"count": 0, "cost": 0.0})
+        totals["count"] += int(row.count)
+        totals["cost"] += float(row.cost)
+
     channel_breakdown = [
-        {"channel": row.channel.capitalize(), "count": int(row.count), "cost": round(float(row.cost), 2)}
-        for row in channel_result.all()
+        {"channel": channel.capitalize(), "count": totals["count"], "cost": round(totals["cost"], 2)}
+        for channel, totals in sorted(channel_totals.items(), key=lambda item: item[1]["count"], reverse=True)
     ]
 
     return {
         "today": {
-            "appointments": int(today_row.total),
+            "appointments": today_total,
             "completed": int(today_row.completed),
             "in_progress": int(today_row.in_progress),
             "confirmed": int(today_row.confirmed),
             "pending": int(today_row.pending),
-            "revenue_today": round(float(today_row.revenue_today), 2),
+            "revenue_today": round(today_revenue, 2),
             "revenue_expected": round(float(today_row.revenue_expected), 2),
         },
         "week": {
-            "appointments": int(week_row.appointments),
-            "revenue": round(float(week_row.revenue), 2),
-            "new_clients": week_new_clients_count,
-            "no_shows": int(week_row.no_shows),
+            "appointments": int(rollup_row.week_appointments) + today_total,
+            "revenue": round(float(rollup_row.week_revenue) + today_revenue, 2),
+            "new_clients": int(rollup_row.week_new_clients) + today_new_clients,
+            "no_shows": int(rollup_row.week_no_shows) + today_no_shows,
         },
         "month": {
-            "appointments": int(month_row.appointments),
+            "appointments": month_appointments,
             "revenue": round(month_revenue, 2),
-            "new_clients": month_new_clients_count,
-            "no_shows": int(month_row.no_shows),
+            "new_clients": int(rollup_row.month_new_clients) + today_new_clients,
+            "no_shows": int(rollup_row.month_no_shows) + today_no_shows,
             "avg_ticket": avg_ticket,
             "occupancy_rate": occupancy_rate,
         },
         "total": {
-            "clients": total_clients.scalar() or 0,
-            "revenue": round(float(total_row.revenue), 2),
-            "appointments": int(total_row.appointments),
-            "no_shows": int(total_row.no_shows),
+            "clients": int(rollup_row.total_clients) + today_new_clients,
+            "revenue": round(float(rollup_row.total_revenue) + today_revenue, 2),
+            "appointments": int(rollup_row.total_appointments) + today_total,
+            "no_shows": int(rollup_row.total_no_shows) + today_no_shows,
         },
         "revenue_chart": revenue_chart,
         "top_services": top_services,
@@ -4,38 +4,42 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.deps import get_owned_business
 from app.core.database import get_db
-from app.core.security import get_current_user
+from app.core.http_cache import collection_version, conditional_get
+from app.models.appointment import Appointment
 from app.models.business import Business
 from app.models.employee import Employee, EmployeeService
-from app.models.user import User
 from app.schemas.employee import (
     EmployeeCreate,
     EmployeeResponse,
     EmployeeServiceAssign,
     EmployeeUpdate,
 )
+from app.services.public_catalog import invalidate_public_catalog
+from app.services.rollups import refresh_days, utc_day
 
 router = APIRouter()
 
 
-async def _get_owned_business(business_id: int, user: User, db: AsyncSession) -> Business:
-    result = await db.execute(
-        select(Business).where(Business.id == business_id, Business.owner_id == user.id)
-    )
-    biz = result.scalar_one_or_none()
-    if not biz:
-        raise HTTPException(status_code=404, detail="Afacere negasita")
-    return biz
+async def _employees_version(
+    business_id: int,
+    biz: Business = Depends(get_owned_business),
+    db: AsyncSession = Depends(get_db),
+):
+    return await collection_version(db, Employee, Employee.business_id == business_id)
 
 
-@router.get("/", response_model=list[EmployeeResponse])
+@router.get(
+    "/",
+    response_model=list[EmployeeResponse],
+    dependencies=[Depends(conditional_get("employees", _employees_version))],
+)
 async def list_employees(
     business_id: int,
-    user: User = Depends(get_current_user),
+    biz: Business = Depends(get_owned_business),
     db: AsyncSession = Depends(get_db),
 ):
-    await _get_owned_business(business_id, user, db)
     result = await db.execute(
         select(Employee)
         .where(Employee.business_id == business_id)
@@ -48,13 +52,13 @@ async def list_employees(
 async def create_employee(
     business_id: int,
     body: EmployeeCreate,
-    user: User = Depends(get_current_user),
+    biz: Business = Depends(get_owned_business),
     db: AsyncSession = Depends(get_db),
 ):
-    await _get_owned_business(business_id, user, db)
     emp = Employee(business_id=business_id, **body.model_dump(exclude_unset=True))
     db.add(emp)
     await db.flush()
+    invalidate_public_catalog(db, business_id)
     return emp
 
 
@@ -63,10 +67,9 @@ async def update_employee(
     business_id: int,
     employee_id: int,
     body: EmployeeUpdate,
-    user: User = Depends(get_current_user),
+    biz: Business = Depends(get_owned_business),
     db: AsyncSession = Depends(get_db),
 ):
-    await _get_owned_business(business_id, user, db)
     result = await db.execute(
         select(Employee).where(Employee.id == employee_id, Employee.business_id == business_id)
     )
@@ -77,6 +80,7 @@ async def update_employee(
     for key, value in body.model_dump(exclude_unset=True).items():
         setattr(emp, key, value)
     await db.flush()
+    invalidate_public_catalog(db, business_id)
     return emp
 
 
@@ -84,17 +88,27 @@ async def update_employee(
 async def delete_employee(
     business_id: int,
     employee_id: int,
-    user: User = Depends(get_current_user),
+    biz: Business = Depends(get_owned_business),
     db: AsyncSession = Depends(get_db),
 ):
-    await _get_owned_business(business_id, user, db)
     result = await db.execute(
         select(Employee).where(Employee.id == employee_id, Employee.business_id == business_id)
     )
     emp = result.scalar_one_or_none()
     if not emp:
         raise HTTPException(status_code=404, detail="Angajat negasit")
+
+    # Appointments cascade with the employee; recompute the rollup for their days
+    days_result = await db.execute(
+        select(utc_day(Appointment.start_time)).where(Appointment.employee_id == employee_id).distinct()
+    )
+    affected_days = days_result.scalars().all()
+
     await db.delete(emp)
+    await db.flush()
+    invalidate_public_catalog(db, business_id)
+    if affected_days:
+        await refresh_days(db, business_id, affected_days)
 
 
 @router.post("/{employee_id}/services", status_code=201)
@@ -102,10 +116,9 @@ async def assign_service(
     business_id: int,
     employee_id: int,
     body: EmployeeServiceAssign,
-    user: User = Depends(get_current_user),
+    biz: Business = Depends(get_owned_business),
     db: AsyncSession = Depends(get_db),
 ):
-    await _get_owned_business(business_id, user, db)
     assignment = EmployeeService(
         employee_id=employee_id,
         service_id=body.service_id,
@@ -114,4 +127,5 @@ async def assign_service(
     )
     db.add(assignment)
     await db.flush()
+    invalidate_public_catalog(db, business_id)
     return {"status": "ok"}
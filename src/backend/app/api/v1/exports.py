@@ -0,0 +1,157 @@
+"""Export endpoints -- streamed CSV downloads and background export jobs for accountants."""
+
+from datetime import date, datetime, timezone
+from typing import Literal
+from uuid import uuid4
+
+from celery.result import AsyncResult
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import FileResponse, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import get_owned_business
+from app.core.database import AsyncSessionLocal, get_db
+from app.models.business import Business
+from app.services.exports import EXPORT_FORMATS, build_export_query, format_available, iter_csv, local_export_path
+from app.tasks.celery_app import celery_app
+from app.tasks.export_tasks import run_export
+
+router = APIRouter()
+
+ExportDataset = Literal["appointments", "invoices", "notifications"]
+ExportFormat = Literal["csv", "xlsx", "parquet"]
+
+
+def _export_job_id(business_id: int) -> str:
+    """Celery task id for a new export job; the business id in it records who owns the job."""
+    return f"export-{business_id}-{uuid4().hex}"
+
+
+def _owned_export_job(business_id: int, job_id: str) -> AsyncResult:
+    """The export job's result, or 404 if the job was not queued by this business.
+
+    Checked before reading the job state: a job that is still pending (or
+    an unknown id) has no result yet to take the business id from.
+    """
+    if not job_id.startswith(f"export-{business_id}-"):
+        raise HTTPException(status_code=404, detail="Export negasit")
+    job = AsyncResult(job_id, app=celery_app)
+    info = job.info if isinstance(job.info, dict) else {}
+    if job.state not in ("PENDING", "FAILURE") and info.get("business_id") != business_id:
+        raise HTTPException(status_code=404, detail="Export negasit")
+    return job
+
+
+@router.get("/{dataset}")
+async def download_export(
+    business_id: int,
+    dataset: ExportDataset,
+    date_from: date | None = Query(None),
+    date_to: date | None = Query(None),
+    biz: Business = Depends(get_owned_business),
+    db: AsyncSession = Depends(get_db),
+):
+    """Stream a CSV export directly from a server-side cursor.
+
+    The request session is closed before the response body is sent, so the
+    stream reads through its own session.
+    """
+    query = build_export_query(dataset, business_id, date_from, date_to)
+
+    async def body():
+        async with AsyncSessionLocal() as stream_db:
+            async for chunk in iter_csv(stream_db, query):
+                yield chunk
+
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
+    return StreamingResponse(
+        body(),
+        media_type="text/csv; charset=utf-8",
+        headers={"Content-Disposition": f'attachment; filename="{dataset}_{stamp}.csv"'},
+    )
+
+
+@router.post("/{dataset}/jobs", status_code=202)
+async def create_export_job(
+    business_id: int,
+    dataset: ExportDataset,
+    format: ExportFormat = Query("csv"),
+    date_from: date | None = Query(None),
+    date_to: date | None = Query(None),
+    biz: Business = Depends(get_owned_business),
+    db: AsyncSession = Depends(get_db),
+):
+    """Queue a large export; poll GET /jobs/{job_id} for progress and the download URL."""
+    if not format_available(format):
+        raise HTTPException(status_code=400, detail=f"Formatul {format} nu este disponibil pe server")
+
+    job = run_export.apply_async(
+        (
+            business_id,
+            dataset,
+            format,
+            date_from.isoformat() if date_from else None,
+            date_to.isoformat() if date_to else None,
+        ),
+        task_id=_export_job_id(business_id),
+    )
+    return {"job_id": job.id, "status": "pending"}
+
+
+@router.get("/jobs/{job_id}")
+async def get_export_job(
+    business_id: int,
+    job_id: str,
+    request: Request,
+    biz: Business = Depends(get_owned_business),
+    db: AsyncSession = Depends(get_db),
+):
+    """Export job status: pending, progress (rows/total), success (url) or failure.
+
+    The url of a finished job is a signed GCS URL that expires, or the
+    authenticated file endpoint below when the export was kept locally.
+    """
+    job = _owned_export_job(business_id, job_id)
+
+    if job.state == "PENDING":
+        return {"job_id": job_id, "status": "pending"}
+    if job.state == "FAILURE":
+        return {"job_id": job_id, "status": "failed"}
+
+    info = job.info
+    if job.state == "SUCCESS":
+        url = info.get("url") or str(
+            request.url_for("download_export_file", business_id=business_id, job_id=job_id)
+        )
+        return {
+            "job_id": job_id,
+            "status": "done",
+            "rows": info.get("rows", 0),
+            "total": info.get("total", 0),
+            "url": url,
+            "filename": info.get("filename"),
+        }
+    return {"job_id": job_id, "status": "running", "rows": info.get("rows", 0), "total": info.get("total", 0)}
+
+
+@router.get("/jobs/{job_id}/file")
+async def download_export_file(
+    business_id: int,
+    job_id: str,
+    biz: Business = Depends(get_owned_business),
+    db: AsyncSession = Depends(get_db),
+):
+    """Download a finished export kept on local disk (development, or GCS upload failed)."""
+    job = _owned_export_job(business_id, job_id)
+    if job.state != "SUCCESS" or job.info.get("url"):
+        raise HTTPException(status_code=404, detail="Export negasit")
+
+    filename = job.info.get("filename") or ""
+    file_path = local_export_path(business_id, filename)
+    if file_path is None:
+        raise HTTPException(status_code=404, detail="Export negasit")
+    return FileResponse(
+        file_path,
+        media_type=EXPORT_FORMATS.get(file_path.suffix.lstrip("."), "application/octet-stream"),
+        filename=file_path.name,
+    )
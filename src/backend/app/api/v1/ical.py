@@ -4,32 +4,20 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.deps import get_owned_business
 from app.core.database import get_db
-from app.core.security import get_current_user
 from app.models.business import Business
 from app.models.ical_source import ICalSource
-from app.models.user import User
 
 router = APIRouter()
 
 
-async def _get_owned_business(business_id: int, user: User, db: AsyncSession) -> Business:
-    result = await db.execute(
-        select(Business).where(Business.id == business_id, Business.owner_id == user.id)
-    )
-    biz = result.scalar_one_or_none()
-    if not biz:
-        raise HTTPException(status_code=404, detail="Afacere negasita")
-    return biz
-
-
 @router.get("/sources")
 async def list_ical_sources(
     business_id: int,
-    user: User = Depends(get_current_user),
+    biz: Business = Depends(get_owned_business),
     db: AsyncSession = Depends(get_db),
 ):
-    await _get_owned_business(business_id, user, db)
     result = await db.execute(
         select(ICalSource).where(ICalSource.business_id == business_id)
     )
@@ -43,11 +31,9 @@ async def add_ical_source(
     source_type: str,
     ical_url: str,
     employee_id: int | None = None,
-    user: User = Depends(get_current_user),
+    biz: Business = Depends(get_owned_business),
     db: AsyncSession = Depends(get_db),
 ):
-    await _get_owned_business(business_id, user, db)
-
     source = ICalSource(
         business_id=business_id,
         employee_id=employee_id,
@@ -64,10 +50,9 @@ async def add_ical_source(
 async def delete_ical_source(
     business_id: int,
     source_id: int,
-    user: User = Depends(get_current_user),
+    biz: Business = Depends(get_owned_business),
     db: AsyncSession = Depends(get_db),
 ):
-    await _get_owned_business(business_id, user, db)
     result = await db.execute(
         select(ICalSource).where(
             ICalSource.id == source_id, ICalSource.business_id == business_id
@@ -83,11 +68,10 @@ async def delete_ical_source(
 async def trigger_sync(
     business_id: int,
     source_id: int,
-    user: User = Depends(get_current_user),
+    biz: Business = Depends(get_owned_business),
     db: AsyncSession = Depends(get_db),
 ):
     """Trigger manual iCal sync for a source."""
-    await _get_owned_business(business_id, user, db)
     result = await db.execute(
         select(ICalSource).where(
             ICalSource.id == source_id, ICalSource.business_id == business_id
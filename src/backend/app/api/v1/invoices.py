@@ -6,37 +6,25 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.deps import get_owned_business
 from app.core.database import get_db
-from app.core.security import get_current_user
 from app.models.appointment import Appointment
 from app.models.business import Business
 from app.models.client import Client
 from app.models.invoice import Invoice
 from app.models.service import Service
-from app.models.user import User
 from app.schemas.invoice import InvoiceCreate, InvoiceFromAppointment, InvoiceResponse
 
 router = APIRouter()
 
 
-async def _get_owned_business(business_id: int, user: User, db: AsyncSession) -> Business:
-    result = await db.execute(
-        select(Business).where(Business.id == business_id, Business.owner_id == user.id)
-    )
-    biz = result.scalar_one_or_none()
-    if not biz:
-        raise HTTPException(status_code=404, detail="Afacere negasita")
-    return biz
-
-
 @router.get("/", response_model=list[InvoiceResponse])
 async def list_invoices(
     business_id: int,
     status: str | None = Query(None),
-    user: User = Depends(get_current_user),
+    biz: Business = Depends(get_owned_business),
     db: AsyncSession = Depends(get_db),
 ):
-    await _get_owned_business(business_id, user, db)
     query = select(Invoice).where(Invoice.business_id == business_id)
     if status:
         query = query.where(Invoice.status == status)
@@ -49,11 +37,9 @@ async def list_invoices(
 async def create_invoice(
     business_id: int,
     body: InvoiceCreate,
-    user: User = Depends(get_current_user),
+    biz: Business = Depends(get_owned_business),
     db: AsyncSession = Depends(get_db),
 ):
-    biz = await _get_owned_business(business_id, user, db)
-
     # Auto-increment invoice number
     last = await db.execute(
         select(func.max(Invoice.number)).where(Invoice.business_id == business_id)
@@ -108,12 +94,10 @@ async def create_invoice(
 async def create_invoice_from_appointment(
     business_id: int,
     body: InvoiceFromAppointment,
-    user: User = Depends(get_current_user),
+    biz: Business = Depends(get_owned_business),
     db: AsyncSession = Depends(get_db),
 ):
     """Auto-generate invoice from a completed appointment."""
-    biz = await _get_owned_business(business_id, user, db)
-
     apt_result = await db.execute(
         select(Appointment).where(
             Appointment.id == body.appointment_id,
@@ -203,10 +187,9 @@ async def mark_paid(
     business_id: int,
     invoice_id: int,
     payment_method: str = Query("cash"),
-    user: User = Depends(get_current_user),
+    biz: Business = Depends(get_owned_business),
     db: AsyncSession = Depends(get_db),
 ):
-    await _get_owned_business(business_id, user, db)
     result = await db.execute(
         select(Invoice).where(Invoice.id == invoice_id, Invoice.business_id == business_id)
     )
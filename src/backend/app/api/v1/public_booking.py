@@ -2,45 +2,103 @@
 
 from datetime import datetime, timedelta, timezone
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import and_, select
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import JSONResponse
+from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.deps import get_public_business
 from app.core.database import get_db
+from app.core.http_cache import check_not_modified, collection_version, conditional_get
+from app.core.principal import business_version
 from app.models.appointment import Appointment
 from app.models.business import Business
 from app.models.client import Client
 from app.models.employee import Employee, EmployeeService
 from app.models.service import Service
-from app.schemas.appointment import AvailabilityResponse, PublicBookingRequest, TimeSlot
-from app.schemas.business import BusinessPublicResponse
+from app.schemas.appointment import (
+    AvailabilityResponse,
+    MultiEmployeeAvailabilityResponse,
+    PublicBookingRequest,
+)
+from app.schemas.business import BusinessPublicResponse, PublicBookingBootstrapResponse
 from app.schemas.employee import EmployeePublicResponse
 from app.schemas.service import ServicePublicResponse
+from app.services.availability import (
+    MAX_RANGE_DAYS,
+    get_day_slots,
+    get_team_availability,
+    invalidate_employee_days,
+)
+from app.services.booking import BookingConflictError, flush_booking, has_external_block
+from app.services.public_catalog import get_booking_bootstrap
 
 router = APIRouter()
 
 
-@router.get("/{slug}", response_model=BusinessPublicResponse)
-async def get_public_profile(slug: str, db: AsyncSession = Depends(get_db)):
-    """Public business profile by slug."""
-    result = await db.execute(
-        select(Business).where(Business.slug == slug, Business.is_active == True)
-    )
-    biz = result.scalar_one_or_none()
-    if not biz:
-        raise HTTPException(status_code=404, detail="Afacere negasita")
-    return biz
+def _profile_version(biz: Business = Depends(get_public_business)):
+    return business_version(biz.updated_at)
 
 
-@router.get("/{slug}/services", response_model=list[ServicePublicResponse])
-async def get_public_services(slug: str, db: AsyncSession = Depends(get_db)):
-    result = await db.execute(
-        select(Business).where(Business.slug == slug, Business.is_active == True)
+async def _services_version(
+    biz: Business = Depends(get_public_business),
+    db: AsyncSession = Depends(get_db),
+):
+    return await collection_version(db, Service, Service.business_id == biz.id)
+
+
+async def _employees_version(
+    biz: Business = Depends(get_public_business),
+    db: AsyncSession = Depends(get_db),
+):
+    # Assignments have no timestamp of their own; they are only ever added
+    # (or cascade-deleted), so their count tracks them
+    assignments = await db.execute(
+        select(func.count())
+        .select_from(EmployeeService)
+        .join(Employee, EmployeeService.employee_id == Employee.id)
+        .where(Employee.business_id == biz.id)
     )
-    biz = result.scalar_one_or_none()
-    if not biz:
-        raise HTTPException(status_code=404, detail="Afacere negasita")
+    return await collection_version(db, Employee, Employee.business_id == biz.id), assignments.scalar()
+
+
+@router.get(
+    "/{slug}",
+    response_model=BusinessPublicResponse,
+    dependencies=[Depends(conditional_get("public_profile", _profile_version))],
+)
+async def get_public_profile(slug: str, biz: Business = Depends(get_public_business)):
+    """Public business profile by slug."""
+    return biz
+
 
+@router.get("/{slug}/bootstrap", response_model=PublicBookingBootstrapResponse)
+async def get_public_bootstrap(
+    slug: str,
+    request: Request,
+    biz: Business = Depends(get_public_business),
+    db: AsyncSession = Depends(get_db),
+):
+    """Profile, public services and employees in one response for the booking page.
+
+    Served from the public catalogue cache; answers 304 when the client's
+    If-None-Match still matches.
+    """
+    payload, etag = await get_booking_bootstrap(db, biz)
+    headers = check_not_modified(request, "public_bootstrap", etag)
+    return JSONResponse(payload, headers=headers)
+
+
+@router.get(
+    "/{slug}/services",
+    response_model=list[ServicePublicResponse],
+    dependencies=[Depends(conditional_get("public_services", _services_version))],
+)
+async def get_public_services(
+    slug: str,
+    biz: Business = Depends(get_public_business),
+    db: AsyncSession = Depends(get_db),
+):
     services = await db.execute(
         select(Service)
         .where(Service.business_id == biz.id, Service.is_active == True, Service.is_public == True)
@@ -49,19 +107,17 @@ async def get_public_services(slug: str, db: AsyncSession = Depends(get_db)):
     return services.scalars().all()
 
 
-@router.get("/{slug}/employees", response_model=list[EmployeePublicResponse])
+@router.get(
+    "/{slug}/employees",
+    response_model=list[EmployeePublicResponse],
+    dependencies=[Depends(conditional_get("public_employees", _employees_version))],
+)
 async def get_public_employees(
     slug: str,
     service_id: int | None = Query(None),
+    biz: Business = Depends(get_public_business),
     db: AsyncSession = Depends(get_db),
 ):
-    result = await db.execute(
-        select(Business).where(Business.slug == slug, Business.is_active == True)
-    )
-    biz = result.scalar_one_or_none()
-    if not biz:
-        raise HTTPException(status_code=404, detail="Afacere negasita")
-
     query = select(Employee).where(
         Employee.business_id == biz.id, Employee.is_active == True
     )
@@ -80,16 +136,10 @@ async def get_public_availability(
     employee_id: int = Query(...),
     service_id: int = Query(...),
     date: str = Query(..., description="YYYY-MM-DD"),
+    biz: Business = Depends(get_public_business),
     db: AsyncSession = Depends(get_db),
 ):
     """Public availability -- same logic as private but no auth."""
-    result = await db.execute(
-        select(Business).where(Business.slug == slug, Business.is_active == True)
-    )
-    biz = result.scalar_one_or_none()
-    if not biz:
-        raise HTTPException(status_code=404, detail="Afacere negasita")
-
     emp = await db.get(Employee, employee_id)
     if not emp or emp.business_id != biz.id or not emp.is_active:
         raise HTTPException(status_code=404, detail="Angajat negasit")
@@ -98,65 +148,59 @@ async def get_public_availability(
     if not svc or svc.business_id != biz.id:
         raise HTTPException(status_code=404, detail="Serviciu negasit")
 
-    day_map = {"0": "mon", "1": "tue", "2": "wed", "3": "thu", "4": "fri", "5": "sat", "6": "sun"}
     target_date = datetime.fromisoformat(date).date()
-    day_key = day_map[str(target_date.weekday())]
-    schedule_intervals = emp.weekly_schedule.get(day_key, [])
-
-    if not schedule_intervals:
-        return AvailabilityResponse(employee_id=employee_id, date=date, slots=[])
-
-    day_start = datetime(target_date.year, target_date.month, target_date.day, tzinfo=timezone.utc)
-    day_end = day_start + timedelta(days=1)
-
-    existing_result = await db.execute(
-        select(Appointment).where(
-            and_(
-                Appointment.employee_id == employee_id,
-                Appointment.status.in_(["pending", "confirmed", "in_progress"]),
-                Appointment.start_time >= day_start,
-                Appointment.start_time < day_end,
-            )
-        ).order_by(Appointment.start_time)
+    slots = await get_day_slots(
+        db,
+        employee_id,
+        emp.weekly_schedule,
+        target_date,
+        svc.duration_minutes + svc.buffer_after_minutes,
+        not_before=datetime.now(timezone.utc),  # Don't show past slots
+    )
+    return AvailabilityResponse(
+        employee_id=employee_id,
+        date=date,
+        slots=slots,
+        total_available=sum(1 for slot in slots if slot.available),
+        total_slots=len(slots),
     )
-    existing = existing_result.scalars().all()
-
-    slot_duration = svc.duration_minutes + svc.buffer_after_minutes
-    slots: list[TimeSlot] = []
 
-    for interval in schedule_intervals:
-        h_start, m_start = map(int, interval["start"].split(":"))
-        h_end, m_end = map(int, interval["end"].split(":"))
-        current = day_start.replace(hour=h_start, minute=m_start)
-        interval_end = day_start.replace(hour=h_end, minute=m_end)
 
-        while current + timedelta(minutes=slot_duration) <= interval_end:
-            slot_end = current + timedelta(minutes=slot_duration)
-            available = not any(
-                apt.start_time < slot_end and apt.end_time > current for apt in existing
-            )
-            # Don't show past slots
-            if current > datetime.now(timezone.utc):
-                slots.append(TimeSlot(start=current, end=slot_end, available=available))
-            current += timedelta(minutes=30)
+@router.get("/{slug}/availability/team", response_model=MultiEmployeeAvailabilityResponse)
+async def get_public_team_availability(
+    slug: str,
+    service_id: int = Query(...),
+    date: str = Query(..., description="YYYY-MM-DD (first day)"),
+    days: int = Query(1, ge=1, le=MAX_RANGE_DAYS),
+    employee_ids: list[int] | None = Query(None, description="None = all active employees"),
+    biz: Business = Depends(get_public_business),
+    db: AsyncSession = Depends(get_db),
+):
+    """Public team availability over a date range -- one call for the whole booking grid."""
+    svc = await db.get(Service, service_id)
+    if not svc or svc.business_id != biz.id:
+        raise HTTPException(status_code=404, detail="Serviciu negasit")
 
-    return AvailabilityResponse(employee_id=employee_id, date=date, slots=slots)
+    return await get_team_availability(
+        db,
+        business_id=biz.id,
+        service_id=service_id,
+        slot_minutes=svc.duration_minutes + svc.buffer_after_minutes,
+        date_from=datetime.fromisoformat(date).date(),
+        days=days,
+        employee_ids=employee_ids,
+        not_before=datetime.now(timezone.utc),
+    )
 
 
 @router.post("/{slug}/book", status_code=201)
 async def public_book(
     slug: str,
     body: PublicBookingRequest,
+    biz: Business = Depends(get_public_business),
     db: AsyncSession = Depends(get_db),
 ):
     """Public booking -- creates appointment + client record if needed."""
-    result = await db.execute(
-        select(Business).where(Business.slug == slug, Business.is_active == True)
-    )
-    biz = result.scalar_one_or_none()
-    if not biz:
-        raise HTTPException(status_code=404, detail="Afacere negasita")
-
     if not body.gdpr_consent:
         raise HTTPException(status_code=400, detail="Consimtamantul GDPR este obligatoriu")
 
@@ -171,18 +215,9 @@ async def public_book(
     duration = svc.duration_minutes
     end_time = body.start_time + timedelta(minutes=duration + svc.buffer_after_minutes)
 
-    # Conflict check
-    conflict = await db.execute(
-        select(Appointment).where(
-            and_(
-                Appointment.employee_id == body.employee_id,
-                Appointment.status.in_(["pending", "confirmed", "in_progress"]),
-                Appointment.start_time < end_time,
-                Appointment.end_time > body.start_time,
-            )
-        )
-    )
-    if conflict.scalar_one_or_none():
+    # Overlaps with other bookings are rejected by the exclusion constraint on
+    # insert (race-free under concurrent bookings); only iCal blocks need a check
+    if await has_external_block(db, body.employee_id, body.start_time, end_time):
         raise HTTPException(status_code=409, detail="Intervalul nu mai este disponibil")
 
     # Find or create client
@@ -225,7 +260,11 @@ async def public_book(
         status="confirmed" if biz.auto_confirm_bookings else "pending",
     )
     db.add(apt)
-    await db.flush()
+    try:
+        await flush_booking(db)
+    except BookingConflictError:
+        raise HTTPException(status_code=409, detail="Intervalul nu mai este disponibil")
+    invalidate_employee_days(db, apt.employee_id, apt.start_time, apt.end_time)
 
     return {
         "appointment_id": apt.id,
@@ -1,21 +1,19 @@
 """Reports & Analytics API -- detailed business intelligence for dashboard owners."""
 
-from datetime import datetime, timedelta, timezone
+from datetime import date as date_type, datetime, timedelta, timezone
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import and_, case, func, select, extract, text
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import Date, DateTime, and_, case, cast, func, select, extract, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.deps import get_owned_business
 from app.core.database import get_db
-from app.core.security import get_current_user
 from app.models.appointment import Appointment
 from app.models.business import Business
-from app.models.client import Client
+from app.models.daily_business_stats import DailyBusinessStats
 from app.models.employee import Employee
 from app.models.invoice import Invoice
-from app.models.notification import NotificationLog
 from app.models.service import Service
-from app.models.user import User
 
 router = APIRouter()
 
@@ -27,16 +25,6 @@ RO_MONTHS_SHORT = ["Ian", "Feb", "Mar", "Apr", "Mai", "Iun", "Iul", "Aug", "Sep"
 RO_DAYS = ["Luni", "Marti", "Miercuri", "Joi", "Vineri", "Sambata", "Duminica"]
 
 
-async def _get_owned_business(business_id: int, user: User, db: AsyncSession) -> Business:
-    result = await db.execute(
-        select(Business).where(Business.id == business_id, Business.owner_id == user.id)
-    )
-    biz = result.scalar_one_or_none()
-    if not biz:
-        raise HTTPException(status_code=404, detail="Afacere negasita")
-    return biz
-
-
 def _month_boundaries(year: int, month: int):
     """Return (start, end) datetime for a given month."""
     start = datetime(year, month, 1, tzinfo=timezone.utc)
@@ -51,77 +39,84 @@ def _month_boundaries(year: int, month: int):
 async def get_reports_overview(
     business_id: int,
     months: int = Query(default=6, ge=1, le=24, description="Number of months to include"),
-    user: User = Depends(get_current_user),
+    biz: Business = Depends(get_owned_business),
     db: AsyncSession = Depends(get_db),
 ):
-    """Comprehensive reports overview with multi-month analytics."""
-    await _get_owned_business(business_id, user, db)
+    """Comprehensive reports overview with multi-month analytics.
+
+    Monthly series, client growth, the daily breakdown and notification
+    costs read the daily_business_stats rollup; per-employee/service/hour
+    breakdowns still query appointments for the current month only.
+    """
 
     now = datetime.now(timezone.utc)
     biz_filter = Appointment.business_id == business_id
+    stats_filter = DailyBusinessStats.business_id == business_id
+    current_month_start, current_month_end = _month_boundaries(now.year, now.month)
 
-    # --- Revenue & Appointments by month (last N months) ---
-    monthly_data = []
-    for i in range(months - 1, -1, -1):
-        target_date = now - timedelta(days=30 * i)
-        month_start, month_end = _month_boundaries(target_date.year, target_date.month)
+    # --- Revenue, appointments and client growth by month (last N months) ---
+    # One grouped pass over the rollup; the running client total is a window
+    # sum over the tenant's whole history, so it is computed before the
+    # requested months are picked out.
+    report_months = []
+    for months_back in range(months - 1, -1, -1):
+        year, month = divmod(now.year * 12 + now.month - 1 - months_back, 12)
+        report_months.append(date_type(year, month + 1, 1))
 
-        result = await db.execute(
-            select(
-                func.count(Appointment.id).label("total_appointments"),
-                func.count(Appointment.id).filter(Appointment.status == "completed").label("completed"),
-                func.count(Appointment.id).filter(Appointment.status == "cancelled").label("cancelled"),
-                func.count(Appointment.id).filter(Appointment.status == "no_show").label("no_shows"),
-                func.coalesce(
-                    func.sum(Appointment.final_price).filter(Appointment.status == "completed"), 0
-                ).label("revenue"),
-            ).where(
-                biz_filter,
-                Appointment.start_time >= month_start,
-                Appointment.start_time < month_end,
-            )
+    month_bucket = cast(func.date_trunc("month", cast(DailyBusinessStats.day, DateTime)), Date)
+    by_month = (
+        select(
+            month_bucket.label("month"),
+            func.sum(DailyBusinessStats.appointments_total).label("total_appointments"),
+            func.sum(DailyBusinessStats.completed).label("completed"),
+            func.sum(DailyBusinessStats.cancelled).label("cancelled"),
+            func.sum(DailyBusinessStats.no_shows).label("no_shows"),
+            func.sum(DailyBusinessStats.revenue).label("revenue"),
+            func.sum(DailyBusinessStats.new_clients).label("new_clients"),
         )
-        row = result.one()
-        monthly_data.append({
-            "month": RO_MONTHS_SHORT[month_start.month - 1],
-            "month_full": RO_MONTHS[month_start.month - 1],
-            "year": month_start.year,
-            "total_appointments": int(row.total_appointments),
-            "completed": int(row.completed),
-            "cancelled": int(row.cancelled),
-            "no_shows": int(row.no_shows),
-            "revenue": round(float(row.revenue), 2),
-        })
+        .where(stats_filter, DailyBusinessStats.day < current_month_end.date())
+        .group_by(month_bucket)
+        .subquery()
+    )
+    monthly_result = await db.execute(
+        select(
+            by_month,
+            func.sum(by_month.c.new_clients).over(order_by=by_month.c.month).label("total_clients"),
+        ).order_by(by_month.c.month)
+    )
+    month_rows = {row.month: row for row in monthly_result.all()}
 
-    # --- Client growth by month ---
-    client_growth = []
-    for i in range(months - 1, -1, -1):
-        target_date = now - timedelta(days=30 * i)
-        month_start, month_end = _month_boundaries(target_date.year, target_date.month)
+    # Months without rollup rows keep the running total of the month before
+    total_clients = 0
+    for month, row in month_rows.items():
+        if month >= report_months[0]:
+            break
+        total_clients = int(row.total_clients)
 
-        new_clients_result = await db.execute(
-            select(func.count(Client.id)).where(
-                Client.business_id == business_id,
-                Client.created_at >= month_start,
-                Client.created_at < month_end,
-            )
-        )
-        total_by_end = await db.execute(
-            select(func.count(Client.id)).where(
-                Client.business_id == business_id,
-                Client.created_at < month_end,
-            )
-        )
+    monthly_data = []
+    client_growth = []
+    for month in report_months:
+        row = month_rows.get(month)
+        if row is not None:
+            total_clients = int(row.total_clients)
+        monthly_data.append({
+            "month": RO_MONTHS_SHORT[month.month - 1],
+            "month_full": RO_MONTHS[month.month - 1],
+            "year": month.year,
+            "total_appointments": int(row.total_appointments) if row else 0,
+            "completed": int(row.completed) if row else 0,
+            "cancelled": int(row.cancelled) if row else 0,
+            "no_shows": int(row.no_shows) if row else 0,
+            "revenue": round(float(row.revenue), 2) if row else 0.0,
+        })
         client_growth.append({
-            "month": RO_MONTHS_SHORT[month_start.month - 1],
-            "year": month_start.year,
-            "new_clients": new_clients_result.scalar() or 0,
-            "total_clients": total_by_end.scalar() or 0,
+            "month": RO_MONTHS_SHORT[month.month - 1],
+            "year": month.year,
+            "new_clients": int(row.new_clients) if row else 0,
+            "total_clients": total_clients,
         })
 
     # --- Employee performance (current month) ---
-    current_month_start, current_month_end = _month_boundaries(now.year, now.month)
-
     employee_perf_result = await db.execute(
         select(
             Employee.id,
@@ -244,26 +239,24 @@ async def get_reports_overview(
     thirty_days_ago = now - timedelta(days=30)
     daily_result = await db.execute(
         select(
-            func.date_trunc("day", Appointment.start_time).label("day"),
-            func.count(Appointment.id).label("total"),
-            func.count(Appointment.id).filter(Appointment.status == "completed").label("completed"),
-            func.count(Appointment.id).filter(Appointment.status == "no_show").label("no_shows"),
-            func.coalesce(
-                func.sum(Appointment.final_price).filter(Appointment.status == "completed"), 0
-            ).label("revenue"),
+            DailyBusinessStats.day,
+            DailyBusinessStats.appointments_total,
+            DailyBusinessStats.completed,
+            DailyBusinessStats.no_shows,
+            DailyBusinessStats.revenue,
         )
         .where(
-            biz_filter,
-            Appointment.start_time >= thirty_days_ago,
-            Appointment.start_time < now,
+            stats_filter,
+            DailyBusinessStats.day >= thirty_days_ago.date(),
+            DailyBusinessStats.day <= now.date(),
+            DailyBusinessStats.appointments_total > 0,
         )
-        .group_by("day")
-        .order_by("day")
+        .order_by(DailyBusinessStats.day)
     )
     daily_breakdown = [
         {
-            "date": row.day.strftime("%Y-%m-%d") if row.day else "",
-            "total": int(row.total),
+            "date": row.day.strftime("%Y-%m-%d"),
+            "total": int(row.appointments_total),
             "completed": int(row.completed),
             "no_shows": int(row.no_shows),
             "revenue": round(float(row.revenue), 2),
@@ -271,28 +264,8 @@ async def get_reports_overview(
         for row in daily_result.all()
     ]
 
-    # --- No-show analysis ---
-    total_scheduled = await db.execute(
-        select(func.count(Appointment.id)).where(
-            biz_filter,
-            Appointment.start_time >= current_month_start,
-            Appointment.start_time < current_month_end,
-        )
-    )
-    total_no_shows = await db.execute(
-        select(func.count(Appointment.id)).where(
-            biz_filter,
-            Appointment.start_time >= current_month_start,
-            Appointment.start_time < current_month_end,
-            Appointment.status == "no_show",
-        )
-    )
-    total_sched_count = total_scheduled.scalar() or 0
-    total_noshow_count = total_no_shows.scalar() or 0
-    overall_no_show_rate = round((total_noshow_count / total_sched_count) * 100, 1) if total_sched_count > 0 else 0
-
-    # No-shows by source
-    noshow_by_source_result = await db.execute(
+    # --- No-show analysis and booking sources (one grouped pass) ---
+    by_source_result = await db.execute(
         select(
             Appointment.source,
             func.count(Appointment.id).label("total"),
@@ -304,7 +277,14 @@ async def get_reports_overview(
             Appointment.start_time < current_month_end,
         )
         .group_by(Appointment.source)
+        .order_by(func.count(Appointment.id).desc())
     )
+    by_source_rows = by_source_result.all()
+
+    total_sched_count = sum(int(row.total) for row in by_source_rows)
+    total_noshow_count = sum(int(row.no_shows) for row in by_source_rows)
+    overall_no_show_rate = round((total_noshow_count / total_sched_count) * 100, 1) if total_sched_count > 0 else 0
+
     noshow_by_source = [
         {
             "source": row.source,
@@ -312,26 +292,11 @@ async def get_reports_overview(
             "no_shows": int(row.no_shows),
             "rate": round((int(row.no_shows) / int(row.total)) * 100, 1) if int(row.total) > 0 else 0,
         }
-        for row in noshow_by_source_result.all()
+        for row in by_source_rows
     ]
-
-    # --- Booking sources breakdown ---
-    source_result = await db.execute(
-        select(
-            Appointment.source,
-            func.count(Appointment.id).label("count"),
-        )
-        .where(
-            biz_filter,
-            Appointment.start_time >= current_month_start,
-            Appointment.start_time < current_month_end,
-        )
-        .group_by(Appointment.source)
-        .order_by(func.count(Appointment.id).desc())
-    )
     booking_sources = [
-        {"source": row.source, "count": int(row.count)}
-        for row in source_result.all()
+        {"source": row.source, "count": int(row.total)}
+        for row in by_source_rows
     ]
 
     # --- Payment method breakdown ---
@@ -368,15 +333,15 @@ async def get_reports_overview(
             func.count(Invoice.id).filter(Invoice.status == "draft").label("draft"),
             func.count(Invoice.id).filter(Invoice.status == "sent").label("sent"),
             func.count(Invoice.id).filter(Invoice.status == "overdue").label("overdue"),
-            func.coalesce(func.sum(Invoice.total_amount), 0).label("total_amount"),
+            func.coalesce(func.sum(Invoice.total), 0).label("total_amount"),
             func.coalesce(
-                func.sum(Invoice.total_amount).filter(Invoice.status == "paid"), 0
+                func.sum(Invoice.total).filter(Invoice.status == "paid"), 0
             ).label("paid_amount"),
         )
         .where(
             Invoice.business_id == business_id,
-            Invoice.issue_date >= current_month_start.date(),
-            Invoice.issue_date < current_month_end.date(),
+            Invoice.invoice_date >= current_month_start,
+            Invoice.invoice_date < current_month_end,
         )
     )
     invoice_row = invoice_result.one()
@@ -395,30 +360,23 @@ async def get_reports_overview(
 
     # --- Notification stats (current month) ---
     notif_result = await db.execute(
-        select(
-            NotificationLog.channel,
-            NotificationLog.status,
-            func.count(NotificationLog.id).label("count"),
-            func.coalesce(func.sum(NotificationLog.cost), 0).label("cost"),
-        )
-        .where(
-            NotificationLog.business_id == business_id,
-            NotificationLog.created_at >= current_month_start,
-            NotificationLog.created_at < current_month_end,
+        select(DailyBusinessStats.notifications_by_channel).where(
+            stats_filter,
+            DailyBusinessStats.day >= current_month_start.date(),
+            DailyBusinessStats.day < current_month_end.date(),
         )
-        .group_by(NotificationLog.channel, NotificationLog.status)
     )
     notification_stats = {}
-    for row in notif_result.all():
-        channel = row.channel
-        if channel not in notification_stats:
-            notification_stats[channel] = {"sent": 0, "delivered": 0, "failed": 0, "cost": 0.0}
-        if row.status in ("sent", "delivered"):
-            notification_stats[channel]["delivered"] += int(row.count)
-        elif row.status == "failed":
-            notification_stats[channel]["failed"] += int(row.count)
-        notification_stats[channel]["sent"] += int(row.count)
-        notification_stats[channel]["cost"] += round(float(row.cost), 2)
+    for by_channel in notif_result.scalars().all():
+        for channel, values in (by_channel or {}).items():
+            if channel not in notification_stats:
+                notification_stats[channel] = {"sent": 0, "delivered": 0, "failed": 0, "cost": 0.0}
+            notification_stats[channel]["sent"] += int(values.get("count", 0))
+            notification_stats[channel]["delivered"] += int(values.get("delivered", 0))
+            notification_stats[channel]["failed"] += int(values.get("failed", 0))
+            notification_stats[channel]["cost"] += float(values.get("cost", 0))
+    for channel_stats in notification_stats.values():
+        channel_stats["cost"] = round(channel_stats["cost"], 2)
 
     return {
         "period": {
@@ -4,11 +4,11 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.deps import get_owned_business
 from app.core.database import get_db
-from app.core.security import get_current_user
+from app.core.http_cache import collection_version, conditional_get
 from app.models.business import Business
 from app.models.service import Service, ServiceCategory
-from app.models.user import User
 from app.schemas.service import (
     ServiceCategoryCreate,
     ServiceCategoryResponse,
@@ -16,29 +16,19 @@ from app.schemas.service import (
     ServiceResponse,
     ServiceUpdate,
 )
+from app.services.public_catalog import invalidate_public_catalog
 
 router = APIRouter()
 
 
-async def _get_owned_business(business_id: int, user: User, db: AsyncSession) -> Business:
-    result = await db.execute(
-        select(Business).where(Business.id == business_id, Business.owner_id == user.id)
-    )
-    biz = result.scalar_one_or_none()
-    if not biz:
-        raise HTTPException(status_code=404, detail="Afacere negasita")
-    return biz
-
-
 # --- Categories ---
 
 @router.get("/categories", response_model=list[ServiceCategoryResponse])
 async def list_categories(
     business_id: int,
-    user: User = Depends(get_current_user),
+    biz: Business = Depends(get_owned_business),
     db: AsyncSession = Depends(get_db),
 ):
-    await _get_owned_business(business_id, user, db)
     result = await db.execute(
         select(ServiceCategory)
         .where(ServiceCategory.business_id == business_id)
@@ -51,10 +41,9 @@ async def list_categories(
 async def create_category(
     business_id: int,
     body: ServiceCategoryCreate,
-    user: User = Depends(get_current_user),
+    biz: Business = Depends(get_owned_business),
     db: AsyncSession = Depends(get_db),
 ):
-    await _get_owned_business(business_id, user, db)
     cat = ServiceCategory(business_id=business_id, **body.model_dump())
     db.add(cat)
     await db.flush()
@@ -63,13 +52,24 @@ async def create_category(
 
 # --- Services ---
 
-@router.get("/", response_model=list[ServiceResponse])
+async def _services_version(
+    business_id: int,
+    biz: Business = Depends(get_owned_business),
+    db: AsyncSession = Depends(get_db),
+):
+    return await collection_version(db, Service, Service.business_id == business_id)
+
+
+@router.get(
+    "/",
+    response_model=list[ServiceResponse],
+    dependencies=[Depends(conditional_get("services", _services_version))],
+)
 async def list_services(
     business_id: int,
-    user: User = Depends(get_current_user),
+    biz: Business = Depends(get_owned_business),
     db: AsyncSession = Depends(get_db),
 ):
-    await _get_owned_business(business_id, user, db)
     result = await db.execute(
         select(Service)
         .where(Service.business_id == business_id)
@@ -82,13 +82,13 @@ async def list_services(
 async def create_service(
     business_id: int,
     body: ServiceCreate,
-    user: User = Depends(get_current_user),
+    biz: Business = Depends(get_owned_business),
     db: AsyncSession = Depends(get_db),
 ):
-    await _get_owned_business(business_id, user, db)
     svc = Service(business_id=business_id, **body.model_dump())
     db.add(svc)
     await db.flush()
+    invalidate_public_catalog(db, business_id)
     return svc
 
 
@@ -97,10 +97,9 @@ async def update_service(
     business_id: int,
     service_id: int,
     body: ServiceUpdate,
-    user: User = Depends(get_current_user),
+    biz: Business = Depends(get_owned_business),
     db: AsyncSession = Depends(get_db),
 ):
-    await _get_owned_business(business_id, user, db)
     result = await db.execute(
         select(Service).where(Service.id == service_id, Service.business_id == business_id)
     )
@@ -111,6 +110,7 @@ async def update_service(
     for key, value in body.model_dump(exclude_unset=True).items():
         setattr(svc, key, value)
     await db.flush()
+    invalidate_public_catalog(db, business_id)
     return svc
 
 
@@ -118,10 +118,9 @@ async def update_service(
 async def delete_service(
     business_id: int,
     service_id: int,
-    user: User = Depends(get_current_user),
+    biz: Business = Depends(get_owned_business),
     db: AsyncSession = Depends(get_db),
 ):
-    await _get_owned_business(business_id, user, db)
     result = await db.execute(
         select(Service).where(Service.id == service_id, Service.business_id == business_id)
     )
@@ -129,3 +128,4 @@ async def delete_service(
     if not svc:
         raise HTTPException(status_code=404, detail="Serviciu negasit")
     await db.delete(svc)
+    invalidate_public_catalog(db, business_id)
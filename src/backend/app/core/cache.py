@@ -0,0 +1,202 @@
+"""Redis cache client (Cloud Memorystore) and post-commit invalidation.
+
+The cache is strictly best-effort: every helper swallows Redis errors and
+logs them, so an unavailable Redis degrades to "always miss" instead of
+failing the request.
+
+Invalidations are queued on the SQLAlchemy session and only sent to Redis
+after the transaction commits. Deleting before the commit would let a
+concurrent reader re-populate the cache from the pre-commit state. Readers
+in the same process call wait_for_invalidation() before going to Redis, so
+a request that follows a commit never sees the value it invalidated.
+
+LocalTTLCache is a small in-process LRU in front of Redis for very hot
+keys. Post-commit invalidations evict the same keys from every local cache
+in this process; other processes drop them when the (short) local TTL ends.
+"""
+
+import asyncio
+import logging
+import time
+import weakref
+from collections import OrderedDict
+from typing import Any
+
+from redis import asyncio as aioredis
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Session.info key holding the cache keys to delete after commit
+_PENDING_INVALIDATIONS = "cache_invalidations"
+
+# One client per event loop: redis.asyncio connections are bound to the loop
+# that created them (the API's serving loop, and in each Celery worker process
+# the long-lived loop that runs every task, see app.tasks.worker_loop)
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, aioredis.Redis]" = (
+    weakref.WeakKeyDictionary()
+)
+
+# Strong references to in-flight post-commit deletions
+_pending_tasks: set[asyncio.Task] = set()
+
+# Key -> its in-flight post-commit deletion (see wait_for_invalidation())
+_pending_deletions: dict[str, asyncio.Task] = {}
+
+# Local caches evicted by post-commit invalidations
+_local_caches: "weakref.WeakSet[LocalTTLCache]" = weakref.WeakSet()
+
+
+class LocalTTLCache:
+    """In-process LRU cache with a per-entry TTL."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        # Bumped by discard()/clear(); see set_unless_evicted()
+        self.evictions = 0
+        _local_caches.add(self)
+
+    def get(self, key: str) -> Any | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            self._entries.pop(key, None)
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def set_unless_evicted(self, key: str, value: Any, evictions: int) -> None:
+        """set(), unless anything was evicted since `evictions` was read.
+
+        For values loaded from the database: an invalidation that ran while
+        the load was in flight may concern the value being stored.
+        """
+        if self.evictions == evictions:
+            self.set(key, value)
+
+    def discard(self, key: str) -> None:
+        self._entries.pop(key, None)
+        self.evictions += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.evictions += 1
+
+
+def clear_local_caches() -> None:
+    """Empty every in-process cache (tests, or after bulk changes outside the ORM)."""
+    for local_cache in list(_local_caches):
+        local_cache.clear()
+
+
+def get_redis() -> aioredis.Redis | None:
+    """Return the Redis client for the running event loop (None if caching is disabled)."""
+    if not settings.CACHE_ENABLED:
+        return None
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        client = aioredis.from_url(
+            settings.REDIS_URL,
+            decode_responses=True,
+            socket_timeout=settings.CACHE_SOCKET_TIMEOUT_SECONDS,
+            socket_connect_timeout=settings.CACHE_SOCKET_TIMEOUT_SECONDS,
+        )
+        _clients[loop] = client
+    return client
+
+
+async def close_redis() -> None:
+    """Close the Redis client bound to the running event loop."""
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+async def delete_keys(*keys: str) -> None:
+    """Delete cache keys, ignoring Redis errors."""
+    redis = get_redis()
+    if redis is None or not keys:
+        return
+    try:
+        await redis.delete(*keys)
+    except Exception as cache_error:
+        logger.warning("Cache invalidation failed for %d keys: %s", len(keys), cache_error)
+
+
+def invalidate_after_commit(db: AsyncSession, *keys: str) -> None:
+    """Queue cache keys to be deleted once the session's transaction commits."""
+    queue_invalidation(db.sync_session, *keys)
+
+
+def queue_invalidation(session: Session, *keys: str) -> None:
+    """Same as invalidate_after_commit() for a sync Session (ORM event handlers)."""
+    session.info.setdefault(_PENDING_INVALIDATIONS, set()).update(keys)
+
+
+async def wait_for_invalidation(*keys: str) -> None:
+    """Wait until the post-commit deletions queued for these keys have reached Redis.
+
+    Call before reading the keys from Redis: a read racing the deletion would
+    return (and re-cache locally) the value the commit just invalidated.
+    """
+    loop = asyncio.get_running_loop()
+    tasks = {
+        task for key in keys
+        if (task := _pending_deletions.get(key)) is not None and task.get_loop() is loop
+    }
+    if tasks:
+        await asyncio.wait(tasks)
+
+
+def _forget_deletion(task: asyncio.Task, keys: set[str]) -> None:
+    _pending_tasks.discard(task)
+    for key in keys:
+        if _pending_deletions.get(key) is task:
+            del _pending_deletions[key]
+
+
+async def wait_for_pending_invalidations() -> None:
+    """Wait for queued post-commit deletions (call before a Celery task's loop exits)."""
+    if _pending_tasks:
+        await asyncio.gather(*list(_pending_tasks), return_exceptions=True)
+
+
+@event.listens_for(Session, "after_commit")
+def _send_invalidations(session: Session) -> None:
+    keys = session.info.pop(_PENDING_INVALIDATIONS, None)
+    if not keys:
+        return
+    for local_cache in list(_local_caches):
+        for key in keys:
+            local_cache.discard(key)
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        # Sync session outside an event loop: nothing async to schedule on
+        return
+    task = loop.create_task(delete_keys(*keys))
+    _pending_tasks.add(task)
+    for key in keys:
+        _pending_deletions[key] = task
+    task.add_done_callback(lambda done: _forget_deletion(done, keys))
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_invalidations(session: Session) -> None:
+    session.info.pop(_PENDING_INVALIDATIONS, None)
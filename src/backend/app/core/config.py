@@ -19,12 +19,43 @@ class Settings(BaseSettings):
 
     # Redis (Cloud Memorystore)
     REDIS_URL: str = "redis://localhost:6379/0"
+    CACHE_ENABLED: bool = True
+    CACHE_SOCKET_TIMEOUT_SECONDS: float = 0.5
+    AVAILABILITY_CACHE_TTL_SECONDS: int = 600
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 300
+    PRINCIPAL_LOCAL_TTL_SECONDS: float = 10.0  # bounds staleness in other worker processes
+    PRINCIPAL_LOCAL_MAX_ENTRIES: int = 2048
+    BUSINESS_CACHE_ENABLED: bool = True
+    BUSINESS_CACHE_TTL_SECONDS: int = 300
+    BUSINESS_CACHE_LOCAL_MAX_ENTRIES: int = 1024
+    PUBLIC_CACHE_ENABLED: bool = True
+    PUBLIC_CACHE_TTL_SECONDS: int = 300
+    PUBLIC_CACHE_LOCAL_TTL_SECONDS: float = 10.0  # bounds staleness in other worker processes
+    PUBLIC_CACHE_LOCAL_MAX_ENTRIES: int = 1024
+    # Cache-Control per conditional route (app.core.http_cache); others get the default
+    HTTP_CACHE_CONTROL_DEFAULT: str = "private, no-cache"
+    HTTP_CACHE_CONTROL: dict[str, str] = {
+        "public_profile": "public, max-age=60",
+        "public_services": "public, max-age=60",
+        "public_employees": "public, max-age=60",
+        "public_bootstrap": "public, max-age=60",
+    }
+
+    # Outbound HTTP (app.core.http; one pool per base URL and event loop)
+    HTTP_CLIENT_TIMEOUT_SECONDS: float = 30.0
+    HTTP_CLIENT_MAX_CONNECTIONS: int = 100
+    HTTP_CLIENT_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    HTTP_CLIENT_KEEPALIVE_EXPIRY_SECONDS: float = 30.0
+    HTTP_CLIENT_HTTP2: bool = True  # used when the h2 package is installed
 
     # Auth
     SECRET_KEY: str = "change-me-in-production"
     JWT_ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
     REFRESH_TOKEN_EXPIRE_DAYS: int = 30
+    PASSWORD_HASH_ROUNDS: int = 12  # bcrypt cost; existing hashes are upgraded on login
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_QUEUE: int = 64
 
     # Infobip (SMS / Viber / WhatsApp / Email)
     INFOBIP_BASE_URL: str = ""
@@ -32,6 +63,9 @@ class Settings(BaseSettings):
     INFOBIP_SENDER: str = "BookingCRM"
     INFOBIP_EMAIL_SENDER: str = "noreply@bookingcrm.ro"  # Infobip email sender address
     NOTIFICATION_STRATEGY: str = "whatsapp,sms,email"  # fallback order (RO: Viber not popular)
+    REMINDER_BATCH_SIZE: int = 500  # appointments loaded and committed per batch
+    REMINDER_SEND_CONCURRENCY: int = 20  # in-flight provider requests per worker
+    ICAL_SYNC_CONCURRENCY: int = 10  # sources synced at once; feeds download before taking a DB connection
 
     # e-Factura / ANAF
     ANAF_OAUTH_CLIENT_ID: str = ""
@@ -42,6 +76,7 @@ class Settings(BaseSettings):
     # Google Cloud Storage
     GCS_BUCKET: str = ""
     GCS_PROJECT_ID: str = ""
+    EXPORT_URL_TTL_MINUTES: int = 60  # lifetime of the signed download URL of a finished export
 
     # CORS
     CORS_ORIGINS: list[str] = ["http://localhost:3000", "http://localhost:3001", "http://localhost:3002", "http://localhost:5025"]
@@ -0,0 +1,77 @@
+"""Shared outbound HTTP clients (Infobip, ANAF, iCal feeds).
+
+One httpx.AsyncClient per base URL and event loop, reused for every call
+instead of a client per request: connections are kept alive and pooled per
+host, so repeat calls skip TCP/TLS setup. HTTP/2 is negotiated when the
+optional `h2` package is installed.
+
+Clients are bound to the loop that created them (like the Redis client):
+the FastAPI lifespan and the Celery worker loop each create their own at
+startup with open_http_clients() and close them on shutdown with
+close_http_clients(). Other base URLs are still created on first use.
+
+Timeouts and redirects are per call (pass `timeout=` / `follow_redirects=`
+to the request); pool limits come from the HTTP_* settings.
+"""
+
+import asyncio
+import importlib.util
+import logging
+import weakref
+
+import httpx
+
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[str, httpx.AsyncClient]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _build_client(base_url: str) -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        base_url=base_url,
+        http2=settings.HTTP_CLIENT_HTTP2 and HTTP2_AVAILABLE,
+        timeout=settings.HTTP_CLIENT_TIMEOUT_SECONDS,
+        limits=httpx.Limits(
+            max_connections=settings.HTTP_CLIENT_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HTTP_CLIENT_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.HTTP_CLIENT_KEEPALIVE_EXPIRY_SECONDS,
+        ),
+    )
+
+
+def get_http_client(base_url: str = "") -> httpx.AsyncClient:
+    """Return the pooled client for a base URL on the running event loop.
+
+    Use the client directly -- never in `async with`, which would close it
+    for every other caller.
+    """
+    loop = asyncio.get_running_loop()
+    loop_clients = _clients.setdefault(loop, {})
+    client = loop_clients.get(base_url)
+    if client is None or client.is_closed:
+        client = _build_client(base_url)
+        loop_clients[base_url] = client
+    return client
+
+
+async def open_http_clients() -> None:
+    """Create the clients for the known base URLs on the running event loop."""
+    for base_url in {"", settings.INFOBIP_BASE_URL}:
+        get_http_client(base_url)
+
+
+async def close_http_clients() -> None:
+    """Close every client bound to the running event loop."""
+    loop_clients = _clients.pop(asyncio.get_running_loop(), {})
+    for base_url, client in loop_clients.items():
+        try:
+            await client.aclose()
+        except Exception as close_error:
+            logger.warning("Failed to close HTTP client for %r: %s", base_url, close_error)
@@ -0,0 +1,70 @@
+"""HTTP conditional requests -- ETag, Cache-Control and 304 for read-mostly endpoints.
+
+Routes opt in with dependencies=[Depends(conditional_get(route, version))].
+`version` is itself a dependency returning a cheap validator for the
+resource -- a row's updated_at, or collection_version() (row count plus
+newest updated_at) for lists -- never the serialized body. The ETag is
+derived from it and the request's query string; when If-None-Match already
+matches, a 304 is raised before the handler body runs.
+
+Cache-Control is configured per route name in settings.HTTP_CACHE_CONTROL;
+routes without an entry use HTTP_CACHE_CONTROL_DEFAULT (revalidate every
+time, private to the browser).
+"""
+
+import hashlib
+from typing import Any, Callable
+
+from fastapi import Depends, HTTPException, Request, Response
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+
+settings = get_settings()
+
+
+def make_etag(*parts: Any) -> str:
+    """Weak ETag over validator parts (the representation is not byte-compared)."""
+    digest = hashlib.sha256("|".join(str(part) for part in parts).encode("utf-8")).hexdigest()
+    return f'W/"{digest[:32]}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag (RFC 9110 13.1.2)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque_tag = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque_tag for candidate in if_none_match.split(",")
+    )
+
+
+def cache_control_for(route: str) -> str:
+    return settings.HTTP_CACHE_CONTROL.get(route, settings.HTTP_CACHE_CONTROL_DEFAULT)
+
+
+def check_not_modified(request: Request, route: str, etag: str) -> dict[str, str]:
+    """Return the validator headers for a response, or raise 304 if the client is current."""
+    headers = {"ETag": etag, "Cache-Control": cache_control_for(route)}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        raise HTTPException(status_code=304, headers=headers)
+    return headers
+
+
+async def collection_version(db: AsyncSession, model, *criteria) -> tuple:
+    """(row count, newest updated_at) of a filtered table -- changes on insert, update and delete."""
+    result = await db.execute(select(func.count(), func.max(model.updated_at)).where(*criteria))
+    return tuple(result.one())
+
+
+def conditional_get(route: str, version: Callable[..., Any]) -> Callable:
+    """Build a route dependency that sets ETag/Cache-Control and answers 304 early."""
+
+    async def dependency(request: Request, response: Response, current=Depends(version)) -> None:
+        etag = make_etag(route, request.url.query, current)
+        response.headers.update(check_not_modified(request, route, etag))
+
+    return dependency
@@ -0,0 +1,234 @@
+"""Authenticated principal cache -- user snapshot and owned businesses per user id.
+
+get_current_user() used to SELECT the user on every authenticated request.
+The principal is now read from a short-TTL in-process LRU, then Redis, and
+only then from the database (one query for the user and their business ids).
+
+Owned businesses are kept as {business_id: version}, where the version is
+the row's updated_at. It keys the cross-request Business cache in
+app.api.deps, so a business update (new updated_at) makes older cached rows
+unreachable without deleting them.
+
+Entries are invalidated after commit by ORM events whenever a user row
+changes (deactivation, role, profile) or an owned business is created,
+updated or deleted, so handlers do not need to remember to do it.
+
+A fill must not store a snapshot read before a concurrent commit once that
+commit's invalidation has run, or e.g. a deactivated user would stay
+authenticated for PRINCIPAL_CACHE_TTL_SECONDS. Before reading the database
+a fill claims the Redis key with a placeholder, and afterwards stores the
+snapshot only if its placeholder is still there (compare-and-set): the
+invalidation deletes the key, placeholder included. The local copy is
+guarded the same way with LocalTTLCache.set_unless_evicted().
+"""
+
+import json
+import logging
+import uuid
+from datetime import datetime
+
+from sqlalchemy import event, func, inspect, select
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached, object_session
+
+from app.core.cache import (
+    LocalTTLCache,
+    delete_keys,
+    get_redis,
+    queue_invalidation,
+    wait_for_invalidation,
+)
+from app.core.config import get_settings
+from app.models.business import Business
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# User columns kept in the snapshot (never the password hash)
+PRINCIPAL_USER_FIELDS = (
+    "id",
+    "email",
+    "phone",
+    "full_name",
+    "role",
+    "is_active",
+    "is_verified",
+    "avatar_url",
+    "preferred_language",
+)
+
+_local_principals = LocalTTLCache(
+    max_entries=settings.PRINCIPAL_LOCAL_MAX_ENTRIES,
+    ttl_seconds=settings.PRINCIPAL_LOCAL_TTL_SECONDS,
+)
+
+
+class Principal:
+    """The authenticated user plus the businesses they own ({id: version})."""
+
+    __slots__ = ("user", "business_versions")
+
+    def __init__(self, user: User, business_versions: dict[int, str]):
+        self.user = user
+        self.business_versions = business_versions
+
+    @property
+    def business_ids(self) -> frozenset[int]:
+        return frozenset(self.business_versions)
+
+    def owns(self, business_id: int) -> bool:
+        return business_id in self.business_versions
+
+
+# How long an unfinished fill keeps other fills from writing to Redis
+PRINCIPAL_FILL_TTL_SECONDS = 30
+
+# SET the key only if it still holds this fill's placeholder
+_STORE_IF_CLAIMED = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('SET', KEYS[1], ARGV[2], 'EX', ARGV[3])
+end
+return false
+"""
+
+
+def principal_key(user_id: int) -> str:
+    return f"principal:{user_id}"
+
+
+def business_version(updated_at: datetime | None) -> str:
+    return updated_at.isoformat() if updated_at else "0"
+
+
+def _to_principal(snapshot: dict) -> Principal:
+    # Detached (not transient) so an accidental session.add() never INSERTs it
+    user = User(**snapshot["user"])
+    make_transient_to_detached(user)
+    return Principal(
+        user, {int(business_id): version for business_id, version in snapshot["businesses"].items()}
+    )
+
+
+async def _read_redis(key: str) -> dict | None:
+    redis = get_redis()
+    if redis is None:
+        return None
+    await wait_for_invalidation(key)
+    try:
+        raw = await redis.get(key)
+    except Exception as cache_error:
+        logger.warning("Principal cache read failed: %s", cache_error)
+        return None
+    if not raw:
+        return None
+    snapshot = json.loads(raw)
+    # A fill in progress elsewhere is a miss
+    return None if "filling" in snapshot else snapshot
+
+
+async def _claim_fill(key: str) -> str | None:
+    """Put a placeholder on a missing key; returns it, or None if the key is taken."""
+    redis = get_redis()
+    if redis is None:
+        return None
+    placeholder = json.dumps({"filling": uuid.uuid4().hex})
+    try:
+        claimed = await redis.set(key, placeholder, nx=True, ex=PRINCIPAL_FILL_TTL_SECONDS)
+    except Exception as cache_error:
+        logger.warning("Principal cache claim failed: %s", cache_error)
+        return None
+    return placeholder if claimed else None
+
+
+async def _store_if_claimed(key: str, placeholder: str, snapshot: dict) -> None:
+    redis = get_redis()
+    if redis is None:
+        return
+    try:
+        await redis.eval(
+            _STORE_IF_CLAIMED, 1, key, placeholder, json.dumps(snapshot),
+            settings.PRINCIPAL_CACHE_TTL_SECONDS,
+        )
+    except Exception as cache_error:
+        logger.warning("Principal cache write failed: %s", cache_error)
+
+
+async def _query_principal(db: AsyncSession, user_id: int) -> dict | None:
+    """Snapshot of the user and their business versions from the database."""
+    result = await db.execute(
+        select(
+            User,
+            func.array_agg(aggregate_order_by(Business.id, Business.id)).label("business_ids"),
+            func.array_agg(aggregate_order_by(Business.updated_at, Business.id)).label("versions"),
+        )
+        .outerjoin(Business, Business.owner_id == User.id)
+        .where(User.id == user_id)
+        .group_by(User.id)
+    )
+    row = result.one_or_none()
+    if row is None:
+        return None
+    return {
+        "user": {field: getattr(row.User, field) for field in PRINCIPAL_USER_FIELDS},
+        "businesses": {
+            str(business_id): business_version(updated_at)
+            for business_id, updated_at in zip(row.business_ids or [], row.versions or [])
+            if business_id is not None
+        },
+    }
+
+
+async def load_principal(db: AsyncSession, user_id: int) -> Principal | None:
+    """Return the principal for a user id (None if the user does not exist)."""
+    key = principal_key(user_id)
+    snapshot = _local_principals.get(key)
+    if snapshot is not None:
+        return _to_principal(snapshot)
+
+    evictions = _local_principals.evictions
+    snapshot = await _read_redis(key)
+    if snapshot is None:
+        placeholder = await _claim_fill(key)
+        snapshot = await _query_principal(db, user_id)
+        if snapshot is None:
+            return None
+        if placeholder is not None:
+            await _store_if_claimed(key, placeholder, snapshot)
+    _local_principals.set_unless_evicted(key, snapshot, evictions)
+    return _to_principal(snapshot)
+
+
+async def evict_principal(user_id: int) -> None:
+    """Drop a user's cached principal right away (local copy and Redis)."""
+    key = principal_key(user_id)
+    _local_principals.discard(key)
+    await delete_keys(key)
+
+
+@event.listens_for(User, "after_update")
+def _invalidate_updated_user(mapper, connection, target: User) -> None:
+    session = object_session(target)
+    if session is not None:
+        queue_invalidation(session, principal_key(target.id))
+
+
+@event.listens_for(Business, "after_insert")
+@event.listens_for(Business, "after_delete")
+def _invalidate_business_owner(mapper, connection, target: Business) -> None:
+    session = object_session(target)
+    if session is not None:
+        queue_invalidation(session, principal_key(target.owner_id))
+
+
+@event.listens_for(Business, "after_update")
+def _invalidate_business_owner_on_update(mapper, connection, target: Business) -> None:
+    # Any update bumps updated_at (the cached version); an owner change also
+    # affects the previous owner
+    session = object_session(target)
+    if session is None:
+        return
+    history = inspect(target).attrs.owner_id.history
+    owner_ids = {target.owner_id, *(owner_id for owner_id in history.deleted if owner_id is not None)}
+    queue_invalidation(session, *(principal_key(owner_id) for owner_id in owner_ids))
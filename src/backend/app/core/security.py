@@ -1,24 +1,45 @@
 """Authentication and authorization utilities."""
 
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 
 import bcrypt
 import jwt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import get_settings
 from app.core.database import get_db
+from app.core.principal import Principal, load_principal
 
+logger = logging.getLogger(__name__)
 settings = get_settings()
 bearer_scheme = HTTPBearer()
 
+# bcrypt releases the GIL while hashing, so a small thread pool runs hashes in
+# parallel without blocking the event loop. Requests beyond workers + queue
+# are rejected with 503 instead of piling up behind a login burst.
+_password_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash"
+)
+_password_hash_stats = {
+    "pending": 0,
+    "completed": 0,
+    "rejected": 0,
+    "total_wait_ms": 0.0,
+    "max_wait_ms": 0.0,
+}
+# The executor's queueing metrics are logged every this many hashes (and on shutdown)
+PASSWORD_STATS_LOG_EVERY = 1000
+
 
 def hash_password(password: str) -> str:
     password_bytes = password.encode("utf-8")
-    salt = bcrypt.gensalt(rounds=12)
+    salt = bcrypt.gensalt(rounds=settings.PASSWORD_HASH_ROUNDS)
     hashed = bcrypt.hashpw(password_bytes, salt)
     return hashed.decode("utf-8")
 
@@ -29,6 +50,72 @@ def verify_password(plain: str, hashed: str) -> bool:
     return bcrypt.checkpw(plain_bytes, hashed_bytes)
 
 
+def password_needs_rehash(hashed: str) -> bool:
+    """Check whether a bcrypt hash was made with a different cost than configured."""
+    try:
+        return int(hashed.split("$")[2]) != settings.PASSWORD_HASH_ROUNDS
+    except (IndexError, ValueError):
+        return True
+
+
+async def _run_password_job(func, *args):
+    """Run a bcrypt call on the bounded password executor."""
+    capacity = settings.PASSWORD_HASH_WORKERS + settings.PASSWORD_HASH_MAX_QUEUE
+    if _password_hash_stats["pending"] >= capacity:
+        _password_hash_stats["rejected"] += 1
+        logger.warning(
+            "Password hash queue full (%d pending), rejecting request: %s", capacity, password_hasher_stats()
+        )
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server ocupat, incercati din nou in cateva secunde",
+        )
+
+    submitted = time.perf_counter()
+
+    def job():
+        waited = time.perf_counter() - submitted
+        return waited, func(*args)
+
+    _password_hash_stats["pending"] += 1
+    try:
+        waited, result = await asyncio.get_running_loop().run_in_executor(_password_executor, job)
+    finally:
+        _password_hash_stats["pending"] -= 1
+
+    wait_ms = waited * 1000
+    _password_hash_stats["completed"] += 1
+    _password_hash_stats["total_wait_ms"] += wait_ms
+    _password_hash_stats["max_wait_ms"] = max(_password_hash_stats["max_wait_ms"], wait_ms)
+    if _password_hash_stats["completed"] % PASSWORD_STATS_LOG_EVERY == 0:
+        logger.info("Password hasher stats: %s", password_hasher_stats())
+    return result
+
+
+async def hash_password_async(password: str) -> str:
+    """hash_password() off the event loop."""
+    return await _run_password_job(hash_password, password)
+
+
+async def verify_password_async(plain: str, hashed: str) -> bool:
+    """verify_password() off the event loop."""
+    return await _run_password_job(verify_password, plain, hashed)
+
+
+def password_hasher_stats() -> dict:
+    """Queueing metrics for the password executor (logged, not exposed over HTTP)."""
+    completed = _password_hash_stats["completed"]
+    return {
+        "workers": settings.PASSWORD_HASH_WORKERS,
+        "max_queue": settings.PASSWORD_HASH_MAX_QUEUE,
+        "pending": _password_hash_stats["pending"],
+        "completed": completed,
+        "rejected": _password_hash_stats["rejected"],
+        "avg_wait_ms": round(_password_hash_stats["total_wait_ms"] / completed, 2) if completed else 0.0,
+        "max_wait_ms": round(_password_hash_stats["max_wait_ms"], 2),
+    }
+
+
 def create_access_token(data: dict, expires_delta: timedelta | None = None) -> str:
     to_encode = data.copy()
     expire = datetime.now(timezone.utc) + (
@@ -54,13 +141,14 @@ def decode_token(token: str) -> dict:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token invalid")
 
 
-async def get_current_user(
+async def get_current_principal(
     credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
     db: AsyncSession = Depends(get_db),
-):
-    """Extract current user from JWT Bearer token."""
-    from app.models.user import User
+) -> Principal:
+    """Extract the current principal (user + owned business ids) from the JWT Bearer token.
 
+    Served from the principal cache; the database is only hit on a miss.
+    """
     payload = decode_token(credentials.credentials)
     if payload.get("type") != "access":
         raise HTTPException(status_code=401, detail="Token invalid")
@@ -69,11 +157,15 @@ async def get_current_user(
     if not user_id:
         raise HTTPException(status_code=401, detail="Token invalid")
 
-    result = await db.execute(select(User).where(User.id == int(user_id)))
-    user = result.scalar_one_or_none()
-    if not user or not user.is_active:
+    principal = await load_principal(db, int(user_id))
+    if not principal or not principal.user.is_active:
         raise HTTPException(status_code=401, detail="Utilizator inactiv sau inexistent")
-    return user
+    return principal
+
+
+async def get_current_user(principal: Principal = Depends(get_current_principal)):
+    """Extract current user from JWT Bearer token."""
+    return principal.user
 
 
 async def require_admin(user=Depends(get_current_user)):
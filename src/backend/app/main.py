@@ -1,19 +1,38 @@
 """BookingCRM SaaS -- FastAPI application entry point."""
 
+import logging
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.api.v1 import auth, businesses, services, employees, clients, appointments, public_booking, invoices, ical, notifications, dashboard, reports
+from app.api.v1 import auth, businesses, services, employees, clients, appointments, public_booking, invoices, ical, notifications, dashboard, reports, exports
+from app.core.cache import close_redis
 from app.core.config import get_settings
+from app.core.http import close_http_clients, open_http_clients
+from app.core.security import password_hasher_stats
 
+logger = logging.getLogger(__name__)
 settings = get_settings()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await open_http_clients()
+    yield
+    logger.info("Password hasher stats at shutdown: %s", password_hasher_stats())
+    # Pooled outbound HTTP clients and the Redis client belong to the serving loop
+    await close_http_clients()
+    await close_redis()
+
+
 app = FastAPI(
     title=settings.APP_NAME,
     version=settings.APP_VERSION,
     description="SaaS Booking + CRM + ERP platform for Romanian businesses",
     docs_url="/docs",
     redoc_url="/redoc",
+    lifespan=lifespan,
 )
 
 # CORS
@@ -23,12 +42,16 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 # Health check
 @app.get("/health")
 async def health():
-    return {"status": "ok", "version": settings.APP_VERSION}
+    return {
+        "status": "ok",
+        "version": settings.APP_VERSION,
+    }
 
 
 # API v1 routes
@@ -45,6 +68,7 @@ app.include_router(ical.router, prefix=f"{API_PREFIX}/businesses/{{business_id}}
 app.include_router(notifications.router, prefix=f"{API_PREFIX}/businesses/{{business_id}}/notifications", tags=["Notifications"])
 app.include_router(dashboard.router, prefix=f"{API_PREFIX}/businesses/{{business_id}}/dashboard", tags=["Dashboard"])
 app.include_router(reports.router, prefix=f"{API_PREFIX}/businesses/{{business_id}}/reports", tags=["Reports"])
+app.include_router(exports.router, prefix=f"{API_PREFIX}/businesses/{{business_id}}/exports", tags=["Exports"])
 
 # Public routes (no auth)
 app.include_router(public_booking.router, prefix=f"{API_PREFIX}/book", tags=["Public Booking"])
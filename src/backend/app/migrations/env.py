@@ -11,7 +11,7 @@ from sqlalchemy.ext.asyncio import async_engine_from_config
 from app.core.database import Base
 
 # Import all models so Alembic detects them
-from app.models import user, business, employee, service, client, appointment, notification, ical_source, invoice  # noqa: F401
+from app.models import user, business, employee, service, client, appointment, notification, ical_source, invoice, daily_business_stats  # noqa: F401
 
 config = context.config
 if config.config_file_name is not None:
@@ -0,0 +1,30 @@
+"""ical source feed validators (ETag, Last-Modified, content hash)
+
+Revision ID: a3d9e6b2c8f1
+Revises: f1c7a2e9d3b4
+Create Date: 2026-10-17 18:11:47.902553
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision: str = 'a3d9e6b2c8f1'
+down_revision: Union[str, None] = 'f1c7a2e9d3b4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('ical_sources', sa.Column('feed_etag', sa.String(length=500), nullable=True))
+    op.add_column('ical_sources', sa.Column('feed_last_modified', sa.String(length=100), nullable=True))
+    op.add_column('ical_sources', sa.Column('feed_content_hash', sa.String(length=64), nullable=True))
+    op.add_column('ical_sources', sa.Column('last_full_sync_at', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('ical_sources', 'last_full_sync_at')
+    op.drop_column('ical_sources', 'feed_content_hash')
+    op.drop_column('ical_sources', 'feed_last_modified')
+    op.drop_column('ical_sources', 'feed_etag')
@@ -0,0 +1,33 @@
+"""unique ical_uid per ical source on appointments
+
+Revision ID: b8e4f2a7c1d9
+Revises: a3d9e6b2c8f1
+Create Date: 2026-10-17 19:02:36.418027
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers
+revision: str = 'b8e4f2a7c1d9'
+down_revision: Union[str, None] = 'a3d9e6b2c8f1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Feeds repeating a UID (modified instances of a recurring event) could
+    # import it more than once; keep the oldest block of each UID
+    op.execute(
+        "DELETE FROM appointments AS duplicate USING appointments AS kept "
+        "WHERE duplicate.ical_source_id = kept.ical_source_id "
+        "AND duplicate.ical_uid = kept.ical_uid "
+        "AND duplicate.id > kept.id"
+    )
+    op.create_unique_constraint(
+        'uq_appointments_ical_source_uid', 'appointments', ['ical_source_id', 'ical_uid']
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint('uq_appointments_ical_source_uid', 'appointments', type_='unique')
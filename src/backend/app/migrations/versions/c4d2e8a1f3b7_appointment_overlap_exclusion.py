@@ -0,0 +1,77 @@
+"""appointment overlap exclusion constraint
+
+Revision ID: c4d2e8a1f3b7
+Revises: b70b1b7c356b
+Create Date: 2026-10-17 09:12:41.318205
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision: str = 'c4d2e8a1f3b7'
+down_revision: Union[str, None] = 'b70b1b7c356b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ACTIVE_BOOKING = "{table}.status IN ('pending', 'confirmed', 'in_progress') AND {table}.source <> 'ical_block'"
+
+# Conflicts listed in the error before "... and N more"
+MAX_LISTED_OVERLAPS = 50
+
+
+def _check_existing_overlaps() -> None:
+    """Stop the upgrade if active bookings already overlap: ADD CONSTRAINT would fail on them.
+
+    Which side of a double-booking to cancel is a business decision, so the
+    conflicting ids are reported instead of being changed here. Resolve them
+    (scripts/cancel_overlapping_appointments.py lists them and can cancel the
+    later-booked side once reviewed), then run the upgrade again.
+    """
+    overlaps = op.get_bind().execute(sa.text(
+        f"""
+        SELECT a.employee_id, a.id, b.id
+        FROM appointments a
+        JOIN appointments b
+          ON b.employee_id = a.employee_id
+         AND b.id > a.id
+         AND tstzrange(b.start_time, b.end_time) && tstzrange(a.start_time, a.end_time)
+        WHERE {ACTIVE_BOOKING.format(table='a')} AND {ACTIVE_BOOKING.format(table='b')}
+        ORDER BY a.employee_id, a.id, b.id
+        """
+    )).all()
+    if not overlaps:
+        return
+    listed = "; ".join(
+        f"employee {employee_id}: {first_id} & {second_id}"
+        for employee_id, first_id, second_id in overlaps[:MAX_LISTED_OVERLAPS]
+    )
+    if len(overlaps) > MAX_LISTED_OVERLAPS:
+        listed += f"; ... and {len(overlaps) - MAX_LISTED_OVERLAPS} more"
+    raise RuntimeError(
+        f"Cannot add ex_appointments_employee_no_overlap: {len(overlaps)} pairs of active "
+        f"appointments overlap ({listed}). Resolve them (see "
+        "scripts/cancel_overlapping_appointments.py) and run the upgrade again."
+    )
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+    # ADD CONSTRAINT fails on existing double-bookings
+    _check_existing_overlaps()
+    op.execute(
+        """
+        ALTER TABLE appointments
+        ADD CONSTRAINT ex_appointments_employee_no_overlap
+        EXCLUDE USING gist (
+            employee_id WITH =,
+            tstzrange(start_time, end_time) WITH &&
+        )
+        WHERE (status IN ('pending', 'confirmed', 'in_progress') AND source <> 'ical_block')
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE appointments DROP CONSTRAINT IF EXISTS ex_appointments_employee_no_overlap")
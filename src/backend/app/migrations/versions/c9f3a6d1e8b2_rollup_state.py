@@ -0,0 +1,34 @@
+"""rollup_state watermark for the incremental daily stats refresh
+
+Revision ID: c9f3a6d1e8b2
+Revises: b8e4f2a7c1d9
+Create Date: 2026-10-17 20:14:52.306118
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision: str = 'c9f3a6d1e8b2'
+down_revision: Union[str, None] = 'b8e4f2a7c1d9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('rollup_state',
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.Column('watermark', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+    # Continue from where the previous (refreshed_at based) watermark was
+    op.execute(
+        "INSERT INTO rollup_state (name, watermark) "
+        "SELECT 'daily_business_stats', max(refreshed_at) FROM daily_business_stats "
+        "HAVING max(refreshed_at) IS NOT NULL"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('rollup_state')
@@ -0,0 +1,54 @@
+"""daily business stats rollup
+
+Revision ID: d7a3f9c2b5e1
+Revises: c4d2e8a1f3b7
+Create Date: 2026-10-17 10:02:17.584310
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers
+revision: str = 'd7a3f9c2b5e1'
+down_revision: Union[str, None] = 'c4d2e8a1f3b7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('daily_business_stats',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('business_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('appointments_total', sa.Integer(), nullable=False),
+    sa.Column('pending', sa.Integer(), nullable=False),
+    sa.Column('confirmed', sa.Integer(), nullable=False),
+    sa.Column('in_progress', sa.Integer(), nullable=False),
+    sa.Column('completed', sa.Integer(), nullable=False),
+    sa.Column('cancelled', sa.Integer(), nullable=False),
+    sa.Column('no_shows', sa.Integer(), nullable=False),
+    sa.Column('revenue', sa.Float(), nullable=False),
+    sa.Column('revenue_expected', sa.Float(), nullable=False),
+    sa.Column('new_clients', sa.Integer(), nullable=False),
+    sa.Column('notifications_count', sa.Integer(), nullable=False),
+    sa.Column('notifications_cost', sa.Float(), nullable=False),
+    sa.Column('notifications_by_channel', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('refreshed_at', sa.DateTime(timezone=True), nullable=False),
+    sa.ForeignKeyConstraint(['business_id'], ['businesses.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('business_id', 'day', name='uq_daily_business_stats_business_day')
+    )
+    # Incremental refresh uses updated_at/created_at watermarks on the raw tables
+    op.create_index('ix_appointments_updated_at', 'appointments', ['updated_at'], unique=False)
+    op.create_index('ix_clients_created_at', 'clients', ['created_at'], unique=False)
+    op.create_index('ix_notification_logs_created_at', 'notification_logs', ['created_at'], unique=False)
+    # Run once after upgrading: python -m app.tasks.rollup_tasks backfill
+
+
+def downgrade() -> None:
+    op.drop_index('ix_notification_logs_created_at', table_name='notification_logs')
+    op.drop_index('ix_clients_created_at', table_name='clients')
+    op.drop_index('ix_appointments_updated_at', table_name='appointments')
+    op.drop_table('daily_business_stats')
@@ -0,0 +1,27 @@
+"""service updated_at (HTTP cache validators)
+
+Revision ID: e5b8c1d4a9f2
+Revises: d7a3f9c2b5e1
+Create Date: 2026-10-17 15:02:18.440917
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision: str = 'e5b8c1d4a9f2'
+down_revision: Union[str, None] = 'd7a3f9c2b5e1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Existing rows start at their creation time
+    op.add_column('services', sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True))
+    op.execute("UPDATE services SET updated_at = COALESCE(created_at, now())")
+    op.alter_column('services', 'updated_at', nullable=False)
+
+
+def downgrade() -> None:
+    op.drop_column('services', 'updated_at')
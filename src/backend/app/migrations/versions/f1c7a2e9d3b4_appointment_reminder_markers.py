@@ -0,0 +1,52 @@
+"""appointment reminder sent markers
+
+Revision ID: f1c7a2e9d3b4
+Revises: e5b8c1d4a9f2
+Create Date: 2026-10-17 16:40:05.271634
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision: str = 'f1c7a2e9d3b4'
+down_revision: Union[str, None] = 'e5b8c1d4a9f2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+DUE_PREDICATE = "{column} IS NULL AND client_id IS NOT NULL AND status IN ('pending', 'confirmed')"
+
+
+def upgrade() -> None:
+    op.add_column('appointments', sa.Column('reminder_24h_sent_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('appointments', sa.Column('reminder_1h_sent_at', sa.DateTime(timezone=True), nullable=True))
+
+    # Reminders inside the current windows (and everything in the past) were
+    # already handled by the window-based task; without this they would be
+    # sent again on the first run and past rows would bloat the partial indexes.
+    # updated_at is left alone so the daily stats rollup does not see them as dirty.
+    op.execute(
+        "UPDATE appointments SET reminder_24h_sent_at = now() "
+        "WHERE start_time <= now() + interval '24 hours 30 minutes'"
+    )
+    op.execute(
+        "UPDATE appointments SET reminder_1h_sent_at = now() "
+        "WHERE start_time <= now() + interval '1 hour 30 minutes'"
+    )
+
+    op.create_index(
+        'ix_appointments_reminder_24h_due', 'appointments', ['start_time'], unique=False,
+        postgresql_where=sa.text(DUE_PREDICATE.format(column='reminder_24h_sent_at')),
+    )
+    op.create_index(
+        'ix_appointments_reminder_1h_due', 'appointments', ['start_time'], unique=False,
+        postgresql_where=sa.text(DUE_PREDICATE.format(column='reminder_1h_sent_at')),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_appointments_reminder_1h_due', table_name='appointments')
+    op.drop_index('ix_appointments_reminder_24h_due', table_name='appointments')
+    op.drop_column('appointments', 'reminder_1h_sent_at')
+    op.drop_column('appointments', 'reminder_24h_sent_at')
@@ -9,6 +9,7 @@ from app.models.appointment import Appointment
 from app.models.notification import NotificationLog
 from app.models.ical_source import ICalSource
 from app.models.invoice import Invoice
+from app.models.daily_business_stats import DailyBusinessStats, RollupState
 
 __all__ = [
     "User",
@@ -22,4 +23,6 @@ __all__ = [
     "NotificationLog",
     "ICalSource",
     "Invoice",
+    "DailyBusinessStats",
+    "RollupState",
 ]
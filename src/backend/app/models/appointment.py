@@ -3,6 +3,7 @@
 from datetime import datetime, timezone
 
 from sqlalchemy import (
+    DDL,
     DateTime,
     Float,
     ForeignKey,
@@ -10,12 +11,22 @@ from sqlalchemy import (
     Integer,
     String,
     Text,
+    UniqueConstraint,
+    event,
+    func,
+    text,
 )
-from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.dialects.postgresql import JSONB, ExcludeConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.core.database import Base
 
+# Name of the exclusion constraint that rejects overlapping bookings (SQLSTATE 23P01)
+EMPLOYEE_OVERLAP_CONSTRAINT = "ex_appointments_employee_no_overlap"
+
+# Unique (ical_source_id, ical_uid) of imported calendar blocks
+ICAL_BLOCK_UID_CONSTRAINT = "uq_appointments_ical_source_uid"
+
 
 class Appointment(Base):
     __tablename__ = "appointments"
@@ -26,6 +37,27 @@ class Appointment(Base):
         Index("ix_appointments_business_date", "business_id", "start_time"),
         # Index for client history
         Index("ix_appointments_client", "client_id", "start_time"),
+        # One block per feed event: conflict target of the iCal sync upsert
+        UniqueConstraint("ical_source_id", "ical_uid", name=ICAL_BLOCK_UID_CONSTRAINT),
+        # Watermark scan for the daily stats rollup
+        Index("ix_appointments_updated_at", "updated_at"),
+        # Appointments still waiting for a reminder (claimed by app.tasks.reminders)
+        Index(
+            "ix_appointments_reminder_24h_due",
+            "start_time",
+            postgresql_where=text(
+                "reminder_24h_sent_at IS NULL AND client_id IS NOT NULL"
+                " AND status IN ('pending', 'confirmed')"
+            ),
+        ),
+        Index(
+            "ix_appointments_reminder_1h_due",
+            "start_time",
+            postgresql_where=text(
+                "reminder_1h_sent_at IS NULL AND client_id IS NOT NULL"
+                " AND status IN ('pending', 'confirmed')"
+            ),
+        ),
     )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
@@ -109,6 +141,14 @@ class Appointment(Base):
     )  # client | employee | system
     cancellation_reason: Mapped[str | None] = mapped_column(Text, nullable=True)
 
+    # Reminders: set once the reminder has been handled (sent, failed or too late)
+    reminder_24h_sent_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+    reminder_1h_sent_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
     )
@@ -128,3 +168,24 @@ class Appointment(Base):
     notifications = relationship(
         "NotificationLog", back_populates="appointment", cascade="all, delete-orphan"
     )
+
+
+# Race-free double-booking protection: an employee cannot hold two active
+# bookings whose [start, end) ranges overlap. iCal blocks are excluded --
+# external feeds may legitimately overlap each other and our own bookings.
+Appointment.__table__.append_constraint(
+    ExcludeConstraint(
+        (Appointment.__table__.c.employee_id, "="),
+        (func.tstzrange(Appointment.__table__.c.start_time, Appointment.__table__.c.end_time), "&&"),
+        name=EMPLOYEE_OVERLAP_CONSTRAINT,
+        using="gist",
+        where=text("status IN ('pending', 'confirmed', 'in_progress') AND source <> 'ical_block'"),
+    )
+)
+
+# btree_gist provides the gist operator class for `employee_id WITH =`
+event.listen(
+    Appointment.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS btree_gist").execute_if(dialect="postgresql"),
+)
@@ -7,6 +7,7 @@ from sqlalchemy import (
     DateTime,
     Float,
     ForeignKey,
+    Index,
     Integer,
     String,
     Text,
@@ -19,6 +20,10 @@ from app.core.database import Base
 
 class Client(Base):
     __tablename__ = "clients"
+    __table_args__ = (
+        # Watermark scan for the daily stats rollup
+        Index("ix_clients_created_at", "created_at"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     business_id: Mapped[int] = mapped_column(
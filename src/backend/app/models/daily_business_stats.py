@@ -0,0 +1,75 @@
+"""Daily business stats -- per-business, per-day rollup of appointments, clients and notifications.
+
+Maintained incrementally by app.tasks.rollup_tasks so dashboards and reports
+read a few hundred pre-aggregated rows instead of re-scanning raw history.
+Days are UTC calendar days (same bucketing as the dashboard).
+
+RollupState holds the incremental refresh's watermark, kept apart from the
+rows' refreshed_at: those are also stamped by the nightly sweep, backfills
+and ad-hoc refreshes, none of which look at the dirty days.
+"""
+
+from datetime import date, datetime, timezone
+
+from sqlalchemy import (
+    Date,
+    DateTime,
+    Float,
+    ForeignKey,
+    Integer,
+    String,
+    UniqueConstraint,
+)
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database import Base
+
+
+class DailyBusinessStats(Base):
+    __tablename__ = "daily_business_stats"
+    __table_args__ = (
+        UniqueConstraint("business_id", "day", name="uq_daily_business_stats_business_day"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    business_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("businesses.id", ondelete="CASCADE"), nullable=False
+    )
+    day: Mapped[date] = mapped_column(Date, nullable=False)
+
+    # Appointments starting on this day, by status
+    appointments_total: Mapped[int] = mapped_column(Integer, default=0)
+    pending: Mapped[int] = mapped_column(Integer, default=0)
+    confirmed: Mapped[int] = mapped_column(Integer, default=0)
+    in_progress: Mapped[int] = mapped_column(Integer, default=0)
+    completed: Mapped[int] = mapped_column(Integer, default=0)
+    cancelled: Mapped[int] = mapped_column(Integer, default=0)
+    no_shows: Mapped[int] = mapped_column(Integer, default=0)
+
+    # Revenue (final_price)
+    revenue: Mapped[float] = mapped_column(Float, default=0.0)  # completed only
+    revenue_expected: Mapped[float] = mapped_column(Float, default=0.0)  # everything not cancelled
+
+    # Clients created on this day
+    new_clients: Mapped[int] = mapped_column(Integer, default=0)
+
+    # Notifications created on this day
+    notifications_count: Mapped[int] = mapped_column(Integer, default=0)
+    notifications_cost: Mapped[float] = mapped_column(Float, default=0.0)
+    # {"whatsapp": {"count": 12, "cost": 0.17, "delivered": 11, "failed": 1}, ...}
+    notifications_by_channel: Mapped[dict] = mapped_column(JSONB, default=dict)
+
+    refreshed_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
+    )
+
+
+class RollupState(Base):
+    """Progress of an incremental rollup: one row per rollup name."""
+
+    __tablename__ = "rollup_state"
+
+    name: Mapped[str] = mapped_column(String(50), primary_key=True)
+    # Start of the last successful incremental run
+    watermark: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
@@ -41,6 +41,14 @@ class ICalSource(Base):
     sync_interval_minutes: Mapped[int] = mapped_column(Integer, default=15)
     events_count: Mapped[int] = mapped_column(Integer, default=0)
 
+    # Feed validators from the last complete sync (conditional GET / unchanged-feed skip)
+    feed_etag: Mapped[str | None] = mapped_column(String(500), nullable=True)
+    feed_last_modified: Mapped[str | None] = mapped_column(String(100), nullable=True)
+    feed_content_hash: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    last_full_sync_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+
     # Export (our calendar -> external)
     export_url: Mapped[str | None] = mapped_column(Text, nullable=True)
     export_enabled: Mapped[bool] = mapped_column(Boolean, default=False)
@@ -359,7 +359,8 @@ class MultiEmployeeAvailabilityQuery(BaseModel):
     """Query availability for multiple employees at once (used in booking UI)."""
 
     service_id: int
-    date: str  # YYYY-MM-DD
+    date: str  # YYYY-MM-DD (first day of the range)
+    days: int = Field(default=1, ge=1, le=31)  # Number of days starting at `date`
     employee_ids: list[int] | None = None  # None = all active employees
 
 
@@ -371,14 +372,18 @@ class EmployeeAvailability(BaseModel):
     employee_color: str
     slots: list[TimeSlot]
     total_available: int = 0
+    first_available: datetime | None = None
 
 
 class MultiEmployeeAvailabilityResponse(BaseModel):
-    """Availability for all requested employees."""
+    """Availability for all requested employees over a date range."""
 
     service_id: int
     date: str
+    date_to: str | None = None  # Last day included (YYYY-MM-DD)
     employees: list[EmployeeAvailability]
+    first_available: datetime | None = None  # Earliest free slot across the team
+    first_available_employee_id: int | None = None
 
 
 # --------------------------------------------------------------------------
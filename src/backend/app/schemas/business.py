@@ -4,6 +4,9 @@ from datetime import datetime
 
 from pydantic import BaseModel, EmailStr
 
+from app.schemas.employee import EmployeePublicResponse
+from app.schemas.service import ServicePublicResponse
+
 
 class BusinessCreate(BaseModel):
     name: str
@@ -97,3 +100,15 @@ class BusinessPublicResponse(BaseModel):
     longitude: float | None
 
     model_config = {"from_attributes": True}
+
+
+class EmployeePublicWithServices(EmployeePublicResponse):
+    service_ids: list[int]
+
+
+class PublicBookingBootstrapResponse(BaseModel):
+    """Everything the booking page needs before the first availability call."""
+
+    business: BusinessPublicResponse
+    services: list[ServicePublicResponse]
+    employees: list[EmployeePublicWithServices]
@@ -0,0 +1,413 @@
+"""Availability engine -- shared slot computation for private and public booking.
+
+Builds the availability grid for an employee on a given day by:
+1. Loading busy intervals (active appointments) with a single range query
+2. Merging overlapping busy intervals into a sorted, disjoint list
+3. Walking candidate slots and the merged intervals together in one linear sweep
+
+Because both the candidate slots and the merged busy intervals are sorted,
+each slot only needs to be compared with the first busy interval that has
+not yet ended, so a day costs O(slots + appointments) instead of
+O(slots x appointments).
+
+Computed day grids are cached in Redis as one hash per (employee, day),
+with one field per slot length + schedule signature. Writes that touch an
+employee's day call invalidate_employee_days(), which drops that hash after
+the transaction commits.
+"""
+
+import json
+import logging
+from bisect import bisect_right
+from datetime import date, datetime, timedelta, timezone
+from typing import Iterable
+
+from sqlalchemy import and_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import get_redis, invalidate_after_commit, wait_for_invalidation
+from app.core.config import get_settings
+from app.models.appointment import Appointment
+from app.models.employee import Employee
+from app.schemas.appointment import (
+    EmployeeAvailability,
+    MultiEmployeeAvailabilityResponse,
+    TimeSlot,
+)
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Statuses that block an employee's time
+ACTIVE_APPOINTMENT_STATUSES = ("pending", "confirmed", "in_progress")
+
+# Distance between the start of two consecutive candidate slots (minutes)
+SLOT_STEP_MINUTES = 30
+
+# Upper bound for multi-day queries (keeps a single request bounded)
+MAX_RANGE_DAYS = 31
+
+# weekday() -> key used in Employee.weekly_schedule
+WEEKDAY_KEYS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+
+BusyInterval = tuple[datetime, datetime]
+GridKey = tuple[int, date]  # (employee_id, day)
+
+
+def day_bounds(target_date: date) -> tuple[datetime, datetime]:
+    """Return the (start, end) UTC datetimes of a calendar day."""
+    day_start = datetime(target_date.year, target_date.month, target_date.day, tzinfo=timezone.utc)
+    return day_start, day_start + timedelta(days=1)
+
+
+def _at_time(day_start: datetime, hhmm: str) -> datetime:
+    """Combine a day start with an "HH:MM" schedule boundary."""
+    hour, minute = map(int, hhmm.split(":"))
+    return day_start.replace(hour=hour, minute=minute)
+
+
+def merge_busy_intervals(intervals: Iterable[BusyInterval]) -> list[BusyInterval]:
+    """Sort busy intervals and merge the overlapping/adjacent ones.
+
+    Returns a list of disjoint intervals ordered by start time.
+    """
+    merged: list[BusyInterval] = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def build_day_slots(
+    weekly_schedule: dict | None,
+    target_date: date,
+    busy: list[BusyInterval],
+    slot_minutes: int,
+    step_minutes: int = SLOT_STEP_MINUTES,
+    not_before: datetime | None = None,
+) -> list[TimeSlot]:
+    """Generate the slot grid for one employee-day in a single pass.
+
+    Args:
+        weekly_schedule: Employee.weekly_schedule ({"mon": [{"start": "09:00", "end": "18:00"}], ...}).
+        target_date: The day to build slots for.
+        busy: Merged busy intervals (see merge_busy_intervals), sorted by start.
+            May span more than this day.
+        slot_minutes: Slot length (service duration + buffer).
+        step_minutes: Distance between consecutive slot starts.
+        not_before: If set, slots starting at or before this moment are omitted
+            (used by the public booking page to hide past slots).
+
+    Returns:
+        List of TimeSlot, ordered by start time.
+    """
+    schedule_intervals = (weekly_schedule or {}).get(WEEKDAY_KEYS[target_date.weekday()]) or []
+    if not schedule_intervals:
+        return []
+
+    day_start, _ = day_bounds(target_date)
+    slot_length = timedelta(minutes=slot_minutes)
+    step = timedelta(minutes=step_minutes)
+
+    # Merge shifts into sorted, disjoint windows so slot starts are monotonic
+    # and the busy pointer never needs to rewind (overlapping shifts would
+    # otherwise start a second grid behind intervals already skipped)
+    shifts = merge_busy_intervals(
+        (_at_time(day_start, interval["start"]), _at_time(day_start, interval["end"]))
+        for interval in schedule_intervals
+    )
+
+    slots: list[TimeSlot] = []
+    # Start at the first busy interval still open at the beginning of the day,
+    # so multi-day callers can pass one employee-wide list
+    busy_index = bisect_right(busy, day_start, key=lambda interval: interval[1])
+    busy_count = len(busy)
+
+    for shift_start, shift_end in shifts:
+        current = shift_start
+        while current + slot_length <= shift_end:
+            slot_end = current + slot_length
+
+            # Skip busy intervals that ended before this slot starts
+            while busy_index < busy_count and busy[busy_index][1] <= current:
+                busy_index += 1
+            available = busy_index == busy_count or busy[busy_index][0] >= slot_end
+
+            if not_before is None or current > not_before:
+                slots.append(TimeSlot(start=current, end=slot_end, available=available))
+            current += step
+
+    return slots
+
+
+async def fetch_busy_intervals(
+    db: AsyncSession,
+    employee_ids: Iterable[int],
+    range_start: datetime,
+    range_end: datetime,
+) -> dict[int, list[BusyInterval]]:
+    """Load merged busy intervals for several employees with one range query.
+
+    Only (employee_id, start_time, end_time) columns are selected; no ORM
+    entities are hydrated.
+
+    Returns:
+        Dict employee_id -> merged busy intervals overlapping [range_start, range_end).
+    """
+    employee_ids = list(employee_ids)
+    if not employee_ids:
+        return {}
+
+    result = await db.execute(
+        select(Appointment.employee_id, Appointment.start_time, Appointment.end_time).where(
+            and_(
+                Appointment.employee_id.in_(employee_ids),
+                Appointment.status.in_(ACTIVE_APPOINTMENT_STATUSES),
+                Appointment.start_time < range_end,
+                Appointment.end_time > range_start,
+            )
+        )
+    )
+
+    raw: dict[int, list[BusyInterval]] = {employee_id: [] for employee_id in employee_ids}
+    for row in result.all():
+        raw[row.employee_id].append((row.start_time, row.end_time))
+
+    return {employee_id: merge_busy_intervals(intervals) for employee_id, intervals in raw.items()}
+
+
+# --------------------------------------------------------------------------
+# Redis grid cache
+# --------------------------------------------------------------------------
+
+def _cache_key(employee_id: int, day: date) -> str:
+    return f"availability:{employee_id}:{day.isoformat()}"
+
+
+def _cache_field(weekly_schedule: dict | None, day: date, slot_minutes: int) -> str:
+    """Hash field for a grid: slot length + that weekday's shifts.
+
+    Including the shifts means a schedule change simply stops matching old
+    entries, without needing to invalidate the employee's whole calendar.
+    """
+    shifts = (weekly_schedule or {}).get(WEEKDAY_KEYS[day.weekday()]) or []
+    signature = ",".join(sorted(f"{interval['start']}-{interval['end']}" for interval in shifts))
+    return f"{slot_minutes}|{signature}"
+
+
+def _dump_grid(slots: list[TimeSlot]) -> str:
+    return json.dumps(
+        [[slot.start.isoformat(), slot.end.isoformat(), int(slot.available)] for slot in slots]
+    )
+
+
+def _load_grid(raw: str) -> list[TimeSlot]:
+    return [
+        TimeSlot(
+            start=datetime.fromisoformat(start),
+            end=datetime.fromisoformat(end),
+            available=bool(available),
+        )
+        for start, end, available in json.loads(raw)
+    ]
+
+
+async def _read_cached_grids(requests: dict[GridKey, str]) -> dict[GridKey, list[TimeSlot]]:
+    """Fetch cached grids for {(employee_id, day): field} in one pipelined round trip."""
+    redis = get_redis()
+    if redis is None or not requests:
+        return {}
+    await wait_for_invalidation(*{_cache_key(employee_id, day) for employee_id, day in requests})
+    try:
+        async with redis.pipeline(transaction=False) as pipe:
+            for (employee_id, day), field in requests.items():
+                pipe.hget(_cache_key(employee_id, day), field)
+            values = await pipe.execute()
+    except Exception as cache_error:
+        logger.warning("Availability cache read failed: %s", cache_error)
+        return {}
+    return {
+        grid_key: _load_grid(raw)
+        for grid_key, raw in zip(requests, values)
+        if raw is not None
+    }
+
+
+async def _write_cached_grids(
+    grids: dict[GridKey, list[TimeSlot]], fields: dict[GridKey, str]
+) -> None:
+    """Store freshly computed grids in one pipelined round trip."""
+    redis = get_redis()
+    if redis is None or not grids:
+        return
+    try:
+        async with redis.pipeline(transaction=False) as pipe:
+            for (employee_id, day), slots in grids.items():
+                key = _cache_key(employee_id, day)
+                pipe.hset(key, fields[(employee_id, day)], _dump_grid(slots))
+                pipe.expire(key, settings.AVAILABILITY_CACHE_TTL_SECONDS)
+            await pipe.execute()
+    except Exception as cache_error:
+        logger.warning("Availability cache write failed: %s", cache_error)
+
+
+def invalidate_employee_days(
+    db: AsyncSession, employee_id: int | None, start: datetime, end: datetime
+) -> None:
+    """Drop cached grids for every day an employee interval [start, end) touches.
+
+    The deletion is queued on the session and sent after commit.
+    """
+    if employee_id is None or start is None or end is None:
+        return
+    first_day = start.astimezone(timezone.utc).date()
+    last_day = max(end - timedelta(microseconds=1), start).astimezone(timezone.utc).date()
+    keys = [
+        _cache_key(employee_id, first_day + timedelta(days=offset))
+        for offset in range((last_day - first_day).days + 1)
+    ]
+    invalidate_after_commit(db, *keys)
+
+
+def _filter_not_before(slots: list[TimeSlot], not_before: datetime | None) -> list[TimeSlot]:
+    if not_before is None:
+        return slots
+    return [slot for slot in slots if slot.start > not_before]
+
+
+async def _get_grids(
+    db: AsyncSession,
+    schedules: dict[int, dict | None],
+    date_from: date,
+    days: int,
+    slot_minutes: int,
+) -> dict[GridKey, list[TimeSlot]]:
+    """Return full-day grids for every (employee, day), cache first.
+
+    Misses are computed from one range query covering only the employees
+    that had at least one miss, then written back to the cache.
+    """
+    grids: dict[GridKey, list[TimeSlot]] = {}
+    fields: dict[GridKey, str] = {}
+    for employee_id, weekly_schedule in schedules.items():
+        for offset in range(days):
+            day = date_from + timedelta(days=offset)
+            if (weekly_schedule or {}).get(WEEKDAY_KEYS[day.weekday()]):
+                fields[(employee_id, day)] = _cache_field(weekly_schedule, day, slot_minutes)
+            else:
+                grids[(employee_id, day)] = []  # Day off -- nothing to compute or cache
+
+    grids.update(await _read_cached_grids(fields))
+    missing = [grid_key for grid_key in fields if grid_key not in grids]
+    if not missing:
+        return grids
+
+    range_start, _ = day_bounds(date_from)
+    _, range_end = day_bounds(date_from + timedelta(days=days - 1))
+    busy_by_employee = await fetch_busy_intervals(
+        db, {employee_id for employee_id, _ in missing}, range_start, range_end
+    )
+
+    computed: dict[GridKey, list[TimeSlot]] = {}
+    for employee_id, day in missing:
+        computed[(employee_id, day)] = build_day_slots(
+            schedules[employee_id], day, busy_by_employee.get(employee_id, []), slot_minutes
+        )
+    await _write_cached_grids(computed, fields)
+
+    grids.update(computed)
+    return grids
+
+
+async def get_day_slots(
+    db: AsyncSession,
+    employee_id: int,
+    weekly_schedule: dict | None,
+    target_date: date,
+    slot_minutes: int,
+    not_before: datetime | None = None,
+) -> list[TimeSlot]:
+    """Compute the slot grid for one employee-day (cache, else single query + single pass)."""
+    grids = await _get_grids(db, {employee_id: weekly_schedule}, target_date, 1, slot_minutes)
+    return _filter_not_before(grids[(employee_id, target_date)], not_before)
+
+
+async def get_team_availability(
+    db: AsyncSession,
+    business_id: int,
+    service_id: int,
+    slot_minutes: int,
+    date_from: date,
+    days: int = 1,
+    employee_ids: list[int] | None = None,
+    not_before: datetime | None = None,
+) -> MultiEmployeeAvailabilityResponse:
+    """Compute availability for several employees over several days.
+
+    Costs at most two queries regardless of team size or range length: one
+    for the active employees and, on cache misses, one range query for all
+    their busy intervals. Every missing employee-day grid is then built in
+    memory.
+
+    Args:
+        db: Async database session.
+        business_id: Business owning the employees.
+        service_id: Service being booked (echoed in the response).
+        slot_minutes: Slot length (service duration + buffer).
+        date_from: First day of the range.
+        days: Number of days to include, starting at date_from.
+        employee_ids: Restrict to these employees (None = all active employees).
+        not_before: If set, slots starting at or before this moment are omitted.
+    """
+    days = max(1, min(days, MAX_RANGE_DAYS))
+    date_to = date_from + timedelta(days=days - 1)
+
+    query = select(Employee).where(
+        Employee.business_id == business_id, Employee.is_active == True
+    )
+    if employee_ids:
+        query = query.where(Employee.id.in_(employee_ids))
+    employees = (await db.execute(query.order_by(Employee.sort_order))).scalars().all()
+
+    grids = await _get_grids(
+        db, {emp.id: emp.weekly_schedule for emp in employees}, date_from, days, slot_minutes
+    )
+
+    team: list[EmployeeAvailability] = []
+    first_available: datetime | None = None
+    first_available_employee_id: int | None = None
+
+    for emp in employees:
+        slots: list[TimeSlot] = []
+        for offset in range(days):
+            slots.extend(
+                _filter_not_before(grids[(emp.id, date_from + timedelta(days=offset))], not_before)
+            )
+
+        employee_first = next((slot.start for slot in slots if slot.available), None)
+        if employee_first and (first_available is None or employee_first < first_available):
+            first_available = employee_first
+            first_available_employee_id = emp.id
+
+        team.append(
+            EmployeeAvailability(
+                employee_id=emp.id,
+                employee_name=emp.display_name or emp.full_name,
+                employee_color=emp.color,
+                slots=slots,
+                total_available=sum(1 for slot in slots if slot.available),
+                first_available=employee_first,
+            )
+        )
+
+    return MultiEmployeeAvailabilityResponse(
+        service_id=service_id,
+        date=date_from.isoformat(),
+        date_to=date_to.isoformat(),
+        employees=team,
+        first_available=first_available,
+        first_available_employee_id=first_available_employee_id,
+    )
@@ -0,0 +1,73 @@
+"""Booking write path -- race-free appointment writes.
+
+Double-booking between our own appointments is prevented by the
+`ex_appointments_employee_no_overlap` exclusion constraint on `appointments`
+(employee_id WITH =, tstzrange(start_time, end_time) WITH &&), so writers
+simply INSERT/UPDATE and translate a constraint violation into a conflict.
+Concurrent requests for the same slot are serialized by PostgreSQL: exactly
+one wins, the others get BookingConflictError.
+
+Imported iCal blocks are not covered by the constraint: external feeds may
+overlap each other and bookings made before the block was imported, and
+the sync must still import them. A booking is therefore still checked
+against them explicitly (has_external_block()).
+"""
+
+from datetime import datetime
+
+from sqlalchemy import and_, exists, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.appointment import EMPLOYEE_OVERLAP_CONSTRAINT, Appointment
+from app.services.availability import ACTIVE_APPOINTMENT_STATUSES
+
+# PostgreSQL SQLSTATE for exclusion_violation
+EXCLUSION_VIOLATION_SQLSTATE = "23P01"
+
+
+class BookingConflictError(Exception):
+    """The requested interval overlaps another active booking or an external block."""
+
+
+def _is_overlap_violation(error: IntegrityError) -> bool:
+    """Check whether an IntegrityError comes from the booking exclusion constraint."""
+    orig = error.orig
+    sqlstate = getattr(orig, "sqlstate", None) or getattr(orig, "pgcode", None)
+    if sqlstate is None and orig is not None and orig.__cause__ is not None:
+        sqlstate = getattr(orig.__cause__, "sqlstate", None)
+    return sqlstate == EXCLUSION_VIOLATION_SQLSTATE or EMPLOYEE_OVERLAP_CONSTRAINT in str(orig)
+
+
+async def has_external_block(
+    db: AsyncSession, employee_id: int, start: datetime, end: datetime
+) -> bool:
+    """Check whether an imported iCal block overlaps [start, end) for an employee."""
+    result = await db.execute(
+        select(
+            exists().where(
+                and_(
+                    Appointment.employee_id == employee_id,
+                    Appointment.source == "ical_block",
+                    Appointment.status.in_(ACTIVE_APPOINTMENT_STATUSES),
+                    Appointment.start_time < end,
+                    Appointment.end_time > start,
+                )
+            )
+        )
+    )
+    return bool(result.scalar())
+
+
+async def flush_booking(db: AsyncSession) -> None:
+    """Flush pending appointment writes, mapping overlap violations to BookingConflictError.
+
+    The session must be rolled back by the caller after a conflict (get_db
+    does this when the resulting HTTP error propagates).
+    """
+    try:
+        await db.flush()
+    except IntegrityError as integrity_error:
+        if _is_overlap_violation(integrity_error):
+            raise BookingConflictError(str(integrity_error.orig)) from integrity_error
+        raise
@@ -14,6 +14,7 @@ from lxml import etree
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import get_settings
+from app.core.http import get_http_client
 from app.models.business import Business
 from app.models.invoice import Invoice
 
@@ -169,31 +170,30 @@ async def upload_to_anaf(
 
     # Upload to ANAF
     try:
-        async with httpx.AsyncClient() as client:
-            resp = await client.post(
-                f"{settings.ANAF_API_BASE_URL}/prod/FCTEL/rest/upload",
-                params={
-                    "standard": "UBL",
-                    "cif": business.cui,
-                },
-                headers={
-                    "Authorization": f"Bearer {business.anaf_oauth_token}",
-                    "Content-Type": "application/xml",
-                },
-                content=xml_content.encode("utf-8"),
-            )
-
-            if resp.status_code == 200:
-                data = resp.json()
-                invoice.efactura_upload_id = data.get("index_incarcare")
-                invoice.efactura_status = "uploaded"
-                invoice.efactura_response = data
-                return {"success": True, "upload_id": data.get("index_incarcare")}
-            else:
-                error = resp.text
-                invoice.efactura_status = "rejected"
-                invoice.efactura_response = {"error": error, "status_code": resp.status_code}
-                return {"success": False, "error": error}
+        resp = await get_http_client().post(
+            f"{settings.ANAF_API_BASE_URL}/prod/FCTEL/rest/upload",
+            params={
+                "standard": "UBL",
+                "cif": business.cui,
+            },
+            headers={
+                "Authorization": f"Bearer {business.anaf_oauth_token}",
+                "Content-Type": "application/xml",
+            },
+            content=xml_content.encode("utf-8"),
+        )
+
+        if resp.status_code == 200:
+            data = resp.json()
+            invoice.efactura_upload_id = data.get("index_incarcare")
+            invoice.efactura_status = "uploaded"
+            invoice.efactura_response = data
+            return {"success": True, "upload_id": data.get("index_incarcare")}
+        else:
+            error = resp.text
+            invoice.efactura_status = "rejected"
+            invoice.efactura_response = {"error": error, "status_code": resp.status_code}
+            return {"success": False, "error": error}
 
     except httpx.HTTPError as e:
         invoice.efactura_status = "rejected"
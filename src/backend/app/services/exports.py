@@ -0,0 +1,329 @@
+"""Accounting exports -- appointments, invoices and notification logs as CSV/XLSX/Parquet.
+
+Rows are read with a server-side cursor (AsyncSession.stream + yield_per) and
+written out batch by batch, so memory stays flat regardless of row count:
+
+- CSV is streamed straight to the HTTP response (iter_csv).
+- Any format can be written to a file by a Celery job (write_export) and
+  then stored next to invoice PDFs (GCS in production, local temp directory
+  in development) by store_export.
+
+XLSX needs openpyxl and Parquet needs pyarrow; both are optional.
+"""
+
+import csv
+import importlib.util
+import io
+import logging
+import tempfile
+from datetime import date, datetime, time, timedelta, timezone
+from pathlib import Path
+from typing import AsyncIterator, Callable
+
+from sqlalchemy import Boolean, DateTime, Float, Integer, Select, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.models.appointment import Appointment
+from app.models.client import Client
+from app.models.employee import Employee
+from app.models.invoice import Invoice
+from app.models.notification import NotificationLog
+from app.models.service import Service
+from app.services.storage import upload_to_storage
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Directory for generated exports (local development fallback; production uses GCS)
+EXPORT_OUTPUT_DIR = Path(tempfile.gettempdir()) / "bookingcrm_exports"
+
+# Rows fetched per server-side cursor round trip
+STREAM_BATCH_SIZE = 1000
+
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+# Optional libraries required per format
+FORMAT_DEPENDENCIES = {"xlsx": "openpyxl", "parquet": "pyarrow"}
+
+
+def _appointments_query(business_id: int):
+    query = (
+        select(
+            Appointment.id,
+            Appointment.start_time,
+            Appointment.end_time,
+            Appointment.duration_minutes,
+            Appointment.status,
+            Appointment.source,
+            Employee.full_name.label("employee"),
+            Service.name.label("service"),
+            func.coalesce(Client.full_name, Appointment.walk_in_name).label("client"),
+            func.coalesce(Client.phone, Appointment.walk_in_phone).label("client_phone"),
+            Appointment.price,
+            Appointment.discount_percent,
+            Appointment.final_price,
+            Appointment.currency,
+            Appointment.payment_status,
+            Appointment.payment_method,
+            Appointment.invoice_id,
+            Appointment.created_at,
+        )
+        .outerjoin(Employee, Appointment.employee_id == Employee.id)
+        .outerjoin(Service, Appointment.service_id == Service.id)
+        .outerjoin(Client, Appointment.client_id == Client.id)
+        .where(Appointment.business_id == business_id)
+    )
+    return query, Appointment.start_time, Appointment.id
+
+
+def _invoices_query(business_id: int):
+    query = select(
+        Invoice.id,
+        Invoice.series,
+        Invoice.number,
+        Invoice.invoice_date,
+        Invoice.due_date,
+        Invoice.buyer_name,
+        Invoice.buyer_cui,
+        Invoice.buyer_reg_com,
+        Invoice.buyer_is_company,
+        Invoice.subtotal,
+        Invoice.vat_amount,
+        Invoice.total,
+        Invoice.currency,
+        Invoice.status,
+        Invoice.payment_status,
+        Invoice.paid_amount,
+        Invoice.paid_at,
+        Invoice.efactura_status,
+        Invoice.created_at,
+    ).where(Invoice.business_id == business_id)
+    return query, Invoice.invoice_date, Invoice.id
+
+
+def _notifications_query(business_id: int):
+    query = select(
+        NotificationLog.id,
+        NotificationLog.created_at,
+        NotificationLog.channel,
+        NotificationLog.message_type,
+        NotificationLog.recipient,
+        NotificationLog.status,
+        NotificationLog.appointment_id,
+        NotificationLog.client_id,
+        NotificationLog.attempt_number,
+        NotificationLog.fallback_from,
+        NotificationLog.cost,
+        NotificationLog.cost_currency,
+        NotificationLog.delivered_at,
+        NotificationLog.error_message,
+    ).where(NotificationLog.business_id == business_id)
+    return query, NotificationLog.created_at, NotificationLog.id
+
+
+EXPORT_DATASETS: dict[str, Callable] = {
+    "appointments": _appointments_query,
+    "invoices": _invoices_query,
+    "notifications": _notifications_query,
+}
+
+
+def format_available(export_format: str) -> bool:
+    """Check that the optional library needed by a format is installed."""
+    module_name = FORMAT_DEPENDENCIES.get(export_format)
+    return module_name is None or importlib.util.find_spec(module_name) is not None
+
+
+def build_export_query(
+    dataset: str,
+    business_id: int,
+    date_from: date | None = None,
+    date_to: date | None = None,
+) -> Select:
+    """Column-only export query for a dataset, optionally limited to [date_from, date_to]."""
+    query, date_column, id_column = EXPORT_DATASETS[dataset](business_id)
+    if date_from:
+        query = query.where(date_column >= datetime.combine(date_from, time.min, tzinfo=timezone.utc))
+    if date_to:
+        query = query.where(
+            date_column < datetime.combine(date_to + timedelta(days=1), time.min, tzinfo=timezone.utc)
+        )
+    return query.order_by(date_column, id_column)
+
+
+async def count_export_rows(db: AsyncSession, query: Select) -> int:
+    """Total rows an export will produce (used for job progress)."""
+    result = await db.execute(select(func.count()).select_from(query.order_by(None).subquery()))
+    return result.scalar() or 0
+
+
+async def stream_batches(db: AsyncSession, query: Select) -> AsyncIterator[list[tuple]]:
+    """Yield result rows in batches from a server-side cursor."""
+    result = await db.stream(query.execution_options(yield_per=STREAM_BATCH_SIZE))
+    async for partition in result.partitions():
+        yield [tuple(row) for row in partition]
+
+
+def _csv_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return "" if value is None else value
+
+
+async def iter_csv(db: AsyncSession, query: Select) -> AsyncIterator[bytes]:
+    """Encode an export query as CSV chunks, one chunk per cursor batch."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    # BOM so Excel opens Romanian diacritics correctly
+    buffer.write("\ufeff")
+    writer.writerow([column.name for column in query.selected_columns])
+
+    async for batch in stream_batches(db, query):
+        writer.writerows([_csv_value(value) for value in row] for row in batch)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def _parquet_schema(query: Select):
+    import pyarrow as pa
+
+    fields = []
+    for column in query.selected_columns:
+        column_type = column.type
+        if isinstance(column_type, Boolean):
+            arrow_type = pa.bool_()
+        elif isinstance(column_type, Integer):
+            arrow_type = pa.int64()
+        elif isinstance(column_type, Float):
+            arrow_type = pa.float64()
+        elif isinstance(column_type, DateTime):
+            arrow_type = pa.timestamp("us", tz="UTC")
+        else:
+            arrow_type = pa.string()
+        fields.append(pa.field(column.name, arrow_type))
+    return pa.schema(fields)
+
+
+async def write_export(
+    db: AsyncSession,
+    query: Select,
+    export_format: str,
+    file_path: Path,
+    on_progress: Callable[[int], None] | None = None,
+) -> int:
+    """Write an export query to a file batch by batch.
+
+    Args:
+        db: Database session (its connection holds the server-side cursor).
+        query: Query from build_export_query().
+        export_format: One of EXPORT_FORMATS.
+        file_path: Destination file.
+        on_progress: Called with the number of rows written after each batch.
+
+    Returns:
+        Number of data rows written.
+    """
+    columns = [column.name for column in query.selected_columns]
+    rows_written = 0
+
+    if export_format == "csv":
+        with file_path.open("w", newline="", encoding="utf-8-sig") as csv_file:
+            writer = csv.writer(csv_file)
+            writer.writerow(columns)
+            async for batch in stream_batches(db, query):
+                writer.writerows([_csv_value(value) for value in row] for row in batch)
+                rows_written += len(batch)
+                if on_progress:
+                    on_progress(rows_written)
+
+    elif export_format == "xlsx":
+        from openpyxl import Workbook
+
+        # write_only streams rows to disk instead of building the sheet in memory
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet(title="export")
+        sheet.append(columns)
+        async for batch in stream_batches(db, query):
+            for row in batch:
+                # Excel has no timezone support; values are written as UTC
+                sheet.append([
+                    value.astimezone(timezone.utc).replace(tzinfo=None)
+                    if isinstance(value, datetime) else value
+                    for value in row
+                ])
+            rows_written += len(batch)
+            if on_progress:
+                on_progress(rows_written)
+        workbook.save(file_path)
+
+    elif export_format == "parquet":
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        schema = _parquet_schema(query)
+        with pq.ParquetWriter(file_path, schema) as parquet_writer:
+            async for batch in stream_batches(db, query):
+                column_values = list(zip(*batch))
+                parquet_writer.write_table(
+                    pa.Table.from_arrays(
+                        [pa.array(values, type=field.type) for values, field in zip(column_values, schema)],
+                        schema=schema,
+                    )
+                )
+                rows_written += len(batch)
+                if on_progress:
+                    on_progress(rows_written)
+
+    else:
+        raise ValueError(f"Unsupported export format: {export_format}")
+
+    return rows_written
+
+
+def store_export(file_path: Path, business_id: int) -> str | None:
+    """Upload a finished export to GCS, or keep it in the local export directory.
+
+    Exports hold client data, so the GCS object is not public: the returned
+    URL is signed and expires after EXPORT_URL_TTL_MINUTES.
+
+    Returns:
+        Signed URL of the uploaded file, or None if it stayed in
+        EXPORT_OUTPUT_DIR (served by the authenticated export file endpoint).
+    """
+    content_type = EXPORT_FORMATS.get(file_path.suffix.lstrip("."), "application/octet-stream")
+    signed_url = upload_to_storage(
+        f"exports/{business_id}/{file_path.name}",
+        content_type,
+        file_path=file_path,
+        signed_url_ttl=timedelta(minutes=settings.EXPORT_URL_TTL_MINUTES),
+    )
+    if signed_url:
+        file_path.unlink(missing_ok=True)
+        return signed_url
+
+    # Development fallback: the file already lives in EXPORT_OUTPUT_DIR
+    logger.info("Saved export locally: %s", file_path)
+    return None
+
+
+def local_export_path(business_id: int, filename: str) -> Path | None:
+    """Path of an export kept in EXPORT_OUTPUT_DIR, or None if it is not there."""
+    file_path = EXPORT_OUTPUT_DIR / str(business_id) / Path(filename).name
+    return file_path if file_path.is_file() else None
+
+
+def export_file_path(business_id: int, dataset: str, export_format: str, job_id: str) -> Path:
+    """Local path for an export file being built."""
+    directory = EXPORT_OUTPUT_DIR / str(business_id)
+    directory.mkdir(parents=True, exist_ok=True)
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
+    return directory / f"{dataset}_{stamp}_{job_id[-8:]}.{export_format}"
@@ -3,8 +3,9 @@
 Syncs external calendars by:
 1. Fetching iCal feed URL
 2. Parsing VEVENT entries (handling platform-specific quirks)
-3. Creating/updating blocked appointments for the assigned employee
-4. Removing events that no longer exist in the feed
+3. Upserting blocked appointments for the assigned employee in one
+   INSERT ... ON CONFLICT (ical_source_id, ical_uid) statement
+4. Removing events that no longer exist in the feed in one DELETE
 
 Platform-specific handling:
 - Airbnb: Uses X-AIRBNB-LISTING-ID, all-day events with DTSTART;VALUE=DATE,
@@ -18,31 +19,86 @@ Enhanced with:
 - Feed content validation before parsing
 - Detailed error tracking per-event
 - Skip events that are in the past (configurable)
+- Recurring events (RRULE/RDATE/EXDATE, modified instances) expanded into
+  one block per occurrence within a bounded horizon
+- Streaming parse: the feed is spooled to a temporary file while it is
+  downloaded and read back one VEVENT at a time, so memory stays bounded by
+  a single event however large the feed
+- Conditional GET (ETag / Last-Modified) and a content hash, so unchanged
+  feeds are neither parsed nor diffed against the database
 - iCal export (generate RFC 5545 for our appointments)
 """
 
+import asyncio
+import hashlib
 import logging
 import re
+import tempfile
+import time
 from datetime import date, datetime, timedelta, timezone
-from typing import Any
+from typing import Any, Iterable, Iterator
 
 import httpx
-from icalendar import Calendar, Event as ICalEvent
-from sqlalchemy import and_, select
-from sqlalchemy.ext.asyncio import AsyncSession
-
-from app.models.appointment import Appointment
+import recurring_ical_events
+from icalendar import Calendar, Component, Event as ICalEvent
+from sqlalchemy import (
+    DateTime,
+    Integer,
+    String,
+    Text,
+    all_,
+    and_,
+    any_,
+    delete,
+    func,
+    literal,
+    literal_column,
+    null,
+    or_,
+    select,
+    update,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import get_settings
+from app.core.database import AsyncSessionLocal
+from app.core.http import get_http_client
+from app.models.appointment import ICAL_BLOCK_UID_CONSTRAINT, Appointment
 from app.models.ical_source import ICalSource
+from app.services.availability import invalidate_employee_days
 
 logger = logging.getLogger(__name__)
+settings = get_settings()
 
 # Maximum number of retries for fetching iCal feeds
 ICAL_FETCH_MAX_RETRIES = 3
 ICAL_FETCH_TIMEOUT = 30
 
+# Feed bodies up to this size are spooled in memory, larger ones to disk
+ICAL_SPOOL_MAX_MEMORY_BYTES = 1024 * 1024
+
 # How far in the past to keep synced events (days)
 ICAL_PAST_EVENT_RETENTION_DAYS = 7
 
+# How far ahead recurring events are expanded into occurrences (days). The
+# horizon moves forward with the periodic full sync.
+ICAL_RECURRENCE_HORIZON_DAYS = 180
+
+# Properties that make a VEVENT part of a recurring series
+ICAL_RECURRENCE_PROPERTIES = ("RRULE", "RDATE", "RECURRENCE-ID")
+
+# Feed events upserted per statement while the feed is parsed
+ICAL_UPSERT_CHUNK_SIZE = 500
+
+# Feeds are fully re-processed at least this often even when unchanged, so
+# events that aged past the retention window are removed
+ICAL_FULL_SYNC_INTERVAL_HOURS = 24
+
+# A source is due this much before its interval has fully elapsed, so a sync
+# that finished a little after the previous beat is not pushed back a whole beat
+ICAL_SCHEDULE_SLACK_MINUTES = 2
+
 # Known iCal producers and their quirks
 KNOWN_PRODUCERS = {
     "airbnb": {"id_pattern": r"airbnb", "date_format": "date"},
@@ -51,7 +107,74 @@ KNOWN_PRODUCERS = {
 }
 
 
-async def fetch_ical_feed(url: str) -> str | None:
+class ICalFeed:
+    """Result of a feed fetch: new content, or "not modified" since the validators sent.
+
+    New content is kept in a spooled temporary file and read back with
+    iter_lines(); close() releases it.
+    """
+
+    __slots__ = ("body", "encoding", "not_modified", "etag", "last_modified", "content_hash")
+
+    def __init__(
+        self,
+        body: Any = None,
+        encoding: str = "utf-8",
+        not_modified: bool = False,
+        etag: str | None = None,
+        last_modified: str | None = None,
+        content_hash: str | None = None,
+    ):
+        self.body = body
+        self.encoding = encoding
+        self.not_modified = not_modified
+        self.etag = etag
+        self.last_modified = last_modified
+        self.content_hash = content_hash
+
+    def iter_lines(self) -> Iterator[str]:
+        """Decoded lines of the feed body, read from the spool one at a time."""
+        self.body.seek(0)
+        for raw_line in self.body:
+            yield raw_line.decode(self.encoding, errors="replace")
+
+    def close(self) -> None:
+        if self.body is not None:
+            self.body.close()
+            self.body = None
+
+
+async def _spool_response(resp: httpx.Response) -> tuple[Any, str, bool]:
+    """Copy a streamed response body to a spooled temporary file.
+
+    Returns:
+        (file, sha256 hex digest of the body, whether BEGIN:VCALENDAR occurs in it).
+    """
+    marker = b"BEGIN:VCALENDAR"
+    body = tempfile.SpooledTemporaryFile(max_size=ICAL_SPOOL_MAX_MEMORY_BYTES)
+    digest = hashlib.sha256()
+    is_calendar = False
+    tail = b""
+    try:
+        async for chunk in resp.aiter_bytes():
+            body.write(chunk)
+            digest.update(chunk)
+            if not is_calendar:
+                # Keep the end of the previous chunk: the marker may straddle two
+                window = tail + chunk
+                is_calendar = marker in window
+                tail = window[-(len(marker) - 1):]
+    except BaseException:
+        body.close()
+        raise
+    return body, digest.hexdigest(), is_calendar
+
+
+async def fetch_ical_feed(
+    url: str,
+    etag: str | None = None,
+    last_modified: str | None = None,
+) -> ICalFeed | None:
     """Fetch iCal feed content from URL with retry logic.
 
     Retries up to ICAL_FETCH_MAX_RETRIES times for transient errors
@@ -59,28 +182,39 @@ async def fetch_ical_feed(url: str) -> str | None:
 
     Args:
         url: The iCal feed URL to fetch.
+        etag: ETag from the previous fetch (sent as If-None-Match).
+        last_modified: Last-Modified from the previous fetch (sent as If-Modified-Since).
 
     Returns:
-        Raw iCal text content, or None if all retries failed.
+        ICalFeed with the spooled content and its validators (the caller must
+        close() it), ICalFeed(not_modified=True) on a 304, or None if all
+        retries failed.
     """
     last_error: str | None = None
+    request_headers = {
+        "User-Agent": "BookingCRM-iCal-Sync/1.0",
+        "Accept": "text/calendar, application/ics, text/plain",
+    }
+    if etag:
+        request_headers["If-None-Match"] = etag
+    if last_modified:
+        request_headers["If-Modified-Since"] = last_modified
 
+    http_client = get_http_client()
     for attempt in range(1, ICAL_FETCH_MAX_RETRIES + 1):
         try:
-            async with httpx.AsyncClient(
-                timeout=ICAL_FETCH_TIMEOUT,
-                follow_redirects=True,
-            ) as http_client:
-                resp = await http_client.get(url, headers={
-                    "User-Agent": "BookingCRM-iCal-Sync/1.0",
-                    "Accept": "text/calendar, application/ics, text/plain",
-                })
+            async with http_client.stream(
+                "GET", url, headers=request_headers, timeout=ICAL_FETCH_TIMEOUT, follow_redirects=True
+            ) as resp:
+                if resp.status_code == 304:
+                    return ICalFeed(not_modified=True, etag=etag, last_modified=last_modified)
 
                 if resp.status_code == 200:
-                    content = resp.text
+                    body, content_hash, is_calendar = await _spool_response(resp)
 
                     # Basic validation: must contain VCALENDAR
-                    if "BEGIN:VCALENDAR" not in content:
+                    if not is_calendar:
+                        body.close()
                         logger.warning(
                             "iCal feed %s returned non-calendar content (attempt %d/%d)",
                             url, attempt, ICAL_FETCH_MAX_RETRIES,
@@ -88,7 +222,13 @@ async def fetch_ical_feed(url: str) -> str | None:
                         last_error = "Feed-ul nu contine date calendar valide (VCALENDAR lipseste)"
                         continue
 
-                    return content
+                    return ICalFeed(
+                        body=body,
+                        encoding=resp.charset_encoding or "utf-8",
+                        etag=resp.headers.get("ETag"),
+                        last_modified=resp.headers.get("Last-Modified"),
+                        content_hash=content_hash,
+                    )
 
                 elif 400 <= resp.status_code < 500:
                     # Client error: do not retry
@@ -126,12 +266,13 @@ async def fetch_ical_feed(url: str) -> str | None:
     return None
 
 
-def _detect_source_type(cal: Calendar) -> str:
+def _detect_source_type(prodid: str, first_event: Any = None) -> str:
     """Detect the iCal feed source (airbnb, booking_com, google, other).
 
-    Uses the PRODID and X- properties to identify the source platform.
+    Uses the calendar's PRODID and the X- properties of its first VEVENT to
+    identify the source platform.
     """
-    prodid = str(cal.get("PRODID", "")).lower()
+    prodid = prodid.lower()
 
     if "airbnb" in prodid:
         return "airbnb"
@@ -141,16 +282,14 @@ def _detect_source_type(cal: Calendar) -> str:
         return "google"
 
     # Check X- properties of first event
-    for component in cal.walk():
-        if component.name == "VEVENT":
-            if component.get("X-AIRBNB-LISTING-ID"):
-                return "airbnb"
-            uid = str(component.get("UID", "")).lower()
-            if "airbnb" in uid:
-                return "airbnb"
-            if "booking.com" in uid:
-                return "booking_com"
-            break
+    if first_event is not None:
+        if first_event.get("X-AIRBNB-LISTING-ID"):
+            return "airbnb"
+        uid = str(first_event.get("UID", "")).lower()
+        if "airbnb" in uid:
+            return "airbnb"
+        if "booking.com" in uid:
+            return "booking_com"
 
     return "other"
 
@@ -230,102 +369,336 @@ def _extract_guest_info(component: Any, source_type: str) -> dict[str, str]:
     return info
 
 
-def parse_ical_events(
-    ical_text: str,
-    skip_past_events: bool = True,
-    past_retention_days: int = ICAL_PAST_EVENT_RETENTION_DAYS,
-) -> list[dict]:
-    """Parse iCal text and extract events with platform-specific handling.
+def _unfold_lines(lines: Iterable[str]) -> Iterator[str]:
+    """Join RFC 5545 folded lines (continuations start with a space or tab)."""
+    current: str | None = None
+    for line in lines:
+        line = line.rstrip("\r\n")
+        if current is None:
+            line = line.lstrip("\ufeff")
+        elif line[:1] in (" ", "\t"):
+            current += line[1:]
+            continue
+        if current:
+            yield current
+        current = line
+    if current:
+        yield current
+
+
+def _split_content_line(line: str) -> tuple[str, str]:
+    """(upper-cased property name, value) of an unfolded content line; parameters are dropped."""
+    colon = line.find(":")
+    if colon < 0:
+        return line.upper(), ""
+    semicolon = line.find(";", 0, colon)
+    if semicolon < 0:
+        return line[:colon].upper(), line[colon + 1:]
+    # Parameter values may be quoted and contain ':' (TZID="(UTC+02:00) Bucharest")
+    in_quotes = False
+    for index in range(semicolon, len(line)):
+        char = line[index]
+        if char == '"':
+            in_quotes = not in_quotes
+        elif char == ":" and not in_quotes:
+            return line[:semicolon].upper(), line[index + 1:]
+    return line[:semicolon].upper(), ""
+
+
+def _block_properties(block: list[str]) -> dict[str, str]:
+    """Top-level properties (upper-cased name -> raw value) of a raw VEVENT."""
+    properties: dict[str, str] = {}
+    for line in block[1:]:
+        if line[:6].upper() == "BEGIN:":
+            break  # Sub-components (VALARM) follow the event's own properties
+        name, value = _split_content_line(line)
+        properties[name] = value
+    return properties
+
+
+def _ended_before(properties: dict[str, str], cutoff: datetime) -> bool:
+    """Whether a raw VEVENT surely ended before the cutoff, judged from its DTEND/DTSTART text.
+
+    Only the date part is read, with margins covering any UTC offset and time
+    of day (and the default one-day length when DTEND is missing), so
+    borderline events are left to the exact check after parsing.
+    """
+    dtend = properties.get("DTEND")
+    dtstart = properties.get("DTSTART")
+    if dtend is not None:
+        raw_value, margin_days = dtend, 2
+    elif dtstart is not None and "DURATION" not in properties:
+        raw_value, margin_days = dtstart, 3
+    else:
+        return False
+    try:
+        day = datetime.strptime(raw_value.strip()[:8], "%Y%m%d")
+    except ValueError:
+        return False
+    return day.replace(tzinfo=timezone.utc) + timedelta(days=margin_days) < cutoff
 
-    Args:
-        ical_text: Raw iCal feed content.
-        skip_past_events: If True, skip events that ended more than
-            past_retention_days ago.
-        past_retention_days: Number of days to keep past events.
 
-    Returns:
-        List of event dicts with keys: uid, summary, start, end,
-        duration_minutes, guest_info, source_type.
-    """
+def _parse_component(block: list[str]) -> Any:
     try:
-        cal = Calendar.from_ical(ical_text)
+        return Component.from_ical("\r\n".join(block))
     except Exception as parse_error:
-        logger.error("Failed to parse iCal content: %s", parse_error)
         raise ValueError(f"Format iCal invalid: {parse_error}") from parse_error
 
-    source_type = _detect_source_type(cal)
-    cutoff_date = datetime.now(timezone.utc) - timedelta(days=past_retention_days)
-    events: list[dict] = []
-    parse_errors: list[str] = []
 
-    for component in cal.walk():
-        if component.name != "VEVENT":
-            continue
+def _build_event(
+    component: Any,
+    source_type: str,
+    skip_past_events: bool,
+    cutoff_date: datetime,
+    parse_errors: list[str],
+    uid: str | None = None,
+) -> dict | None:
+    """Event dict for a parsed VEVENT, or None if it is skipped (reason added to parse_errors).
 
-        uid = str(component.get("UID", ""))
-        if not uid:
-            parse_errors.append("Event fara UID -- ignorat")
-            continue
+    `uid` overrides the component's UID (per-occurrence UIDs of recurring events).
+    """
+    uid = uid or str(component.get("UID", ""))
+    if not uid:
+        parse_errors.append("Event fara UID -- ignorat")
+        return None
 
-        dtstart = component.get("DTSTART")
-        dtend = component.get("DTEND")
+    dtstart = component.get("DTSTART")
+    dtend = component.get("DTEND")
 
-        if not dtstart:
-            parse_errors.append(f"Event {uid}: DTSTART lipseste -- ignorat")
-            continue
+    if not dtstart:
+        parse_errors.append(f"Event {uid}: DTSTART lipseste -- ignorat")
+        return None
 
-        start = _normalize_datetime(dtstart, source_type)
-        if start is None:
-            parse_errors.append(f"Event {uid}: DTSTART invalid -- ignorat")
-            continue
+    start = _normalize_datetime(dtstart, source_type)
+    if start is None:
+        parse_errors.append(f"Event {uid}: DTSTART invalid -- ignorat")
+        return None
 
-        # Handle missing DTEND
-        if dtend:
-            end = _normalize_datetime(dtend, source_type)
+    # Handle missing DTEND
+    if dtend:
+        end = _normalize_datetime(dtend, source_type)
+    else:
+        # If DTEND is missing, check DURATION property
+        duration_prop = component.get("DURATION")
+        if duration_prop:
+            end = start + duration_prop.dt
         else:
-            # If DTEND is missing, check DURATION property
-            duration_prop = component.get("DURATION")
-            if duration_prop:
-                end = start + duration_prop.dt
+            # Default: 1 hour for timed events, end of day for all-day events
+            dt_raw = dtstart.dt if hasattr(dtstart, "dt") else dtstart
+            if isinstance(dt_raw, date) and not isinstance(dt_raw, datetime):
+                end = start + timedelta(days=1)
             else:
-                # Default: 1 hour for timed events, end of day for all-day events
-                dt_raw = dtstart.dt if hasattr(dtstart, "dt") else dtstart
-                if isinstance(dt_raw, date) and not isinstance(dt_raw, datetime):
-                    end = start + timedelta(days=1)
-                else:
-                    end = start + timedelta(hours=1)
+                end = start + timedelta(hours=1)
 
-        if end is None:
-            parse_errors.append(f"Event {uid}: DTEND invalid -- ignorat")
-            continue
+    if end is None:
+        parse_errors.append(f"Event {uid}: DTEND invalid -- ignorat")
+        return None
+
+    # For Airbnb/Booking.com all-day events, DTEND is actually the checkout date
+    # (exclusive). For example, check-in Jan 5, check-out Jan 8 means:
+    # DTSTART=20240105, DTEND=20240108 (guest leaves on Jan 8)
+    # We keep the end as-is since the date itself represents checkout day start.
+    # The slot is blocked from start (00:00) to end (00:00 of checkout day).
+
+    # Skip events that are too far in the past
+    if skip_past_events and end < cutoff_date:
+        return None
+
+    # Calculate duration
+    duration_seconds = (end - start).total_seconds()
+    duration_minutes = max(int(duration_seconds / 60), 1)  # Minimum 1 minute
+
+    # Extract guest/booking info
+    guest_info = _extract_guest_info(component, source_type)
+    summary = guest_info["summary"]
+
+    return {
+        "uid": uid,
+        "summary": summary,
+        "start": start,
+        "end": end,
+        "duration_minutes": duration_minutes,
+        "guest_info": guest_info,
+        "source_type": source_type,
+    }
 
-        # For Airbnb/Booking.com all-day events, DTEND is actually the checkout date
-        # (exclusive). For example, check-in Jan 5, check-out Jan 8 means:
-        # DTSTART=20240105, DTEND=20240108 (guest leaves on Jan 8)
-        # We keep the end as-is since the date itself represents checkout day start.
-        # The slot is blocked from start (00:00) to end (00:00 of checkout day).
 
-        # Skip events that are too far in the past
-        if skip_past_events and end < cutoff_date:
+def _build_event_or_raise(
+    component: Any,
+    source_type: str,
+    skip_past_events: bool,
+    cutoff_date: datetime,
+    parse_errors: list[str],
+    uid: str | None = None,
+) -> dict | None:
+    """_build_event() with unexpected errors reported as an invalid feed."""
+    try:
+        return _build_event(component, source_type, skip_past_events, cutoff_date, parse_errors, uid)
+    except Exception as event_error:
+        raise ValueError(f"Format iCal invalid: {event_error}") from event_error
+
+
+def _expand_series(
+    uid: str,
+    components: list,
+    window_start: datetime,
+    window_end: datetime,
+    parse_errors: list[str],
+) -> Iterator[tuple[str, Any]]:
+    """(per-occurrence UID, occurrence) for a recurring event within [window_start, window_end].
+
+    The master and its modified instances (RECURRENCE-ID) are expanded with
+    recurring_ical_events, honouring EXDATE/RDATE; the RRULE is only walked
+    up to window_end, so open-ended series cost no more than the window.
+    Each occurrence is identified by the series UID and its original start
+    (RECURRENCE-ID), which stays the same when a single instance is moved.
+    A series that cannot be expanded is imported as its master event alone.
+    """
+    calendar = Calendar()
+    for component in components:
+        calendar.add_component(component)
+    try:
+        # Keep RECURRENCE-ID on the occurrences: a moved instance is identified by it
+        occurrences = recurring_ical_events.of(calendar, keep_recurrence_attributes=True).between(
+            window_start, window_end
+        )
+    except Exception as recurrence_error:
+        parse_errors.append(f"Event {uid}: recurenta invalida ({recurrence_error}) -- importat o singura data")
+        for component in components:
+            if not component.get("RECURRENCE-ID"):
+                yield uid, component
+        return
+
+    for occurrence in occurrences:
+        original_start = _normalize_datetime(
+            occurrence.get("RECURRENCE-ID") or occurrence.get("DTSTART")
+        )
+        if original_start is None:
+            parse_errors.append(f"Event {uid}: DTSTART invalid pentru o aparitie -- ignorat")
             continue
+        yield f"{uid}#{original_start:%Y%m%dT%H%M%SZ}", occurrence
 
-        # Calculate duration
-        duration_seconds = (end - start).total_seconds()
-        duration_minutes = max(int(duration_seconds / 60), 1)  # Minimum 1 minute
 
-        # Extract guest/booking info
-        guest_info = _extract_guest_info(component, source_type)
-        summary = guest_info["summary"]
+def iter_ical_events(
+    lines: Iterable[str],
+    skip_past_events: bool = True,
+    past_retention_days: int = ICAL_PAST_EVENT_RETENTION_DAYS,
+    recurrence_horizon_days: int = ICAL_RECURRENCE_HORIZON_DAYS,
+) -> Iterator[dict]:
+    """Parse iCal content line by line, yielding one event dict per VEVENT.
+
+    Only the current VEVENT is held in memory: its unfolded lines are
+    buffered until END:VEVENT, events that ended before the retention cutoff
+    are dropped from their raw DTEND/DTSTART before any icalendar object is
+    built, and the others are parsed one block at a time. VTIMEZONE blocks are
+    parsed as they are read, which registers them for the TZIDs that follow.
 
-        events.append({
-            "uid": uid,
-            "summary": summary,
-            "start": start,
-            "end": end,
-            "duration_minutes": duration_minutes,
-            "guest_info": guest_info,
-            "source_type": source_type,
-        })
+    Recurring events (RRULE/RDATE, and their RECURRENCE-ID instances, which
+    may come anywhere in the feed) are kept until the end of the calendar and
+    then expanded to one event per occurrence between the retention cutoff
+    and recurrence_horizon_days ahead, each with its own UID.
+
+    Args:
+        lines: Feed lines (with or without line endings), e.g. ICalFeed.iter_lines().
+        skip_past_events: If True, skip events that ended more than
+            past_retention_days ago. Recurring events are never expanded
+            before the cutoff.
+        past_retention_days: Number of days to keep past events.
+        recurrence_horizon_days: How far ahead recurring events are expanded.
+
+    Yields:
+        Event dicts with keys: uid, summary, start, end, duration_minutes,
+        guest_info, source_type.
+
+    Raises:
+        ValueError: The content is not a complete iCal calendar or an event
+            cannot be parsed. Raised mid-iteration: events already yielded
+            must be discarded by the caller.
+    """
+    now = datetime.now(timezone.utc)
+    cutoff_date = now - timedelta(days=past_retention_days)
+    parse_errors: list[str] = []
+    series: dict[str, list] = {}  # UID -> master and modified instances of recurring events
+    prodid = ""
+    source_type: str | None = None
+    in_calendar = calendar_closed = False
+    depth = 0  # Nesting level inside the current top-level component
+    block_name = ""
+    block: list[str] | None = None  # Lines of the current VEVENT/VTIMEZONE
+
+    for line in _unfold_lines(lines):
+        is_begin = line[:6].upper() == "BEGIN:"
+        is_end = not is_begin and line[:4].upper() == "END:"
+
+        if depth:
+            if block is not None:
+                block.append(line)
+            if is_begin:
+                depth += 1
+            elif is_end:
+                depth -= 1
+            if depth or block is None:
+                continue
+
+            component_lines, block = block, None
+            if block_name == "VTIMEZONE":
+                _parse_component(component_lines)
+                continue
+
+            component = None
+            if source_type is None:
+                # The first event can identify the platform (X-AIRBNB-LISTING-ID, UID)
+                component = _parse_component(component_lines)
+                source_type = _detect_source_type(prodid, component)
+            properties = _block_properties(component_lines)
+            if any(name in properties for name in ICAL_RECURRENCE_PROPERTIES):
+                uid = properties.get("UID", "").strip()
+                if uid:
+                    series.setdefault(uid, []).append(
+                        component or _parse_component(component_lines)
+                    )
+                    continue
+            if skip_past_events and _ended_before(properties, cutoff_date):
+                continue
+            if component is None:
+                component = _parse_component(component_lines)
+            event = _build_event_or_raise(component, source_type, skip_past_events, cutoff_date, parse_errors)
+            if event is not None:
+                yield event
+
+        elif is_begin:
+            name = line[6:].strip().upper()
+            if not in_calendar:
+                in_calendar = name == "VCALENDAR"
+                continue
+            depth = 1
+            block_name = name
+            block = [line] if name in ("VEVENT", "VTIMEZONE") else None
+
+        elif in_calendar:
+            name, value = _split_content_line(line)
+            if name == "END" and value.strip().upper() == "VCALENDAR":
+                calendar_closed = True
+                break
+            if name == "PRODID":
+                prodid = value
+
+    if not in_calendar:
+        raise ValueError("Format iCal invalid: BEGIN:VCALENDAR lipseste")
+    if not calendar_closed:
+        # A truncated download must not be mistaken for events removed from the feed
+        raise ValueError("Format iCal invalid: feed incomplet (END:VCALENDAR lipseste)")
+
+    horizon_end = now + timedelta(days=recurrence_horizon_days)
+    for series_uid, components in series.items():
+        for occurrence_uid, occurrence in _expand_series(
+            series_uid, components, cutoff_date, horizon_end, parse_errors
+        ):
+            event = _build_event_or_raise(
+                occurrence, source_type, skip_past_events, cutoff_date, parse_errors, occurrence_uid
+            )
+            if event is not None:
+                yield event
 
     if parse_errors:
         logger.warning(
@@ -334,7 +707,46 @@ def parse_ical_events(
             "; ".join(parse_errors[:5]),  # Log first 5 only
         )
 
-    return events
+
+def parse_ical_events(
+    ical_text: str,
+    skip_past_events: bool = True,
+    past_retention_days: int = ICAL_PAST_EVENT_RETENTION_DAYS,
+    recurrence_horizon_days: int = ICAL_RECURRENCE_HORIZON_DAYS,
+) -> list[dict]:
+    """Parse iCal text and extract events with platform-specific handling.
+
+    In-memory wrapper around iter_ical_events() for content that is already a
+    string; feeds fetched by the sync are streamed instead.
+
+    Returns:
+        List of event dicts (see iter_ical_events).
+    """
+    return list(iter_ical_events(
+        ical_text.splitlines(), skip_past_events, past_retention_days, recurrence_horizon_days
+    ))
+
+
+def _trusts_validators(source: ICalSource, now: datetime) -> bool:
+    """Whether the source's feed validators can skip a sync.
+
+    They are only trusted until the next periodic full sync, which also
+    prunes events that aged past the retention window.
+    """
+    return (
+        source.last_full_sync_at is not None
+        and now - source.last_full_sync_at < timedelta(hours=ICAL_FULL_SYNC_INTERVAL_HOURS)
+    )
+
+
+async def _fetch_source_feed(source: ICalSource, now: datetime) -> ICalFeed | None:
+    """fetch_ical_feed() for a source, conditional on its validators while they are trusted."""
+    trust_validators = _trusts_validators(source, now)
+    return await fetch_ical_feed(
+        source.ical_url,
+        etag=source.feed_etag if trust_validators else None,
+        last_modified=source.feed_last_modified if trust_validators else None,
+    )
 
 
 async def sync_ical_source(db: AsyncSession, source: ICalSource) -> dict:
@@ -347,166 +759,371 @@ async def sync_ical_source(db: AsyncSession, source: ICalSource) -> dict:
     Returns:
         Dict with keys: created, updated, deleted, errors, total_events.
     """
+    now = datetime.now(timezone.utc)
+    feed = await _fetch_source_feed(source, now)
+    return await _apply_source_feed(db, source, feed, now)
+
+
+async def _apply_source_feed(
+    db: AsyncSession,
+    source: ICalSource,
+    feed: ICalFeed | None,
+    now: datetime,
+) -> dict:
+    """Apply a feed fetched by _fetch_source_feed() at `now` to the source (closes the feed)."""
     sync_result = {
         "created": 0,
         "updated": 0,
         "deleted": 0,
         "errors": [],
         "total_events": 0,
+        "unchanged": False,
     }
 
-    ical_text = await fetch_ical_feed(source.ical_url)
-    if not ical_text:
+    if not feed:
         error_message = "Eroare la descarcarea feed-ului iCal"
         source.last_sync_error = error_message
-        source.last_synced_at = datetime.now(timezone.utc)
+        source.last_synced_at = now
         sync_result["errors"].append(error_message)
         return sync_result
 
+    # Nothing changed since the last complete sync: skip parsing and DB work
+    trust_validators = _trusts_validators(source, now)
+    if feed.not_modified or (trust_validators and feed.content_hash == source.feed_content_hash):
+        source.last_synced_at = now
+        source.last_sync_error = None
+        if feed.etag:
+            source.feed_etag = feed.etag
+        if feed.last_modified:
+            source.feed_last_modified = feed.last_modified
+        sync_result["unchanged"] = True
+        sync_result["total_events"] = source.events_count
+        feed.close()
+        logger.info("iCal feed for source %d unchanged, skipping", source.id)
+        return sync_result
+
+    # Blocks are written chunk by chunk while the feed is parsed; the
+    # savepoint undoes them if the feed turns out to be invalid, so the
+    # existing blocks are left untouched
     try:
-        events = parse_ical_events(ical_text)
-    except (ValueError, Exception) as parse_error:
+        async with db.begin_nested():
+            await _apply_feed_events(db, source, iter_ical_events(feed.iter_lines()), sync_result)
+    except ValueError as parse_error:
         error_message = f"Eroare la parsarea feed-ului iCal: {parse_error}"
         source.last_sync_error = error_message
         source.last_synced_at = datetime.now(timezone.utc)
-        sync_result["errors"].append(error_message)
+        sync_result.update(created=0, updated=0, deleted=0, total_events=0, errors=[error_message])
         return sync_result
+    finally:
+        feed.close()
 
-    sync_result["total_events"] = len(events)
+    # Update source metadata
+    source.last_synced_at = datetime.now(timezone.utc)
+    source.last_sync_error = None if not sync_result["errors"] else "; ".join(sync_result["errors"][:3])
+    source.events_count = sync_result["total_events"]
+    # Keep the validators only for a complete sync; with per-event errors
+    # (e.g. no employee assigned yet) the next poll must process the feed again
+    if sync_result["errors"]:
+        source.feed_etag = source.feed_last_modified = source.feed_content_hash = None
+    else:
+        source.feed_etag = feed.etag
+        source.feed_last_modified = feed.last_modified
+        source.feed_content_hash = feed.content_hash
+        source.last_full_sync_at = source.last_synced_at
 
-    # Get existing iCal-imported appointments for this source
-    existing_query = select(Appointment).where(
-        and_(
-            Appointment.ical_source_id == source.id,
-            Appointment.source == "ical_block",
-        )
+    logger.info(
+        "iCal sync for source %d (%s): created=%d, updated=%d, deleted=%d, total=%d",
+        source.id, source.name,
+        sync_result["created"], sync_result["updated"],
+        sync_result["deleted"], sync_result["total_events"],
     )
-    existing_result = await db.execute(existing_query)
-    existing_appointments_by_uid = {
-        appointment.ical_uid: appointment
-        for appointment in existing_result.scalars().all()
-    }
 
-    synced_uids: set[str] = set()
+    return sync_result
+
 
-    for event in events:
-        uid = event["uid"]
-        synced_uids.add(uid)
-
-        # Build the internal notes with guest/booking info
-        guest_info = event.get("guest_info", {})
-        notes_parts = [f"iCal: {event['summary']}"]
-        if guest_info.get("guest_name"):
-            notes_parts.append(f"Oaspete: {guest_info['guest_name']}")
-        if guest_info.get("booking_reference"):
-            notes_parts.append(f"Referinta: {guest_info['booking_reference']}")
-        internal_notes = " | ".join(notes_parts)
-
-        if uid in existing_appointments_by_uid:
-            # Update existing appointment
-            existing_appointment = existing_appointments_by_uid[uid]
-            changed = False
-
-            if existing_appointment.start_time != event["start"]:
-                existing_appointment.start_time = event["start"]
-                changed = True
-            if existing_appointment.end_time != event["end"]:
-                existing_appointment.end_time = event["end"]
-                changed = True
-            if existing_appointment.duration_minutes != event["duration_minutes"]:
-                existing_appointment.duration_minutes = event["duration_minutes"]
-                changed = True
-            if existing_appointment.internal_notes != internal_notes:
-                existing_appointment.internal_notes = internal_notes
-                changed = True
-
-            if changed:
-                sync_result["updated"] += 1
-        else:
-            # Create new blocked appointment
-            employee_id = source.employee_id
-            if not employee_id:
-                sync_result["errors"].append(
-                    f"Event {uid}: Sursa iCal nu are angajat asociat -- ignorat"
+def _block_notes(event: dict) -> str:
+    """Internal notes of an imported block, with the guest/booking info."""
+    guest_info = event.get("guest_info", {})
+    notes_parts = [f"iCal: {event['summary']}"]
+    if guest_info.get("guest_name"):
+        notes_parts.append(f"Oaspete: {guest_info['guest_name']}")
+    if guest_info.get("booking_reference"):
+        notes_parts.append(f"Referinta: {guest_info['booking_reference']}")
+    return " | ".join(notes_parts)
+
+
+async def _upsert_block_chunk(
+    db: AsyncSession,
+    source: ICalSource,
+    chunk: dict[str, tuple],
+    seen_uids: set[str],
+    sync_result: dict,
+) -> None:
+    """Upsert one chunk of feed rows (uid -> start, end, duration, notes) as blocks.
+
+    Two statements: the current times of the chunk's blocks (for cache
+    invalidation) and one INSERT ... SELECT FROM unnest(...) ON CONFLICT
+    (ical_source_id, ical_uid) DO UPDATE that only touches rows whose times
+    or notes changed. The chunk's UIDs are then added to seen_uids.
+    """
+    uids = list(chunk)
+    uids_array = literal(uids, ARRAY(String))
+    previous_times = {
+        uid: (start_time, end_time)
+        for uid, start_time, end_time in (
+            await db.execute(
+                select(Appointment.ical_uid, Appointment.start_time, Appointment.end_time)
+                .where(
+                    Appointment.ical_source_id == source.id,
+                    Appointment.source == "ical_block",
+                    Appointment.ical_uid == any_(uids_array),
                 )
-                continue
-
-            new_appointment = Appointment(
-                business_id=source.business_id,
-                employee_id=employee_id,
-                service_id=None,  # No service for calendar blocks
-                start_time=event["start"],
-                end_time=event["end"],
-                duration_minutes=event["duration_minutes"],
-                status="confirmed",
-                source="ical_block",
-                ical_source_id=source.id,
-                ical_uid=uid,
-                internal_notes=internal_notes,
-                price=0,
-                final_price=0,
             )
-            db.add(new_appointment)
+        ).all()
+    }
+
+    starts, ends, durations, notes = (list(column) for column in zip(*chunk.values()))
+    rows = func.unnest(
+        uids_array,
+        literal(starts, ARRAY(DateTime(timezone=True))),
+        literal(ends, ARRAY(DateTime(timezone=True))),
+        literal(durations, ARRAY(Integer)),
+        literal(notes, ARRAY(Text)),
+    ).table_valued(
+        "ical_uid", "start_time", "end_time", "duration_minutes", "internal_notes"
+    ).render_derived(name="feed_rows")
+
+    stmt = pg_insert(Appointment).from_select(
+        [
+            "business_id", "employee_id", "service_id", "ical_source_id", "ical_uid",
+            "start_time", "end_time", "duration_minutes", "internal_notes",
+            "status", "source", "price", "final_price",
+        ],
+        select(
+            literal(source.business_id),
+            literal(source.employee_id),
+            null(),  # No service for calendar blocks
+            literal(source.id),
+            rows.c.ical_uid,
+            rows.c.start_time,
+            rows.c.end_time,
+            rows.c.duration_minutes,
+            rows.c.internal_notes,
+            literal("confirmed"),
+            literal("ical_block"),
+            literal(0.0),
+            literal(0.0),
+        ),
+    )
+    synced_columns = ("start_time", "end_time", "duration_minutes", "internal_notes")
+    stmt = stmt.on_conflict_do_update(
+        constraint=ICAL_BLOCK_UID_CONSTRAINT,
+        set_={
+            **{column: stmt.excluded[column] for column in synced_columns},
+            "updated_at": datetime.now(timezone.utc),
+        },
+        where=or_(*(
+            Appointment.__table__.c[column].is_distinct_from(stmt.excluded[column])
+            for column in synced_columns
+        )),
+    ).returning(
+        Appointment.ical_uid,
+        Appointment.employee_id,
+        Appointment.start_time,
+        Appointment.end_time,
+        # xmax is 0 for a freshly inserted row version
+        literal_column("xmax = 0").label("inserted"),
+    )
+
+    for uid, block_employee_id, start_time, end_time, inserted in (await db.execute(stmt)).all():
+        if inserted:
             sync_result["created"] += 1
+        elif uid not in seen_uids:
+            # A UID already upserted by an earlier chunk is a repeat within
+            # the feed, not an update of an existing block
+            sync_result["updated"] += 1
+        previous_start, previous_end = previous_times.get(uid, (None, None))
+        invalidate_employee_days(db, block_employee_id, previous_start, previous_end)
+        invalidate_employee_days(db, block_employee_id, start_time, end_time)
+
+    seen_uids.update(uids)
+
+
+async def _apply_feed_events(
+    db: AsyncSession,
+    source: ICalSource,
+    events: Iterable[dict],
+    sync_result: dict,
+) -> None:
+    """Create, update and delete the source's blocked appointments to match the feed events.
+
+    Events are upserted in chunks of ICAL_UPSERT_CHUNK_SIZE while the feed
+    is parsed (_upsert_block_chunk), so memory and statement size stay flat
+    whatever the feed size; only the set of UIDs seen is kept, for the final
+    DELETE of the blocks no longer in the feed.
+    """
+    employee_id = source.employee_id
+    seen_uids: set[str] = set()
+    # Repeated UIDs (e.g. modified instances of a recurring event): the last one wins
+    chunk: dict[str, tuple] = {}
+    for event in events:
+        sync_result["total_events"] += 1
+        if not employee_id:
+            # Still parsed to the end, so an invalid feed is reported as such
+            continue
+        chunk[event["uid"]] = (
+            event["start"], event["end"], event["duration_minutes"], _block_notes(event)
+        )
+        if len(chunk) >= ICAL_UPSERT_CHUNK_SIZE:
+            await _upsert_block_chunk(db, source, chunk, seen_uids, sync_result)
+            chunk = {}
+
+    if sync_result["total_events"] and not employee_id:
+        # Blocks cannot be created without an employee; leave the existing ones
+        # until one is assigned
+        sync_result["errors"].append(
+            f"Sursa iCal nu are angajat asociat -- {sync_result['total_events']} evenimente ignorate"
+        )
+        return
+    if chunk:
+        await _upsert_block_chunk(db, source, chunk, seen_uids, sync_result)
 
     # Remove events that no longer exist in the feed
-    for uid, existing_appointment in existing_appointments_by_uid.items():
-        if uid not in synced_uids:
-            await db.delete(existing_appointment)
-            sync_result["deleted"] += 1
+    deleted = await db.execute(
+        delete(Appointment)
+        .where(
+            Appointment.ical_source_id == source.id,
+            Appointment.source == "ical_block",
+            Appointment.ical_uid != all_(literal(list(seen_uids), ARRAY(String))),
+        )
+        .returning(Appointment.employee_id, Appointment.start_time, Appointment.end_time)
+        .execution_options(synchronize_session=False)
+    )
+    for block_employee_id, start_time, end_time in deleted.all():
+        invalidate_employee_days(db, block_employee_id, start_time, end_time)
+        sync_result["deleted"] += 1
 
-    # Update source metadata
-    source.last_synced_at = datetime.now(timezone.utc)
-    source.last_sync_error = None if not sync_result["errors"] else "; ".join(sync_result["errors"][:3])
-    source.events_count = len(events)
 
-    logger.info(
-        "iCal sync for source %d (%s): created=%d, updated=%d, deleted=%d, total=%d",
-        source.id, source.name,
-        sync_result["created"], sync_result["updated"],
-        sync_result["deleted"], sync_result["total_events"],
+def _due_filter(now: datetime):
+    """Active sources whose sync_interval_minutes has elapsed since their last sync."""
+    next_sync_at = (
+        ICalSource.last_synced_at
+        + ICalSource.sync_interval_minutes * literal_column("interval '1 minute'")
+        - timedelta(minutes=ICAL_SCHEDULE_SLACK_MINUTES)
+    )
+    return and_(
+        ICalSource.is_active == True,
+        or_(ICalSource.last_synced_at.is_(None), next_sync_at <= now),
     )
 
-    return sync_result
 
+async def _sync_claimed_source(
+    session_factory: async_sessionmaker,
+    source_id: int,
+    now: datetime,
+) -> dict | None:
+    """Sync one source in its own session and transaction.
 
-async def sync_all_sources(db: AsyncSession) -> dict:
-    """Sync all active iCal sources (called by Celery beat).
+    The feed is downloaded first, without a row lock or a pooled connection
+    (the fetch can take ICAL_FETCH_MAX_RETRIES x ICAL_FETCH_TIMEOUT). The
+    source row is then locked (FOR UPDATE SKIP LOCKED) while the feed is
+    applied, until the commit, so an overlapping run skips it instead of
+    syncing it twice; at worst both runs download the feed. Returns None if
+    the source was skipped.
+    """
+    started = time.monotonic()
+    async with session_factory() as db:
+        result = await db.execute(select(ICalSource).where(ICalSource.id == source_id, _due_filter(now)))
+        source = result.scalar_one_or_none()
+    if source is None:
+        return None
+
+    feed = None
+    fetched_at = datetime.now(timezone.utc)
+    try:
+        feed = await _fetch_source_feed(source, fetched_at)
+        async with session_factory() as db:
+            result = await db.execute(
+                select(ICalSource)
+                .where(ICalSource.id == source_id, _due_filter(now))
+                .with_for_update(skip_locked=True)
+            )
+            source = result.scalar_one_or_none()
+            if source is None:
+                # Claimed or synced by an overlapping run during the download
+                return None
+            source_result = await _apply_source_feed(db, source, feed, fetched_at)
+            await db.commit()
+    except Exception as sync_error:
+        logger.error("Failed to sync iCal source %d: %s", source_id, sync_error)
+        async with session_factory() as db:
+            await db.execute(
+                update(ICalSource)
+                .where(ICalSource.id == source_id)
+                .values(last_sync_error=str(sync_error), last_synced_at=datetime.now(timezone.utc))
+            )
+            await db.commit()
+        source_result = {"error": str(sync_error)}
+    finally:
+        if feed is not None:
+            feed.close()
+
+    source_result["duration_seconds"] = round(time.monotonic() - started, 2)
+    return source_result
+
+
+async def sync_due_sources(session_factory: async_sessionmaker = AsyncSessionLocal) -> dict:
+    """Sync every active iCal source that is due (called by Celery beat).
+
+    Sources run concurrently, at most ICAL_SYNC_CONCURRENCY at a time, each
+    in its own session and transaction, so one slow or failing feed neither
+    delays nor rolls back the others.
 
     Returns:
-        Summary dict with per-source results.
+        Summary dict with per-source results and timings.
     """
-    result = await db.execute(
-        select(ICalSource).where(ICalSource.is_active == True)
-    )
-    sources = result.scalars().all()
+    started = time.monotonic()
+    now = datetime.now(timezone.utc)
+    async with session_factory() as db:
+        result = await db.execute(
+            select(ICalSource.id).where(_due_filter(now)).order_by(ICalSource.last_synced_at.nulls_first())
+        )
+        source_ids = result.scalars().all()
+
+    semaphore = asyncio.Semaphore(settings.ICAL_SYNC_CONCURRENCY)
+
+    async def run(source_id: int) -> dict | None:
+        async with semaphore:
+            return await _sync_claimed_source(session_factory, source_id, now)
+
+    outcomes = await asyncio.gather(*(run(source_id) for source_id in source_ids))
 
     summary = {
-        "total_sources": len(sources),
+        "due_sources": len(source_ids),
         "synced": 0,
         "failed": 0,
+        "skipped": 0,
         "results": {},
     }
-
-    for source in sources:
-        try:
-            source_result = await sync_ical_source(db, source)
-            summary["results"][source.id] = source_result
-            if source_result["errors"]:
-                summary["failed"] += 1
-            else:
-                summary["synced"] += 1
-        except Exception as sync_error:
-            logger.error("Failed to sync iCal source %d: %s", source.id, sync_error)
-            source.last_sync_error = str(sync_error)
+    for source_id, source_result in zip(source_ids, outcomes):
+        if source_result is None:
+            summary["skipped"] += 1
+            continue
+        summary["results"][source_id] = source_result
+        if source_result.get("error") or source_result.get("errors"):
             summary["failed"] += 1
-            summary["results"][source.id] = {"error": str(sync_error)}
-
-    await db.commit()
+        else:
+            summary["synced"] += 1
 
+    summary["duration_seconds"] = round(time.monotonic() - started, 2)
+    slowest = sorted(
+        summary["results"].items(), key=lambda item: item[1]["duration_seconds"], reverse=True
+    )[:5]
     logger.info(
-        "iCal sync complete: %d sources, %d synced, %d failed",
-        summary["total_sources"], summary["synced"], summary["failed"],
+        "iCal sync complete: %d due, %d synced, %d failed, %d skipped in %.1fs; slowest: %s",
+        summary["due_sources"], summary["synced"], summary["failed"], summary["skipped"],
+        summary["duration_seconds"],
+        ", ".join(f"{source_id}={result['duration_seconds']}s" for source_id, result in slowest),
     )
     return summary
 
@@ -599,26 +599,17 @@ async def generate_and_store_invoice_pdf(
     Returns:
         URL or file path string for the stored PDF.
     """
-    from app.core.config import get_settings
-    settings = get_settings()
+    from app.services.storage import upload_to_storage
 
     pdf_bytes = generate_invoice_pdf(invoice, business)
     filename = f"factura_{invoice.series}{invoice.number:06d}_{business.slug or business.id}.pdf"
 
-    if settings.GCS_BUCKET:
-        # Production: upload to Google Cloud Storage
-        try:
-            from google.cloud import storage as gcs_storage
-            gcs_client = gcs_storage.Client(project=settings.GCS_PROJECT_ID)
-            bucket = gcs_client.bucket(settings.GCS_BUCKET)
-            blob = bucket.blob(f"invoices/{business.id}/{filename}")
-            blob.upload_from_string(pdf_bytes, content_type="application/pdf")
-            # Make the blob publicly accessible or use signed URL
-            public_url = blob.public_url
-            logger.info("Uploaded invoice PDF to GCS: %s", public_url)
-            return public_url
-        except Exception as gcs_error:
-            logger.error("Failed to upload PDF to GCS, falling back to local: %s", gcs_error)
+    # Production: upload to Google Cloud Storage
+    public_url = upload_to_storage(
+        f"invoices/{business.id}/{filename}", "application/pdf", data=pdf_bytes
+    )
+    if public_url:
+        return public_url
 
     # Development fallback: save to disk
     file_path = PDF_OUTPUT_DIR / filename
@@ -19,6 +19,7 @@ import httpx
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import get_settings
+from app.core.http import get_http_client
 from app.models.business import Business
 from app.models.client import Client
 from app.models.notification import NotificationLog
@@ -60,64 +61,64 @@ async def _send_via_infobip(
 
     headers = _get_infobip_headers()
 
-    async with httpx.AsyncClient(
-        base_url=settings.INFOBIP_BASE_URL,
-        timeout=INFOBIP_REQUEST_TIMEOUT,
-    ) as http_client:
-        try:
-            if channel == "viber":
-                resp = await http_client.post(
-                    "/viber/2/messages",
-                    headers=headers,
-                    json={
-                        "messages": [{
-                            "from": sender,
-                            "to": recipient,
-                            "content": {"text": content},
-                        }]
-                    },
-                )
-            elif channel == "whatsapp":
-                resp = await http_client.post(
-                    "/whatsapp/1/message/text",
-                    headers=headers,
-                    json={
+    http_client = get_http_client(settings.INFOBIP_BASE_URL)
+    try:
+        if channel == "viber":
+            resp = await http_client.post(
+                "/viber/2/messages",
+                headers=headers,
+                timeout=INFOBIP_REQUEST_TIMEOUT,
+                json={
+                    "messages": [{
                         "from": sender,
                         "to": recipient,
                         "content": {"text": content},
-                    },
-                )
-            elif channel == "sms":
-                resp = await http_client.post(
-                    "/sms/2/text/advanced",
-                    headers=headers,
-                    json={
-                        "messages": [{
-                            "from": sender,
-                            "destinations": [{"to": recipient}],
-                            "text": content,
-                        }]
-                    },
-                )
-            else:
-                return {"success": False, "message_id": None, "error": f"Unknown channel: {channel}"}
-
-            data = resp.json()
-            if resp.status_code in (200, 201):
-                message_id = None
-                if "messages" in data and data["messages"]:
-                    message_id = data["messages"][0].get("messageId")
-                return {"success": True, "message_id": message_id, "error": None}
-            else:
-                error_text = (
-                    data.get("requestError", {})
-                    .get("serviceException", {})
-                    .get("text", str(data))
-                )
-                return {"success": False, "message_id": None, "error": error_text}
-
-        except httpx.HTTPError as http_error:
-            return {"success": False, "message_id": None, "error": str(http_error)}
+                    }]
+                },
+            )
+        elif channel == "whatsapp":
+            resp = await http_client.post(
+                "/whatsapp/1/message/text",
+                headers=headers,
+                timeout=INFOBIP_REQUEST_TIMEOUT,
+                json={
+                    "from": sender,
+                    "to": recipient,
+                    "content": {"text": content},
+                },
+            )
+        elif channel == "sms":
+            resp = await http_client.post(
+                "/sms/2/text/advanced",
+                headers=headers,
+                timeout=INFOBIP_REQUEST_TIMEOUT,
+                json={
+                    "messages": [{
+                        "from": sender,
+                        "destinations": [{"to": recipient}],
+                        "text": content,
+                    }]
+                },
+            )
+        else:
+            return {"success": False, "message_id": None, "error": f"Unknown channel: {channel}"}
+
+        data = resp.json()
+        if resp.status_code in (200, 201):
+            message_id = None
+            if "messages" in data and data["messages"]:
+                message_id = data["messages"][0].get("messageId")
+            return {"success": True, "message_id": message_id, "error": None}
+        else:
+            error_text = (
+                data.get("requestError", {})
+                .get("serviceException", {})
+                .get("text", str(data))
+            )
+            return {"success": False, "message_id": None, "error": error_text}
+
+    except httpx.HTTPError as http_error:
+        return {"success": False, "message_id": None, "error": str(http_error)}
 
 
 async def _send_whatsapp_document(
@@ -150,31 +151,29 @@ async def _send_whatsapp_document(
         },
     }
 
-    async with httpx.AsyncClient(
-        base_url=settings.INFOBIP_BASE_URL,
-        timeout=INFOBIP_REQUEST_TIMEOUT,
-    ) as http_client:
-        try:
-            resp = await http_client.post(
-                "/whatsapp/1/message/document",
-                headers=headers,
-                json=payload,
+    http_client = get_http_client(settings.INFOBIP_BASE_URL)
+    try:
+        resp = await http_client.post(
+            "/whatsapp/1/message/document",
+            headers=headers,
+            timeout=INFOBIP_REQUEST_TIMEOUT,
+            json=payload,
+        )
+        data = resp.json()
+        if resp.status_code in (200, 201):
+            message_id = None
+            if "messages" in data and data["messages"]:
+                message_id = data["messages"][0].get("messageId")
+            return {"success": True, "message_id": message_id, "error": None}
+        else:
+            error_text = (
+                data.get("requestError", {})
+                .get("serviceException", {})
+                .get("text", str(data))
             )
-            data = resp.json()
-            if resp.status_code in (200, 201):
-                message_id = None
-                if "messages" in data and data["messages"]:
-                    message_id = data["messages"][0].get("messageId")
-                return {"success": True, "message_id": message_id, "error": None}
-            else:
-                error_text = (
-                    data.get("requestError", {})
-                    .get("serviceException", {})
-                    .get("text", str(data))
-                )
-                return {"success": False, "message_id": None, "error": error_text}
-        except httpx.HTTPError as http_error:
-            return {"success": False, "message_id": None, "error": str(http_error)}
+            return {"success": False, "message_id": None, "error": error_text}
+    except httpx.HTTPError as http_error:
+        return {"success": False, "message_id": None, "error": str(http_error)}
 
 
 async def _send_email_via_infobip(
@@ -205,63 +204,55 @@ async def _send_email_via_infobip(
         "html": html_body,
     }
 
-    async with httpx.AsyncClient(
-        base_url=settings.INFOBIP_BASE_URL,
-        timeout=INFOBIP_REQUEST_TIMEOUT,
-    ) as http_client:
-        try:
-            files = None
-            if pdf_bytes and pdf_filename:
-                files = {
-                    "attachment": (pdf_filename, pdf_bytes, "application/pdf"),
-                }
+    http_client = get_http_client(settings.INFOBIP_BASE_URL)
+    try:
+        files = None
+        if pdf_bytes and pdf_filename:
+            files = {
+                "attachment": (pdf_filename, pdf_bytes, "application/pdf"),
+            }
 
-            resp = await http_client.post(
-                "/email/3/send",
-                headers=headers,
-                data=form_data,
-                files=files,
-            )
+        resp = await http_client.post(
+            "/email/3/send",
+            headers=headers,
+            timeout=INFOBIP_REQUEST_TIMEOUT,
+            data=form_data,
+            files=files,
+        )
 
-            data = resp.json()
-            if resp.status_code in (200, 201):
-                message_id = None
-                if "messages" in data and data["messages"]:
-                    message_id = data["messages"][0].get("messageId")
-                return {"success": True, "message_id": message_id, "error": None}
-            else:
-                error_text = (
-                    data.get("requestError", {})
-                    .get("serviceException", {})
-                    .get("text", str(data))
-                )
-                return {"success": False, "message_id": None, "error": error_text}
-        except httpx.HTTPError as http_error:
-            return {"success": False, "message_id": None, "error": str(http_error)}
+        data = resp.json()
+        if resp.status_code in (200, 201):
+            message_id = None
+            if "messages" in data and data["messages"]:
+                message_id = data["messages"][0].get("messageId")
+            return {"success": True, "message_id": message_id, "error": None}
+        else:
+            error_text = (
+                data.get("requestError", {})
+                .get("serviceException", {})
+                .get("text", str(data))
+            )
+            return {"success": False, "message_id": None, "error": error_text}
+    except httpx.HTTPError as http_error:
+        return {"success": False, "message_id": None, "error": str(http_error)}
 
 
-async def send_message(
-    db: AsyncSession,
+async def deliver_message(
     business: Business,
     client: Client,
     message_type: str,
     content: str,
     appointment_id: int | None = None,
     preferred_channel: str | None = None,
-) -> dict:
-    """Send notification with Viber -> WhatsApp -> SMS fallback strategy.
+) -> tuple[dict, list[NotificationLog]]:
+    """Send a notification through the fallback chain without touching the database.
 
-    Args:
-        db: Database session for logging.
-        business: The business sending the notification.
-        client: The client receiving the notification.
-        message_type: Type of notification (booking_confirm, reminder_24h, etc.).
-        content: Text content of the message.
-        appointment_id: Optional linked appointment ID.
-        preferred_channel: Override the channel (skip fallback chain).
+    Safe to run concurrently for many clients; the caller persists the
+    returned log rows (see send_message() for the one-off variant).
 
     Returns:
-        Dict with status, channel used, message_id, and attempt count.
+        (result, logs): the send_message() result dict and one unsaved
+        NotificationLog per attempted channel.
     """
 
     # Determine channel order
@@ -287,6 +278,8 @@ async def send_message(
             return client.email
         return None
 
+    logs: list[NotificationLog] = []
+
     # Try each channel in order
     for attempt_number, channel_name in enumerate(channels, 1):
         recipient = resolve_recipient(channel_name)
@@ -315,8 +308,8 @@ async def send_message(
                 sender=settings.INFOBIP_SENDER,
             )
 
-        # Log the attempt in the database
-        notification_log = NotificationLog(
+        # Log the attempt
+        logs.append(NotificationLog(
             business_id=business.id,
             appointment_id=appointment_id,
             client_id=client.id,
@@ -329,9 +322,7 @@ async def send_message(
             error_message=result.get("error"),
             fallback_from=channels[0] if attempt_number > 1 else None,
             attempt_number=attempt_number,
-        )
-        db.add(notification_log)
-        await db.flush()
+        ))
 
         if result["success"]:
             return {
@@ -339,14 +330,47 @@ async def send_message(
                 "channel": channel_name,
                 "message_id": result.get("message_id"),
                 "attempt": attempt_number,
-            }
+            }, logs
 
         logger.warning(
             "Failed to send %s via %s to %s: %s",
             message_type, channel_name, recipient, result.get("error"),
         )
 
-    return {"status": "failed", "error": "Toate canalele de notificare au esuat"}
+    return {"status": "failed", "error": "Toate canalele de notificare au esuat"}, logs
+
+
+async def send_message(
+    db: AsyncSession,
+    business: Business,
+    client: Client,
+    message_type: str,
+    content: str,
+    appointment_id: int | None = None,
+    preferred_channel: str | None = None,
+) -> dict:
+    """Send notification with Viber -> WhatsApp -> SMS fallback strategy.
+
+    Args:
+        db: Database session for logging.
+        business: The business sending the notification.
+        client: The client receiving the notification.
+        message_type: Type of notification (booking_confirm, reminder_24h, etc.).
+        content: Text content of the message.
+        appointment_id: Optional linked appointment ID.
+        preferred_channel: Override the channel (skip fallback chain).
+
+    Returns:
+        Dict with status, channel used, message_id, and attempt count.
+    """
+    result, logs = await deliver_message(
+        business, client, message_type, content,
+        appointment_id=appointment_id,
+        preferred_channel=preferred_channel,
+    )
+    db.add_all(logs)
+    await db.flush()
+    return result
 
 
 async def send_invoice_notification(
@@ -0,0 +1,141 @@
+"""Public booking catalogue -- profile, public services and employees in one payload.
+
+The booking widget needs all three before its first availability call.
+get_booking_bootstrap() builds them in one pass and caches the serialized
+payload per business (in-process LRU, then Redis) together with an ETag
+derived from its content, so repeat visitors are answered from the cache --
+or with a 304 -- without touching the database.
+
+Entries expire after PUBLIC_CACHE_TTL_SECONDS and are dropped after commit
+by invalidate_public_catalog() whenever the business, its services, its
+employees or their service assignments change.
+"""
+
+import hashlib
+import json
+import logging
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import LocalTTLCache, get_redis, invalidate_after_commit, wait_for_invalidation
+from app.core.config import get_settings
+from app.models.business import Business
+from app.models.employee import Employee, EmployeeService
+from app.models.service import Service
+from app.schemas.business import BusinessPublicResponse
+from app.schemas.employee import EmployeePublicResponse
+from app.schemas.service import ServicePublicResponse
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+_local_catalogs = LocalTTLCache(
+    max_entries=settings.PUBLIC_CACHE_LOCAL_MAX_ENTRIES,
+    ttl_seconds=settings.PUBLIC_CACHE_LOCAL_TTL_SECONDS,
+)
+
+
+def public_catalog_key(business_id: int) -> str:
+    return f"public_catalog:{business_id}"
+
+
+def invalidate_public_catalog(db: AsyncSession, business_id: int) -> None:
+    """Drop the cached booking bootstrap of a business once the session commits."""
+    invalidate_after_commit(db, public_catalog_key(business_id))
+
+
+def content_etag(payload) -> str:
+    """Strong ETag for a JSON-serializable payload (stable across processes)."""
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return '"' + hashlib.sha256(encoded.encode("utf-8")).hexdigest()[:32] + '"'
+
+
+async def _build_bootstrap(db: AsyncSession, biz: Business) -> dict:
+    services = (
+        await db.execute(
+            select(Service)
+            .where(Service.business_id == biz.id, Service.is_active == True, Service.is_public == True)
+            .order_by(Service.sort_order)
+        )
+    ).scalars().all()
+
+    employees = (
+        await db.execute(
+            select(Employee)
+            .where(Employee.business_id == biz.id, Employee.is_active == True)
+            .order_by(Employee.sort_order)
+        )
+    ).scalars().all()
+
+    # Which services each employee performs, so the widget can filter the
+    # team locally instead of calling /employees?service_id=... per service
+    assignments = await db.execute(
+        select(EmployeeService.employee_id, EmployeeService.service_id)
+        .join(Employee, EmployeeService.employee_id == Employee.id)
+        .where(Employee.business_id == biz.id, Employee.is_active == True)
+        .order_by(EmployeeService.employee_id, EmployeeService.service_id)
+    )
+    service_ids_by_employee: dict[int, list[int]] = {}
+    for employee_id, service_id in assignments:
+        service_ids_by_employee.setdefault(employee_id, []).append(service_id)
+
+    return {
+        "business": BusinessPublicResponse.model_validate(biz).model_dump(mode="json"),
+        "services": [
+            ServicePublicResponse.model_validate(svc).model_dump(mode="json") for svc in services
+        ],
+        "employees": [
+            {
+                **EmployeePublicResponse.model_validate(emp).model_dump(mode="json"),
+                "service_ids": service_ids_by_employee.get(emp.id, []),
+            }
+            for emp in employees
+        ],
+    }
+
+
+async def _read_cached(key: str) -> dict | None:
+    entry = _local_catalogs.get(key)
+    if entry is not None:
+        return entry
+    redis = get_redis()
+    if redis is None:
+        return None
+    await wait_for_invalidation(key)
+    try:
+        raw = await redis.get(key)
+    except Exception as cache_error:
+        logger.warning("Public catalogue cache read failed: %s", cache_error)
+        return None
+    if not raw:
+        return None
+    entry = json.loads(raw)
+    _local_catalogs.set(key, entry)
+    return entry
+
+
+async def _write_cached(key: str, entry: dict) -> None:
+    _local_catalogs.set(key, entry)
+    redis = get_redis()
+    if redis is None:
+        return
+    try:
+        await redis.set(key, json.dumps(entry), ex=settings.PUBLIC_CACHE_TTL_SECONDS)
+    except Exception as cache_error:
+        logger.warning("Public catalogue cache write failed: %s", cache_error)
+
+
+async def get_booking_bootstrap(db: AsyncSession, biz: Business) -> tuple[dict, str]:
+    """Return (payload, etag) for the public booking page of a business, cache first."""
+    key = public_catalog_key(biz.id)
+    if settings.PUBLIC_CACHE_ENABLED:
+        entry = await _read_cached(key)
+        if entry is not None:
+            return entry["payload"], entry["etag"]
+
+    payload = await _build_bootstrap(db, biz)
+    etag = content_etag(payload)
+    if settings.PUBLIC_CACHE_ENABLED:
+        await _write_cached(key, {"payload": payload, "etag": etag})
+    return payload, etag
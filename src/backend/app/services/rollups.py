@@ -0,0 +1,341 @@
+"""Daily stats rollup -- maintains daily_business_stats from the raw tables.
+
+Each (business, day) row is always recomputed from scratch for that day, so a
+refresh is idempotent and can be re-run safely. Three entry points:
+
+- refresh_dirty_days(): incremental run (Celery beat, every few minutes).
+  Finds days touched since the previous run via updated_at/created_at
+  watermarks and recomputes only those. Its own watermark lives in
+  rollup_state and is only advanced by this run.
+- refresh_recent_window(): nightly sweep of a window around today. Catches
+  what watermarks cannot see: hard deletes and appointments rescheduled away
+  from a day (only the new day is visible through updated_at).
+- backfill(): rebuilds the full history of one or all businesses.
+
+Days are UTC calendar days, like the dashboard's period boundaries.
+"""
+
+import logging
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+from typing import Iterable
+
+from sqlalchemy import func, select, union
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.appointment import Appointment
+from app.models.business import Business
+from app.models.client import Client
+from app.models.daily_business_stats import DailyBusinessStats, RollupState
+from app.models.notification import NotificationLog
+
+logger = logging.getLogger(__name__)
+
+# rollup_state row of the incremental refresh
+DAILY_STATS_ROLLUP = "daily_business_stats"
+
+# Re-scan margin so rows from transactions that committed after the previous
+# run started (but were stamped before it) are not missed
+WATERMARK_SAFETY_MARGIN = timedelta(minutes=5)
+
+# First incremental run without a watermark only looks this far back
+# (use backfill() to populate history)
+INITIAL_LOOKBACK = timedelta(days=1)
+
+# Nightly sweep window around today
+RECENT_WINDOW_DAYS_BACK = 7
+RECENT_WINDOW_DAYS_AHEAD = 62
+
+# Days farther apart than this are recomputed with separate range queries
+MAX_CLUSTER_GAP_DAYS = 7
+MAX_CLUSTER_SPAN_DAYS = 62
+
+STAT_COLUMNS = (
+    "appointments_total",
+    "pending",
+    "confirmed",
+    "in_progress",
+    "completed",
+    "cancelled",
+    "no_shows",
+    "revenue",
+    "revenue_expected",
+    "new_clients",
+    "notifications_count",
+    "notifications_cost",
+    "notifications_by_channel",
+)
+
+
+def utc_day(column):
+    """SQL expression: UTC calendar day of a timestamptz column."""
+    return func.date(func.timezone("UTC", column))
+
+
+def _day_start(day: date) -> datetime:
+    return datetime(day.year, day.month, day.day, tzinfo=timezone.utc)
+
+
+def _empty_stats() -> dict:
+    stats = {column: 0 for column in STAT_COLUMNS}
+    stats["revenue"] = 0.0
+    stats["revenue_expected"] = 0.0
+    stats["notifications_cost"] = 0.0
+    stats["notifications_by_channel"] = {}
+    return stats
+
+
+def _clusters(days: list[date]) -> list[list[date]]:
+    """Split sorted days into runs that can share one range query."""
+    clusters: list[list[date]] = []
+    for day in days:
+        if (
+            clusters
+            and (day - clusters[-1][-1]).days <= MAX_CLUSTER_GAP_DAYS
+            and (day - clusters[-1][0]).days < MAX_CLUSTER_SPAN_DAYS
+        ):
+            clusters[-1].append(day)
+        else:
+            clusters.append([day])
+    return clusters
+
+
+async def _compute_days(db: AsyncSession, business_id: int, days: list[date]) -> dict[date, dict]:
+    """Aggregate raw rows for a cluster of days (three grouped range queries)."""
+    range_start = _day_start(days[0])
+    range_end = _day_start(days[-1]) + timedelta(days=1)
+    stats = {day: _empty_stats() for day in days}
+
+    apt_day = utc_day(Appointment.start_time)
+    apt_result = await db.execute(
+        select(
+            apt_day.label("day"),
+            func.count(Appointment.id).label("appointments_total"),
+            func.count(Appointment.id).filter(Appointment.status == "pending").label("pending"),
+            func.count(Appointment.id).filter(Appointment.status == "confirmed").label("confirmed"),
+            func.count(Appointment.id).filter(Appointment.status == "in_progress").label("in_progress"),
+            func.count(Appointment.id).filter(Appointment.status == "completed").label("completed"),
+            func.count(Appointment.id).filter(Appointment.status == "cancelled").label("cancelled"),
+            func.count(Appointment.id).filter(Appointment.status == "no_show").label("no_shows"),
+            func.coalesce(
+                func.sum(Appointment.final_price).filter(Appointment.status == "completed"), 0
+            ).label("revenue"),
+            func.coalesce(
+                func.sum(Appointment.final_price).filter(Appointment.status.notin_(["cancelled"])), 0
+            ).label("revenue_expected"),
+        )
+        .where(
+            Appointment.business_id == business_id,
+            Appointment.start_time >= range_start,
+            Appointment.start_time < range_end,
+        )
+        .group_by(apt_day)
+    )
+    for row in apt_result.all():
+        if row.day not in stats:
+            continue
+        day_stats = stats[row.day]
+        for column in ("appointments_total", "pending", "confirmed", "in_progress",
+                       "completed", "cancelled", "no_shows"):
+            day_stats[column] = int(getattr(row, column))
+        day_stats["revenue"] = round(float(row.revenue), 2)
+        day_stats["revenue_expected"] = round(float(row.revenue_expected), 2)
+
+    client_day = utc_day(Client.created_at)
+    client_result = await db.execute(
+        select(client_day.label("day"), func.count(Client.id).label("count"))
+        .where(
+            Client.business_id == business_id,
+            Client.created_at >= range_start,
+            Client.created_at < range_end,
+        )
+        .group_by(client_day)
+    )
+    for row in client_result.all():
+        if row.day in stats:
+            stats[row.day]["new_clients"] = int(row.count)
+
+    notif_day = utc_day(NotificationLog.created_at)
+    notif_result = await db.execute(
+        select(
+            notif_day.label("day"),
+            NotificationLog.channel,
+            NotificationLog.status,
+            func.count(NotificationLog.id).label("count"),
+            func.coalesce(func.sum(NotificationLog.cost), 0).label("cost"),
+        )
+        .where(
+            NotificationLog.business_id == business_id,
+            NotificationLog.created_at >= range_start,
+            NotificationLog.created_at < range_end,
+        )
+        .group_by(notif_day, NotificationLog.channel, NotificationLog.status)
+    )
+    for row in notif_result.all():
+        if row.day not in stats:
+            continue
+        day_stats = stats[row.day]
+        count, cost = int(row.count), float(row.cost)
+        channel = day_stats["notifications_by_channel"].setdefault(
+            row.channel, {"count": 0, "cost": 0.0, "delivered": 0, "failed": 0}
+        )
+        channel["count"] += count
+        channel["cost"] = round(channel["cost"] + cost, 4)
+        if row.status in ("sent", "delivered"):
+            channel["delivered"] += count
+        elif row.status == "failed":
+            channel["failed"] += count
+        day_stats["notifications_count"] += count
+        day_stats["notifications_cost"] = round(day_stats["notifications_cost"] + cost, 4)
+
+    return stats
+
+
+async def refresh_days(
+    db: AsyncSession,
+    business_id: int,
+    days: Iterable[date],
+    refreshed_at: datetime | None = None,
+) -> int:
+    """Recompute and upsert rollup rows for one business and a set of days.
+
+    Days without any activity are written as zero rows, so a day whose last
+    appointment was removed is corrected too.
+
+    Returns:
+        Number of rows upserted.
+    """
+    sorted_days = sorted(set(days))
+    refreshed_at = refreshed_at or datetime.now(timezone.utc)
+    upserted = 0
+
+    for cluster in _clusters(sorted_days):
+        stats = await _compute_days(db, business_id, cluster)
+        rows = [
+            {"business_id": business_id, "day": day, "refreshed_at": refreshed_at, **day_stats}
+            for day, day_stats in stats.items()
+        ]
+        stmt = pg_insert(DailyBusinessStats).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            constraint="uq_daily_business_stats_business_day",
+            set_={column: stmt.excluded[column] for column in (*STAT_COLUMNS, "refreshed_at")},
+        )
+        await db.execute(stmt)
+        upserted += len(rows)
+
+    return upserted
+
+
+async def collect_dirty_days(db: AsyncSession, since: datetime) -> dict[int, set[date]]:
+    """Return {business_id: days} touched since a watermark (one UNION query)."""
+    dirty_query = union(
+        select(Appointment.business_id, utc_day(Appointment.start_time).label("day"))
+        .where(Appointment.updated_at >= since),
+        select(Client.business_id, utc_day(Client.created_at).label("day"))
+        .where(Client.created_at >= since),
+        select(NotificationLog.business_id, utc_day(NotificationLog.created_at).label("day"))
+        .where(NotificationLog.created_at >= since),
+    )
+    result = await db.execute(dirty_query)
+
+    dirty: dict[int, set[date]] = defaultdict(set)
+    for business_id, day in result.all():
+        dirty[business_id].add(day)
+    return dirty
+
+
+async def refresh_dirty_days(db: AsyncSession) -> dict:
+    """Incremental refresh: recompute only the days touched since the previous run."""
+    run_started = datetime.now(timezone.utc)
+    last_run = (await db.execute(
+        select(RollupState.watermark).where(RollupState.name == DAILY_STATS_ROLLUP)
+    )).scalar()
+    since = (last_run or run_started - INITIAL_LOOKBACK) - WATERMARK_SAFETY_MARGIN
+
+    dirty = await collect_dirty_days(db, since)
+    rows = 0
+    for business_id, days in dirty.items():
+        rows += await refresh_days(db, business_id, days, refreshed_at=run_started)
+
+    # Advanced in the same transaction as the rows, so a failed run is retried
+    # from the previous watermark
+    stmt = pg_insert(RollupState).values(name=DAILY_STATS_ROLLUP, watermark=run_started)
+    await db.execute(stmt.on_conflict_do_update(
+        index_elements=["name"], set_={"watermark": stmt.excluded.watermark}
+    ))
+    await db.commit()
+
+    logger.info(
+        "Daily stats incremental refresh: %d businesses, %d rows (since %s)",
+        len(dirty), rows, since.isoformat(),
+    )
+    return {"businesses": len(dirty), "rows": rows}
+
+
+async def refresh_recent_window(db: AsyncSession) -> dict:
+    """Recompute [today - N, today + M] for every active business (nightly sweep)."""
+    today = datetime.now(timezone.utc).date()
+    window = [
+        today + timedelta(days=offset)
+        for offset in range(-RECENT_WINDOW_DAYS_BACK, RECENT_WINDOW_DAYS_AHEAD + 1)
+    ]
+    result = await db.execute(select(Business.id).where(Business.is_active == True))
+    business_ids = result.scalars().all()
+
+    rows = 0
+    for business_id in business_ids:
+        rows += await refresh_days(db, business_id, window)
+        await db.commit()
+
+    logger.info("Daily stats window refresh: %d businesses, %d rows", len(business_ids), rows)
+    return {"businesses": len(business_ids), "rows": rows}
+
+
+async def backfill(db: AsyncSession, business_id: int | None = None) -> dict:
+    """Rebuild the rollup history for one business (or all), month by month.
+
+    Commits after every month so memory and transaction size stay bounded.
+    """
+    query = select(Business.id).order_by(Business.id)
+    if business_id is not None:
+        query = query.where(Business.id == business_id)
+    business_ids = (await db.execute(query)).scalars().all()
+
+    rows = 0
+    for current_id in business_ids:
+        bounds = await db.execute(
+            select(
+                func.min(utc_day(Appointment.start_time)),
+                func.max(utc_day(Appointment.start_time)),
+            ).where(Appointment.business_id == current_id)
+        )
+        first_apt_day, last_apt_day = bounds.one()
+        first_client_day = (await db.execute(
+            select(func.min(utc_day(Client.created_at))).where(Client.business_id == current_id)
+        )).scalar()
+        first_notif_day = (await db.execute(
+            select(func.min(utc_day(NotificationLog.created_at))).where(
+                NotificationLog.business_id == current_id
+            )
+        )).scalar()
+
+        first_day = min((d for d in (first_apt_day, first_client_day, first_notif_day) if d), default=None)
+        if first_day is None:
+            continue
+        last_day = max(last_apt_day or first_day, datetime.now(timezone.utc).date())
+
+        month_start = first_day.replace(day=1)
+        while month_start <= last_day:
+            next_month = (month_start + timedelta(days=32)).replace(day=1)
+            month_days = [
+                month_start + timedelta(days=offset)
+                for offset in range((next_month - month_start).days)
+            ]
+            rows += await refresh_days(db, current_id, month_days)
+            await db.commit()
+            month_start = next_month
+
+        logger.info("Daily stats backfill done for business %d", current_id)
+
+    return {"businesses": len(business_ids), "rows": rows}
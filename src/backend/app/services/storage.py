@@ -0,0 +1,58 @@
+"""File storage -- Google Cloud Storage in production, local temp directory in development."""
+
+import logging
+from datetime import timedelta
+from pathlib import Path
+
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+def upload_to_storage(
+    object_name: str,
+    content_type: str,
+    data: bytes | None = None,
+    file_path: Path | None = None,
+    signed_url_ttl: timedelta | None = None,
+) -> str | None:
+    """Upload bytes or a local file to the GCS bucket.
+
+    Files are uploaded from disk (chunked by the client library), so large
+    exports never have to be held in memory.
+
+    Args:
+        object_name: Object path inside the bucket, e.g. "invoices/12/factura.pdf".
+        content_type: MIME type stored on the object.
+        data: In-memory content (small files such as invoice PDFs).
+        file_path: Local file to upload (large files such as exports).
+        signed_url_ttl: Return a V4 signed GET URL valid this long instead of
+            the public URL, for private objects such as exports with client data.
+
+    Returns:
+        Public (or signed) URL of the object, or None if GCS is not configured
+        or the upload failed (callers fall back to local storage).
+    """
+    if not settings.GCS_BUCKET:
+        return None
+
+    try:
+        from google.cloud import storage as gcs_storage
+        gcs_client = gcs_storage.Client(project=settings.GCS_PROJECT_ID)
+        bucket = gcs_client.bucket(settings.GCS_BUCKET)
+        blob = bucket.blob(object_name)
+        if file_path is not None:
+            blob.upload_from_filename(str(file_path), content_type=content_type)
+        else:
+            blob.upload_from_string(data or b"", content_type=content_type)
+        if signed_url_ttl is not None:
+            signed_url = blob.generate_signed_url(version="v4", expiration=signed_url_ttl, method="GET")
+            logger.info("Uploaded %s to GCS (signed URL valid %s)", object_name, signed_url_ttl)
+            return signed_url
+        public_url = blob.public_url
+        logger.info("Uploaded %s to GCS: %s", object_name, public_url)
+        return public_url
+    except Exception as gcs_error:
+        logger.error("Failed to upload %s to GCS, falling back to local: %s", object_name, gcs_error)
+        return None
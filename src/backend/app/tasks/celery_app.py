@@ -15,6 +15,8 @@ celery_app = Celery(
         "app.tasks.reminders",
         "app.tasks.ical_tasks",
         "app.tasks.invoice_tasks",
+        "app.tasks.rollup_tasks",
+        "app.tasks.export_tasks",
     ],
 )
 
@@ -40,14 +42,24 @@ celery_app.conf.beat_schedule = {
         "schedule": crontab(minute="*/15"),
         "args": (1,),
     },
-    # Sync iCal sources every 15 minutes
+    # Sync due iCal sources (each source has its own sync_interval_minutes)
     "sync-ical-sources": {
         "task": "app.tasks.ical_tasks.sync_all_ical_sources",
-        "schedule": crontab(minute="*/15"),
+        "schedule": crontab(minute="*/5"),
     },
     # Mark no-shows daily at midnight
     "mark-noshows": {
         "task": "app.tasks.reminders.mark_no_shows",
         "schedule": crontab(hour=0, minute=30),
     },
+    # Refresh daily stats rollup for recently touched days
+    "refresh-daily-stats": {
+        "task": "app.tasks.rollup_tasks.refresh_daily_stats",
+        "schedule": crontab(minute="*/10"),
+    },
+    # Re-sweep the recent window nightly (deletes, reschedules)
+    "refresh-daily-stats-window": {
+        "task": "app.tasks.rollup_tasks.refresh_daily_stats_window",
+        "schedule": crontab(hour=1, minute=15),
+    },
 }
@@ -0,0 +1,75 @@
+"""Celery tasks for large accounting exports (CSV / XLSX / Parquet)."""
+
+import logging
+from datetime import date
+
+from app.core.database import AsyncSessionLocal
+from app.services.exports import (
+    build_export_query,
+    count_export_rows,
+    export_file_path,
+    store_export,
+    write_export,
+)
+from app.tasks.celery_app import celery_app
+from app.tasks.worker_loop import run_async
+
+logger = logging.getLogger(__name__)
+
+# Report progress to the result backend at most this often (rows)
+PROGRESS_EVERY_ROWS = 5000
+
+
+async def _run_export(
+    task,
+    task_id: str,
+    business_id: int,
+    dataset: str,
+    export_format: str,
+    date_from: str | None,
+    date_to: str | None,
+) -> dict:
+    query = build_export_query(
+        dataset,
+        business_id,
+        date.fromisoformat(date_from) if date_from else None,
+        date.fromisoformat(date_to) if date_to else None,
+    )
+    file_path = export_file_path(business_id, dataset, export_format, task_id)
+
+    async with AsyncSessionLocal() as db:
+        total_rows = await count_export_rows(db, query)
+        progress = {"business_id": business_id, "dataset": dataset, "format": export_format,
+                    "rows": 0, "total": total_rows}
+        last_reported = 0
+
+        def report(rows_written: int):
+            nonlocal last_reported
+            if rows_written - last_reported < PROGRESS_EVERY_ROWS:
+                return
+            last_reported = rows_written
+            task.update_state(task_id=task_id, state="PROGRESS", meta={**progress, "rows": rows_written})
+
+        task.update_state(task_id=task_id, state="PROGRESS", meta=progress)
+        rows_written = await write_export(db, query, export_format, file_path, on_progress=report)
+
+    url = store_export(file_path, business_id)
+    logger.info(
+        "Export %s/%s for business %d done: %d rows -> %s",
+        dataset, export_format, business_id, rows_written, url or file_path,
+    )
+    return {**progress, "rows": rows_written, "url": url, "filename": file_path.name}
+
+
+@celery_app.task(name="app.tasks.export_tasks.run_export", bind=True)
+def run_export(
+    self,
+    business_id: int,
+    dataset: str,
+    export_format: str,
+    date_from: str | None = None,
+    date_to: str | None = None,
+):
+    """Celery task: build an export file and store it (GCS or local)."""
+    task_id = self.request.id or "local"
+    return run_async(_run_export(self, task_id, business_id, dataset, export_format, date_from, date_to))
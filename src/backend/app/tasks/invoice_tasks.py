@@ -7,13 +7,13 @@ Async pipeline:
 4. Submit e-Factura to ANAF if applicable (B2B invoice)
 """
 
-import asyncio
 import logging
 
 from app.core.database import AsyncSessionLocal
 from app.models.business import Business
 from app.models.invoice import Invoice
 from app.tasks.celery_app import celery_app
+from app.tasks.worker_loop import run_async
 
 logger = logging.getLogger(__name__)
 
@@ -65,7 +65,7 @@ def process_invoice_pipeline(self, invoice_id: int, business_id: int):
     Retries up to 3 times with 60-second delay on failure.
     """
     try:
-        result = asyncio.run(_process_invoice_pipeline(invoice_id, business_id))
+        result = run_async(_process_invoice_pipeline(invoice_id, business_id))
         if result.get("errors"):
             logger.warning(
                 "Invoice pipeline for %d completed with errors: %s",
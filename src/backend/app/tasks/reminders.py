@@ -2,103 +2,217 @@
 
 import asyncio
 import logging
+import time
+from collections import Counter
 from datetime import datetime, timedelta, timezone
 
-from sqlalchemy import and_, select
+from sqlalchemy import Date, Integer, cast, func, literal, select, update
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
+from app.core.config import get_settings
 from app.core.database import AsyncSessionLocal
 from app.models.appointment import Appointment
 from app.models.business import Business
 from app.models.client import Client
-from app.models.employee import Employee
 from app.models.service import Service
-from app.services.notification import format_reminder, send_message
+from app.services.notification import deliver_message, format_reminder
 from app.tasks.celery_app import celery_app
+from app.tasks.worker_loop import run_async
 
 logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+# hours_before -> (sent marker column, how late a reminder may still go out).
+# The lateness covers one missed beat run (24h runs hourly, 1h every 15 min).
+REMINDERS = {
+    24: (Appointment.reminder_24h_sent_at, timedelta(hours=2)),
+    1: (Appointment.reminder_1h_sent_at, timedelta(minutes=30)),
+}
+
+
+async def _claim_reminder_batch(db: AsyncSession, sent_marker, due_before: datetime) -> list:
+    """Lock the next batch of unsent due reminders with their business, client and service.
+
+    FOR UPDATE SKIP LOCKED lets several workers split the due rows without
+    sending any reminder twice; the locks are held until the batch commits
+    its sent markers, before any reminder is sent. The filter matches the
+    partial ix_appointments_reminder_*_due indexes, so only unsent rows are
+    scanned.
+    """
+    query = (
+        select(Appointment, Business, Client, Service)
+        .join(Business, Appointment.business_id == Business.id)
+        .join(Client, Appointment.client_id == Client.id)
+        .outerjoin(Service, Appointment.service_id == Service.id)
+        .where(
+            sent_marker.is_(None),
+            Appointment.client_id.is_not(None),
+            Appointment.status.in_(["pending", "confirmed"]),
+            Appointment.start_time <= due_before,
+        )
+        .order_by(Appointment.start_time, Appointment.id)
+        .limit(settings.REMINDER_BATCH_SIZE)
+        .with_for_update(of=Appointment, skip_locked=True)
+    )
+    return (await db.execute(query)).all()
+
+
+async def _send_reminders(hours_before: int) -> dict:
+    """Send the `hours_before` reminder for every appointment that is due and not yet reminded.
+
+    Batches are claimed with SKIP LOCKED and marked (reminder_<N>h_sent_at)
+    in a short transaction, then sent through a bounded pool of concurrent
+    provider requests with no row locks held, and their notification logs
+    written in a second commit. Appointments already too close to their
+    start are marked without sending.
+
+    Returns:
+        Run metrics (counts, duration, throughput) -- also the task result.
+    """
+    if hours_before not in REMINDERS:
+        raise ValueError(f"No reminder configured {hours_before}h before appointments")
+    sent_marker, max_lateness = REMINDERS[hours_before]
+
+    started = time.monotonic()
+    message_type = f"reminder_{hours_before}h"
+    stats = {
+        "hours_before": hours_before, "due": 0, "sent": 0, "failed": 0,
+        "errors": 0, "skipped": 0, "batches": 0,
+    }
+    semaphore = asyncio.Semaphore(settings.REMINDER_SEND_CONCURRENCY)
+
+    async def send_one(apt: Appointment, business: Business, client: Client, service: Service):
+        async with semaphore:
+            content = format_reminder(
+                business_name=business.name,
+                service_name=service.name,
+                start_time=apt.start_time,
+                hours_before=hours_before,
+            )
+            return await deliver_message(
+                business=business,
+                client=client,
+                message_type=message_type,
+                content=content,
+                appointment_id=apt.id,
+            )
 
-
-async def _send_reminders(hours_before: int):
-    """Send reminders for appointments happening in `hours_before` hours."""
     async with AsyncSessionLocal() as db:
-        now = datetime.now(timezone.utc)
-        window_start = now + timedelta(hours=hours_before - 0.5)
-        window_end = now + timedelta(hours=hours_before + 0.5)
-
-        result = await db.execute(
-            select(Appointment).where(
-                and_(
-                    Appointment.status.in_(["pending", "confirmed"]),
-                    Appointment.start_time >= window_start,
-                    Appointment.start_time < window_end,
-                )
+        while True:
+            now = datetime.now(timezone.utc)
+            rows = await _claim_reminder_batch(db, sent_marker, now + timedelta(hours=hours_before))
+            if not rows:
+                break
+
+            # Every claimed row is marked before anything is sent, including
+            # late ones and later failures (logged), so no run picks them up
+            # again, and committed so the row locks are not held across the
+            # provider requests. A worker that dies mid-batch loses those
+            # reminders rather than sending them twice. updated_at is kept as
+            # is: a reminder does not change anything the daily stats rollup reads.
+            await db.execute(
+                update(Appointment)
+                .where(Appointment.id.in_([row[0].id for row in rows]))
+                .values({sent_marker: now, Appointment.updated_at: Appointment.updated_at})
+                .execution_options(synchronize_session=False)
             )
-        )
-        appointments = result.scalars().all()
-
-        for apt in appointments:
-            try:
-                business = await db.get(Business, apt.business_id)
-                client = await db.get(Client, apt.client_id) if apt.client_id else None
-                service = await db.get(Service, apt.service_id)
-
-                if not client or not business or not service:
+            await db.commit()
+
+            send_after = now + timedelta(hours=hours_before) - max_lateness
+            to_send = [row for row in rows if row[3] is not None and row[0].start_time >= send_after]
+            stats["skipped"] += len(rows) - len(to_send)
+
+            outcomes = await asyncio.gather(*(send_one(*row) for row in to_send), return_exceptions=True)
+            logs = []
+            for (apt, *_), outcome in zip(to_send, outcomes):
+                if isinstance(outcome, Exception):
+                    stats["errors"] += 1
+                    logger.error("Failed to send reminder for appointment %d: %s", apt.id, outcome)
                     continue
-
-                content = format_reminder(
-                    business_name=business.name,
-                    service_name=service.name,
-                    start_time=apt.start_time,
-                    hours_before=hours_before,
-                )
-
-                await send_message(
-                    db=db,
-                    business=business,
-                    client=client,
-                    message_type=f"reminder_{hours_before}h",
-                    content=content,
-                    appointment_id=apt.id,
-                )
-            except Exception as e:
-                logger.error("Failed to send reminder for appointment %d: %s", apt.id, e)
-
-        await db.commit()
-
-
-async def _mark_no_shows():
-    """Mark appointments from yesterday that are still 'confirmed' as no_show."""
-    async with AsyncSessionLocal() as db:
-        yesterday = datetime.now(timezone.utc) - timedelta(days=1)
-        yesterday_start = yesterday.replace(hour=0, minute=0, second=0, microsecond=0)
-        yesterday_end = yesterday_start + timedelta(days=1)
+                if isinstance(outcome, BaseException):
+                    raise outcome
+                result, attempt_logs = outcome
+                logs.extend(attempt_logs)
+                stats["sent" if result["status"] == "sent" else "failed"] += 1
+
+            db.add_all(logs)
+            await db.commit()
+
+            stats["due"] += len(rows)
+            stats["batches"] += 1
+            # Keep the identity map from growing across batches
+            db.expunge_all()
+            if len(rows) < settings.REMINDER_BATCH_SIZE:
+                break
+
+    elapsed = time.monotonic() - started
+    stats["duration_seconds"] = round(elapsed, 2)
+    stats["per_second"] = round(stats["due"] / elapsed, 1) if elapsed > 0 else 0.0
+    logger.info(
+        "Reminders %dh: %d due, %d sent, %d failed, %d errors, %d skipped in %.1fs (%.1f/s, %d batches)",
+        hours_before, stats["due"], stats["sent"], stats["failed"], stats["errors"], stats["skipped"],
+        elapsed, stats["per_second"], stats["batches"],
+    )
+    return stats
+
+
+async def _mark_no_shows(session_factory: async_sessionmaker = AsyncSessionLocal) -> dict:
+    """Mark yesterday's still-'confirmed' appointments as no_show, per business timezone.
+
+    "Yesterday" is the previous calendar day in each business's own timezone.
+    Two statements whatever the volume: one UPDATE ... RETURNING client_id
+    over appointments, then one UPDATE of clients joined to the per-client
+    counts (unnest of two arrays).
+    """
+    async with session_factory() as db:
+        now = datetime.now(timezone.utc)
+        local_day = cast(func.timezone(Business.timezone, Appointment.start_time), Date)
+        local_today = cast(func.timezone(Business.timezone, func.now()), Date)
 
         result = await db.execute(
-            select(Appointment).where(
-                and_(
-                    Appointment.status == "confirmed",
-                    Appointment.start_time >= yesterday_start,
-                    Appointment.start_time < yesterday_end,
-                )
+            update(Appointment)
+            .where(
+                Appointment.business_id == Business.id,
+                Appointment.status == "confirmed",
+                local_day == local_today - 1,
+                # Yesterday in any timezone lies within the last 48h; keeps the
+                # scan on the start_time indexes
+                Appointment.start_time >= now - timedelta(days=2),
+                Appointment.start_time < now,
             )
+            # Explicit so the daily stats rollup sees these days as dirty
+            .values(status="no_show", updated_at=now)
+            .returning(Appointment.client_id)
+            .execution_options(synchronize_session=False)
         )
-
-        for apt in result.scalars().all():
-            apt.status = "no_show"
-            # Update client no-show count
-            if apt.client_id:
-                client = await db.get(Client, apt.client_id)
-                if client:
-                    client.no_show_count += 1
+        client_ids = result.scalars().all()
+
+        no_shows_by_client = Counter(client_id for client_id in client_ids if client_id is not None)
+        if no_shows_by_client:
+            per_client = func.unnest(
+                literal(list(no_shows_by_client), ARRAY(Integer)),
+                literal(list(no_shows_by_client.values()), ARRAY(Integer)),
+            ).table_valued("client_id", "no_shows").render_derived(name="per_client")
+            await db.execute(
+                update(Client)
+                .where(Client.id == per_client.c.client_id)
+                .values(no_show_count=Client.no_show_count + per_client.c.no_shows)
+                .execution_options(synchronize_session=False)
+            )
 
         await db.commit()
 
+    logger.info("Marked %d no-shows for %d clients", len(client_ids), len(no_shows_by_client))
+    return {"no_shows": len(client_ids), "clients": len(no_shows_by_client)}
+
 
 @celery_app.task(name="app.tasks.reminders.send_upcoming_reminders")
 def send_upcoming_reminders(hours_before: int):
-    asyncio.run(_send_reminders(hours_before))
+    return run_async(_send_reminders(hours_before))
 
 
 @celery_app.task(name="app.tasks.reminders.mark_no_shows")
 def mark_no_shows():
-    asyncio.run(_mark_no_shows())
+    return run_async(_mark_no_shows())
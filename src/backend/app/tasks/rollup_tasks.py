@@ -0,0 +1,55 @@
+"""Celery tasks for the daily_business_stats rollup.
+
+Backfill after deploying the migration (or to rebuild one business):
+
+    python -m app.tasks.rollup_tasks backfill [--business-id ID]
+"""
+
+import argparse
+import asyncio
+import logging
+
+from app.core.database import AsyncSessionLocal
+from app.services import rollups
+from app.tasks.celery_app import celery_app
+from app.tasks.worker_loop import run_async
+
+logger = logging.getLogger(__name__)
+
+
+@celery_app.task(name="app.tasks.rollup_tasks.refresh_daily_stats")
+def refresh_daily_stats():
+    """Recompute rollup rows for days touched since the previous run."""
+    return run_async(_run(rollups.refresh_dirty_days))
+
+
+@celery_app.task(name="app.tasks.rollup_tasks.refresh_daily_stats_window")
+def refresh_daily_stats_window():
+    """Nightly sweep: recompute the recent window (catches deletes and reschedules)."""
+    return run_async(_run(rollups.refresh_recent_window))
+
+
+@celery_app.task(name="app.tasks.rollup_tasks.backfill_daily_stats")
+def backfill_daily_stats(business_id: int | None = None):
+    """Rebuild the full rollup history for one business or all of them."""
+    return run_async(_run(rollups.backfill, business_id=business_id))
+
+
+async def _run(job, **kwargs) -> dict:
+    async with AsyncSessionLocal() as db:
+        return await job(db, **kwargs)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Daily business stats rollup")
+    parser.add_argument("command", choices=["backfill", "refresh", "window"])
+    parser.add_argument("--business-id", type=int, default=None)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    if args.command == "backfill":
+        print(asyncio.run(_run(rollups.backfill, business_id=args.business_id)))
+    elif args.command == "refresh":
+        print(asyncio.run(_run(rollups.refresh_dirty_days)))
+    else:
+        print(asyncio.run(_run(rollups.refresh_recent_window)))
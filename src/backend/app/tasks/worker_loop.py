@@ -0,0 +1,110 @@
+"""One long-lived asyncio event loop per Celery worker process.
+
+Tasks used to call asyncio.run() per invocation: a new loop each time,
+while the module-level engine's asyncpg pool (and the Redis client) kept
+connections bound to whichever loop opened them -- reconnecting on every
+task at best, cross-loop errors under load at worst.
+
+Instead, each worker process runs a single loop in a background thread,
+started on worker_process_init (or lazily, for the solo/threads pools and
+eager calls). run_async() submits a task's coroutine to it and blocks until
+it finishes, so the pool and Redis connections are opened once and reused
+by every task in the process; the shared HTTP clients are created on the
+loop as soon as it starts. On shutdown the engine, Redis and HTTP clients
+are disposed on that loop before it stops.
+"""
+
+import asyncio
+import logging
+import threading
+from typing import Any, Coroutine
+
+from celery.signals import worker_process_init, worker_process_shutdown, worker_shutdown
+
+from app.core.cache import close_redis, wait_for_pending_invalidations
+from app.core.database import engine
+from app.core.http import close_http_clients, open_http_clients
+
+logger = logging.getLogger(__name__)
+
+# Seconds to wait for the engine/Redis cleanup before abandoning the loop
+SHUTDOWN_TIMEOUT_SECONDS = 10
+
+_loop: asyncio.AbstractEventLoop | None = None
+_thread: threading.Thread | None = None
+_lock = threading.Lock()
+
+
+def _start_loop() -> asyncio.AbstractEventLoop:
+    global _loop, _thread
+    with _lock:
+        if _loop is None:
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(
+                target=loop.run_forever, name="celery-asyncio-loop", daemon=True
+            )
+            thread.start()
+            asyncio.run_coroutine_threadsafe(open_http_clients(), loop).result()
+            _loop, _thread = loop, thread
+        return _loop
+
+
+async def _run_task(coro: Coroutine) -> Any:
+    try:
+        return await coro
+    finally:
+        # Post-commit cache invalidations are done before the task reports success
+        await wait_for_pending_invalidations()
+
+
+def run_async(coro: Coroutine) -> Any:
+    """Run a coroutine on the worker's event loop and return its result (blocking).
+
+    Runs on the loop thread, so task.request is not available inside the
+    coroutine -- pass the task id in explicitly.
+    """
+    loop = _loop or _start_loop()
+    return asyncio.run_coroutine_threadsafe(_run_task(coro), loop).result()
+
+
+async def _dispose() -> None:
+    await engine.dispose()
+    await close_redis()
+    await close_http_clients()
+
+
+def stop_loop() -> None:
+    """Dispose the engine, Redis and HTTP clients on the loop, then stop it."""
+    global _loop, _thread
+    with _lock:
+        loop, thread = _loop, _thread
+        _loop = _thread = None
+    if loop is None:
+        return
+    try:
+        asyncio.run_coroutine_threadsafe(_dispose(), loop).result(timeout=SHUTDOWN_TIMEOUT_SECONDS)
+    except Exception as dispose_error:
+        logger.warning("Worker loop cleanup failed: %s", dispose_error)
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(timeout=SHUTDOWN_TIMEOUT_SECONDS)
+    if not thread.is_alive():
+        loop.close()
+
+
+@worker_process_init.connect
+def _init_worker_process(**kwargs) -> None:
+    # The pool object was copied from the parent at fork; drop it without
+    # closing the parent's connections so this process opens its own
+    engine.sync_engine.dispose(close=False)
+    _start_loop()
+
+
+@worker_process_shutdown.connect
+def _shutdown_worker_process(**kwargs) -> None:
+    stop_loop()
+
+
+@worker_shutdown.connect
+def _shutdown_worker(**kwargs) -> None:
+    # Solo/threads pools run tasks in the main process (no worker_process_* signals)
+    stop_loop()
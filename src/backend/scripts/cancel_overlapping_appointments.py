@@ -0,0 +1,101 @@
+"""Find (and optionally cancel) double-bookings that block the overlap constraint.
+
+Migration c4d2e8a1f3b7 refuses to add ex_appointments_employee_no_overlap
+while active appointments of an employee overlap. This script lists them
+and proposes to cancel the later-booked side of each conflict: per
+employee, bookings involved in an overlap are walked in booking order
+(created_at, id), and one that overlaps a booking already kept is proposed
+for cancellation, so each conflict costs the fewest and latest bookings.
+
+Nothing is changed unless --apply is given. Review the list (and tell the
+affected clients) first. Run from src/backend:
+
+    python -m scripts.cancel_overlapping_appointments           # dry run
+    python -m scripts.cancel_overlapping_appointments --apply
+"""
+
+import argparse
+import asyncio
+
+from sqlalchemy import text
+
+from app.core.database import AsyncSessionLocal, engine
+
+ACTIVE_BOOKING = "{table}.status IN ('pending', 'confirmed', 'in_progress') AND {table}.source <> 'ical_block'"
+
+CANCELLATION_REASON = "Suprapunere cu o programare existenta"
+
+
+async def find_overlaps(db) -> list[tuple]:
+    """(id, employee_id, start_time, end_time, created_at) of every active booking in an overlap."""
+    result = await db.execute(text(
+        f"""
+        SELECT DISTINCT a.id, a.employee_id, a.start_time, a.end_time, a.created_at
+        FROM appointments a
+        JOIN appointments b
+          ON b.employee_id = a.employee_id
+         AND b.id <> a.id
+         AND tstzrange(b.start_time, b.end_time) && tstzrange(a.start_time, a.end_time)
+        WHERE {ACTIVE_BOOKING.format(table='a')} AND {ACTIVE_BOOKING.format(table='b')}
+        ORDER BY a.employee_id, a.created_at, a.id
+        """
+    ))
+    return result.all()
+
+
+def pick_cancellations(rows: list[tuple]) -> list[int]:
+    """Ids to cancel so that no two kept bookings of an employee overlap."""
+    kept: dict[int, list[tuple]] = {}
+    cancelled_ids: list[int] = []
+    for appointment_id, employee_id, start_time, end_time, _created_at in rows:
+        employee_kept = kept.setdefault(employee_id, [])
+        if any(start_time < kept_end and kept_start < end_time for kept_start, kept_end in employee_kept):
+            cancelled_ids.append(appointment_id)
+        else:
+            employee_kept.append((start_time, end_time))
+    return cancelled_ids
+
+
+async def main(apply: bool) -> None:
+    try:
+        await _run(apply)
+    finally:
+        await engine.dispose()
+
+
+async def _run(apply: bool) -> None:
+    async with AsyncSessionLocal() as db:
+        rows = await find_overlaps(db)
+        cancelled_ids = pick_cancellations(rows)
+        if not cancelled_ids:
+            print("No overlapping active appointments.")
+            return
+
+        by_id = {row[0]: row for row in rows}
+        print(f"{len(rows)} active appointments overlap; {len(cancelled_ids)} to cancel:")
+        for appointment_id in cancelled_ids:
+            _, employee_id, start_time, end_time, created_at = by_id[appointment_id]
+            print(
+                f"  appointment {appointment_id} (employee {employee_id}, "
+                f"{start_time:%Y-%m-%d %H:%M}-{end_time:%H:%M}, booked {created_at:%Y-%m-%d %H:%M})"
+            )
+
+        if not apply:
+            print("Dry run: nothing changed. Re-run with --apply to cancel them.")
+            return
+        await db.execute(
+            text(
+                "UPDATE appointments SET status = 'cancelled', cancelled_at = now(), "
+                "cancelled_by = 'system', cancellation_reason = :reason, updated_at = now() "
+                "WHERE id = ANY(:ids)"
+            ),
+            {"ids": cancelled_ids, "reason": CANCELLATION_REASON},
+        )
+        await db.commit()
+        print(f"Cancelled {len(cancelled_ids)} appointments.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--apply", action="store_true", help="cancel the listed appointments")
+    asyncio.run(main(parser.parse_args().apply))
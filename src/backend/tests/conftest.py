@@ -9,6 +9,7 @@ import pytest_asyncio
 from httpx import ASGITransport, AsyncClient
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
+from app.core.cache import clear_local_caches, delete_keys
 from app.core.database import Base, get_db
 from app.core.security import create_access_token, hash_password
 from app.main import app
@@ -42,6 +43,12 @@ async def setup_database():
     await test_engine.dispose()
 
 
+@pytest.fixture(autouse=True)
+def reset_local_caches():
+    """Rows are recreated per test with the same slugs; don't serve the previous test's copies."""
+    clear_local_caches()
+
+
 @pytest_asyncio.fixture
 async def db_session():
     """Provide a transactional database session that rolls back after each test."""
@@ -100,6 +107,7 @@ async def test_user(db_session: AsyncSession):
 @pytest_asyncio.fixture
 async def test_business(db_session: AsyncSession, test_user):
     """Create a test business owned by the test user."""
+    from app.api.deps import public_business_key
     from app.models.business import Business
 
     biz = Business(
@@ -122,6 +130,8 @@ async def test_business(db_session: AsyncSession, test_user):
     )
     db_session.add(biz)
     await db_session.flush()
+    # Slug resolution cached in Redis by an earlier test points at its row
+    await delete_keys(public_business_key(biz.slug))
 
     return biz
 
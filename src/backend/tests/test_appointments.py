@@ -90,6 +90,330 @@ async def test_availability_endpoint(client: AsyncClient, test_user, test_busine
     assert data["employee_id"] == test_employee.id
 
 
+@pytest.mark.asyncio
+async def test_availability_marks_booked_slots(client: AsyncClient, test_user, test_business, test_service, test_employee, test_client_record):
+    """Test that slots overlapping an existing appointment are unavailable."""
+    tomorrow = datetime.now(timezone.utc) + timedelta(days=1)
+    if tomorrow.weekday() == 6:
+        pytest.skip("Employee doesn't work on Sunday")
+    start_time = tomorrow.replace(hour=11, minute=0, second=0, microsecond=0)
+
+    create_response = await client.post(
+        f"/api/v1/businesses/{test_business.id}/appointments/",
+        headers=test_user["headers"],
+        json={
+            "employee_id": test_employee.id,
+            "service_id": test_service.id,
+            "client_id": test_client_record.id,
+            "start_time": start_time.isoformat(),
+            "source": "manual",
+        },
+    )
+    assert create_response.status_code == 201
+
+    response = await client.get(
+        f"/api/v1/businesses/{test_business.id}/appointments/availability",
+        headers=test_user["headers"],
+        params={
+            "employee_id": test_employee.id,
+            "service_id": test_service.id,
+            "date": tomorrow.strftime("%Y-%m-%d"),
+        },
+    )
+    assert response.status_code == 200
+    data = response.json()
+    by_start = {
+        datetime.fromisoformat(slot["start"]).strftime("%H:%M"): slot["available"]
+        for slot in data["slots"]
+    }
+    # 45 min service + 10 min buffer: 10:30 and 11:00 overlap, 12:00 is free
+    assert by_start["10:30"] is False
+    assert by_start["11:00"] is False
+    assert by_start["12:00"] is True
+    assert data["total_slots"] == len(data["slots"])
+    assert data["total_available"] == sum(1 for slot in data["slots"] if slot["available"])
+
+
+def test_day_slots_with_overlapping_shifts():
+    """Test that a booking inside two overlapping shifts blocks its slots once."""
+    from datetime import date
+    from app.services.availability import build_day_slots, day_bounds
+
+    monday = date(2026, 10, 19)
+    day_start, _ = day_bounds(monday)
+    schedule = {"mon": [{"start": "09:00", "end": "13:00"}, {"start": "11:00", "end": "15:00"}]}
+    busy = [(day_start.replace(hour=12), day_start.replace(hour=12, minute=30))]
+
+    slots = build_day_slots(schedule, monday, busy, slot_minutes=30)
+
+    by_start = {slot.start.strftime("%H:%M"): slot.available for slot in slots}
+    assert len(by_start) == len(slots) == 12  # 09:00 .. 14:30, no duplicates
+    assert by_start["12:00"] is False
+    assert by_start["11:30"] is True
+    assert by_start["12:30"] is True
+
+
+@pytest.mark.asyncio
+async def test_list_appointments_keyset_pagination(client: AsyncClient, test_user, test_business, test_service, test_employee, test_client_record):
+    """Test that list pages with X-Next-Cursor and enriches names."""
+    day = datetime.now(timezone.utc) + timedelta(days=3)
+    for hour in (9, 10, 11):
+        response = await client.post(
+            f"/api/v1/businesses/{test_business.id}/appointments/",
+            headers=test_user["headers"],
+            json={
+                "employee_id": test_employee.id,
+                "service_id": test_service.id,
+                "client_id": test_client_record.id,
+                "start_time": day.replace(hour=hour, minute=0, second=0, microsecond=0).isoformat(),
+                "source": "manual",
+            },
+        )
+        assert response.status_code == 201
+
+    params = {"employee_id": test_employee.id, "limit": 2}
+    first_page = await client.get(
+        f"/api/v1/businesses/{test_business.id}/appointments/",
+        headers=test_user["headers"],
+        params=params,
+    )
+    assert first_page.status_code == 200
+    assert len(first_page.json()) == 2
+    assert first_page.json()[0]["employee_name"] == "Ana P."
+    assert first_page.json()[0]["service_name"] == "Tuns dama"
+    assert first_page.json()[0]["client_name"] == "Ioana Marinescu"
+    next_cursor = first_page.headers["X-Next-Cursor"]
+
+    second_page = await client.get(
+        f"/api/v1/businesses/{test_business.id}/appointments/",
+        headers=test_user["headers"],
+        params={**params, "cursor": next_cursor},
+    )
+    assert second_page.status_code == 200
+    assert len(second_page.json()) == 1
+    assert "X-Next-Cursor" not in second_page.headers
+
+
+@pytest.mark.asyncio
+async def test_calendar_view(client: AsyncClient, test_user, test_business, test_service, test_employee, test_client_record):
+    """Test the compact calendar projection for a week view."""
+    day = datetime.now(timezone.utc) + timedelta(days=2)
+    start_time = day.replace(hour=12, minute=0, second=0, microsecond=0)
+    create_response = await client.post(
+        f"/api/v1/businesses/{test_business.id}/appointments/",
+        headers=test_user["headers"],
+        json={
+            "employee_id": test_employee.id,
+            "service_id": test_service.id,
+            "client_id": test_client_record.id,
+            "start_time": start_time.isoformat(),
+            "source": "manual",
+        },
+    )
+    assert create_response.status_code == 201
+
+    response = await client.get(
+        f"/api/v1/businesses/{test_business.id}/appointments/calendar",
+        headers=test_user["headers"],
+        params={"date": day.strftime("%Y-%m-%d"), "view": "week", "employee_ids": [test_employee.id]},
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["view"] == "week"
+    assert data["total_events"] == len(data["events"])
+    event = next(e for e in data["events"] if e["id"] == create_response.json()["id"])
+    assert event["title"] == "Tuns dama - Ioana Marinescu"
+    assert event["color"] == "#8b5cf6"
+    assert event["employee_name"] == "Ana P."
+
+
+@pytest.mark.asyncio
+async def test_daily_stats_rollup_refresh(client: AsyncClient, db_session, test_user, test_business, test_service, test_employee, test_client_record):
+    """Test that the rollup recomputes a day from raw appointments, including zero rows."""
+    from app.models.daily_business_stats import DailyBusinessStats
+    from app.services.rollups import refresh_days
+    from sqlalchemy import select
+
+    day = datetime.now(timezone.utc) + timedelta(days=4)
+    create_response = await client.post(
+        f"/api/v1/businesses/{test_business.id}/appointments/",
+        headers=test_user["headers"],
+        json={
+            "employee_id": test_employee.id,
+            "service_id": test_service.id,
+            "client_id": test_client_record.id,
+            "start_time": day.replace(hour=13, minute=0, second=0, microsecond=0).isoformat(),
+            "source": "manual",
+        },
+    )
+    assert create_response.status_code == 201
+
+    empty_day = (day + timedelta(days=1)).date()
+    assert await refresh_days(db_session, test_business.id, [day.date(), empty_day]) == 2
+
+    result = await db_session.execute(
+        select(DailyBusinessStats)
+        .where(DailyBusinessStats.business_id == test_business.id)
+        .order_by(DailyBusinessStats.day)
+    )
+    rows = {row.day: row for row in result.scalars().all()}
+    assert rows[day.date()].appointments_total == 1
+    assert rows[day.date()].revenue_expected == 80.0
+    assert rows[day.date()].revenue == 0
+    assert rows[empty_day].appointments_total == 0
+
+
+@pytest.mark.asyncio
+async def test_dirty_refresh_watermark_ignores_other_refreshes(client: AsyncClient, db_session, test_user, test_business, test_service, test_employee, test_client_record):
+    """Test that refreshes outside the incremental run do not move its watermark past unprocessed changes."""
+    from app.models.appointment import Appointment
+    from app.models.daily_business_stats import DailyBusinessStats, RollupState
+    from app.services.rollups import DAILY_STATS_ROLLUP, refresh_days, refresh_dirty_days
+    from sqlalchemy import select, update
+    from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+    now = datetime.now(timezone.utc)
+    day = now + timedelta(days=6)
+    create_response = await client.post(
+        f"/api/v1/businesses/{test_business.id}/appointments/",
+        headers=test_user["headers"],
+        json={
+            "employee_id": test_employee.id,
+            "service_id": test_service.id,
+            "client_id": test_client_record.id,
+            "start_time": day.replace(hour=11, minute=0, second=0, microsecond=0).isoformat(),
+            "source": "manual",
+        },
+    )
+    assert create_response.status_code == 201
+
+    # Last incremental run 30 minutes ago; the booking changed 20 minutes ago
+    stmt = pg_insert(RollupState).values(name=DAILY_STATS_ROLLUP, watermark=now - timedelta(minutes=30))
+    await db_session.execute(stmt.on_conflict_do_update(
+        index_elements=["name"], set_={"watermark": stmt.excluded.watermark}
+    ))
+    await db_session.execute(
+        update(Appointment)
+        .where(Appointment.id == create_response.json()["id"])
+        .values(updated_at=now - timedelta(minutes=20))
+    )
+    # An unrelated refresh (e.g. after an employee is deleted) stamps refreshed_at now
+    await refresh_days(db_session, test_business.id, [now.date()])
+    await db_session.commit()
+
+    await refresh_dirty_days(db_session)
+
+    stats = (await db_session.execute(
+        select(DailyBusinessStats).where(
+            DailyBusinessStats.business_id == test_business.id,
+            DailyBusinessStats.day == day.date(),
+        )
+    )).scalar_one()
+    assert stats.appointments_total == 1
+    watermark = (await db_session.execute(
+        select(RollupState.watermark).where(RollupState.name == DAILY_STATS_ROLLUP)
+    )).scalar_one()
+    assert watermark >= now
+
+
+@pytest.mark.asyncio
+async def test_reports_overview_monthly_series(client: AsyncClient, db_session, test_user, test_business, test_service, test_employee, test_client_record):
+    """Test that the 24-month report returns one entry per calendar month."""
+    from app.services.rollups import refresh_days
+
+    today = datetime.now(timezone.utc).date()
+    await refresh_days(db_session, test_business.id, [today])
+
+    response = await client.get(
+        f"/api/v1/businesses/{test_business.id}/reports/overview",
+        headers=test_user["headers"],
+        params={"months": 24},
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data["monthly_data"]) == 24
+    assert len({(m["year"], m["month"]) for m in data["monthly_data"]}) == 24
+    assert data["monthly_data"][-1]["year"] == today.year
+    # The test client was created today, so it shows up in the current month
+    assert data["client_growth"][-1]["new_clients"] >= 1
+    assert data["client_growth"][-1]["total_clients"] >= data["client_growth"][0]["total_clients"]
+    assert data["no_show_analysis"]["total_scheduled"] == sum(s["count"] for s in data["booking_sources"])
+
+
+@pytest.mark.asyncio
+async def test_appointments_csv_export(client: AsyncClient, db_session, tmp_path, test_user, test_business, test_service, test_employee, test_client_record):
+    """Test that the export writer streams appointment rows with resolved names."""
+    import csv
+    from app.services.exports import build_export_query, write_export
+
+    day = datetime.now(timezone.utc) + timedelta(days=5)
+    create_response = await client.post(
+        f"/api/v1/businesses/{test_business.id}/appointments/",
+        headers=test_user["headers"],
+        json={
+            "employee_id": test_employee.id,
+            "service_id": test_service.id,
+            "client_id": test_client_record.id,
+            "start_time": day.replace(hour=9, minute=0, second=0, microsecond=0).isoformat(),
+            "source": "manual",
+        },
+    )
+    assert create_response.status_code == 201
+
+    query = build_export_query("appointments", test_business.id, day.date(), day.date())
+    export_path = tmp_path / "appointments.csv"
+    progress = []
+    rows_written = await write_export(db_session, query, "csv", export_path, on_progress=progress.append)
+
+    assert rows_written == 1
+    assert progress == [1]
+    with export_path.open(encoding="utf-8-sig") as export_file:
+        rows = list(csv.DictReader(export_file))
+    assert rows[0]["id"] == str(create_response.json()["id"])
+    assert rows[0]["employee"] == "Ana Popescu"
+    assert rows[0]["service"] == "Tuns dama"
+    assert rows[0]["client"] == "Ioana Marinescu"
+
+
+@pytest.mark.asyncio
+async def test_export_job_file_served_to_owner_only(client: AsyncClient, test_user, test_business):
+    """Test that export jobs of other businesses are hidden and a local export is served through the API."""
+    from uuid import uuid4
+    from app.services.exports import export_file_path
+    from app.tasks.celery_app import celery_app
+
+    jobs_url = f"/api/v1/businesses/{test_business.id}/exports/jobs"
+    foreign_job = await client.get(f"{jobs_url}/export-{test_business.id + 1}-abc", headers=test_user["headers"])
+    assert foreign_job.status_code == 404
+    legacy_job = await client.get(f"{jobs_url}/0f8fad5b-d9cb-469f-a165-70867728950e", headers=test_user["headers"])
+    assert legacy_job.status_code == 404
+
+    job_id = f"export-{test_business.id}-{uuid4().hex}"
+    pending = await client.get(f"{jobs_url}/{job_id}", headers=test_user["headers"])
+    assert pending.json()["status"] == "pending"
+
+    file_path = export_file_path(test_business.id, "appointments", "csv", job_id)
+    file_path.write_text("id\n1\n", encoding="utf-8")
+    celery_app.backend.store_result(
+        job_id,
+        {"business_id": test_business.id, "rows": 1, "total": 1, "url": None, "filename": file_path.name},
+        "SUCCESS",
+    )
+    try:
+        done = await client.get(f"{jobs_url}/{job_id}", headers=test_user["headers"])
+        assert done.json()["status"] == "done"
+        assert done.json()["url"].endswith(f"{jobs_url}/{job_id}/file")
+
+        unauthenticated = await client.get(f"{jobs_url}/{job_id}/file")
+        assert unauthenticated.status_code in (401, 403)
+        download = await client.get(f"{jobs_url}/{job_id}/file", headers=test_user["headers"])
+        assert download.status_code == 200
+        assert download.text == "id\n1\n"
+    finally:
+        celery_app.backend.forget(job_id)
+        file_path.unlink(missing_ok=True)
+
+
 @pytest.mark.asyncio
 async def test_status_transition(client: AsyncClient, test_user, test_business, test_service, test_employee, test_client_record):
     """Test appointment status transitions: pending -> confirmed -> in_progress -> completed."""
@@ -194,3 +518,123 @@ async def test_cancel_appointment(client: AsyncClient, test_user, test_business,
     )
     assert resp.status_code == 200
     assert resp.json()["status"] == "cancelled"
+
+
+@pytest.mark.asyncio
+async def test_reschedule_resets_reminder_markers(client: AsyncClient, db_session, test_user, test_business, test_service, test_employee, test_client_record):
+    """Test that moving an appointment makes its reminders due again."""
+    from app.models.appointment import Appointment
+
+    start_time = (datetime.now(timezone.utc) + timedelta(days=2)).replace(hour=9, minute=0, second=0, microsecond=0)
+    create_response = await client.post(
+        f"/api/v1/businesses/{test_business.id}/appointments/",
+        headers=test_user["headers"],
+        json={
+            "employee_id": test_employee.id,
+            "service_id": test_service.id,
+            "client_id": test_client_record.id,
+            "start_time": start_time.isoformat(),
+            "source": "manual",
+        },
+    )
+    apt_id = create_response.json()["id"]
+
+    apt = await db_session.get(Appointment, apt_id)
+    apt.reminder_24h_sent_at = datetime.now(timezone.utc)
+    await db_session.flush()
+
+    resp = await client.patch(
+        f"/api/v1/businesses/{test_business.id}/appointments/{apt_id}",
+        headers=test_user["headers"],
+        json={"start_time": (start_time + timedelta(hours=3)).isoformat()},
+    )
+    assert resp.status_code == 200
+
+    await db_session.refresh(apt)
+    assert apt.reminder_24h_sent_at is None
+    assert apt.reminder_1h_sent_at is None
+
+
+@pytest.mark.asyncio
+async def test_reminder_claim_skips_marked_until_rescheduled(client: AsyncClient, db_session, test_user, test_business, test_service, test_employee, test_client_record):
+    """Test that a reminded appointment is not claimed again until it is rescheduled."""
+    from app.models.appointment import Appointment
+    from app.tasks.reminders import _claim_reminder_batch
+
+    now = datetime.now(timezone.utc)
+    start_time = (now + timedelta(hours=20)).replace(minute=0, second=0, microsecond=0)
+    create_response = await client.post(
+        f"/api/v1/businesses/{test_business.id}/appointments/",
+        headers=test_user["headers"],
+        json={
+            "employee_id": test_employee.id,
+            "service_id": test_service.id,
+            "client_id": test_client_record.id,
+            "start_time": start_time.isoformat(),
+            "source": "manual",
+        },
+    )
+    apt_id = create_response.json()["id"]
+
+    async def claimed_ids() -> set[int]:
+        rows = await _claim_reminder_batch(db_session, Appointment.reminder_24h_sent_at, now + timedelta(hours=24))
+        return {row[0].id for row in rows}
+
+    assert apt_id in await claimed_ids()
+
+    apt = await db_session.get(Appointment, apt_id)
+    apt.reminder_24h_sent_at = now
+    await db_session.commit()
+    assert apt_id not in await claimed_ids()
+
+    resp = await client.patch(
+        f"/api/v1/businesses/{test_business.id}/appointments/{apt_id}",
+        headers=test_user["headers"],
+        json={"start_time": (start_time + timedelta(hours=2)).isoformat()},
+    )
+    assert resp.status_code == 200
+    assert apt_id in await claimed_ids()
+
+
+@pytest.mark.asyncio
+async def test_mark_no_shows_counts_each_appointment(db_session, test_business, test_service, test_employee, test_client_record):
+    """Test that a client with two no-shows in one run gets both counted."""
+    from zoneinfo import ZoneInfo
+    from app.models.appointment import Appointment
+    from app.models.client import Client
+    from app.tasks.reminders import _mark_no_shows
+    from tests.conftest import TestSessionLocal
+
+    local_yesterday = datetime.now(ZoneInfo(test_business.timezone)).date() - timedelta(days=1)
+    appointment_ids = []
+    for hour in (10, 14):
+        start_time = datetime(
+            local_yesterday.year, local_yesterday.month, local_yesterday.day, hour,
+            tzinfo=ZoneInfo(test_business.timezone),
+        ).astimezone(timezone.utc)
+        apt = Appointment(
+            business_id=test_business.id,
+            employee_id=test_employee.id,
+            service_id=test_service.id,
+            client_id=test_client_record.id,
+            start_time=start_time,
+            end_time=start_time + timedelta(minutes=45),
+            duration_minutes=45,
+            status="confirmed",
+            source="manual",
+            price=80.0,
+            final_price=80.0,
+        )
+        db_session.add(apt)
+        await db_session.flush()
+        appointment_ids.append(apt.id)
+    previous_no_shows = test_client_record.no_show_count or 0
+    await db_session.commit()
+
+    await _mark_no_shows(TestSessionLocal)
+
+    async with TestSessionLocal() as session:
+        client_record = await session.get(Client, test_client_record.id)
+        statuses = [(await session.get(Appointment, apt_id)).status for apt_id in appointment_ids]
+    assert statuses == ["no_show", "no_show"]
+    assert client_record.no_show_count == previous_no_shows + 2
@@ -73,6 +73,27 @@ async def test_login_wrong_password(client: AsyncClient):
     assert response.status_code == 401
 
 
+@pytest.mark.asyncio
+async def test_login_rehashes_outdated_cost(client: AsyncClient, db_session):
+    """Test that login upgrades a hash made with an older bcrypt cost."""
+    import bcrypt
+    from app.core.config import get_settings
+    from app.models.user import User
+
+    old_hash = bcrypt.hashpw(b"SecurePass123!", bcrypt.gensalt(rounds=4)).decode("utf-8")
+    user = User(email="rehash@test.ro", hashed_password=old_hash, full_name="Rehash Test")
+    db_session.add(user)
+    await db_session.flush()
+
+    response = await client.post("/api/v1/auth/login", json={
+        "email": "rehash@test.ro",
+        "password": "SecurePass123!",
+    })
+    assert response.status_code == 200
+    assert user.hashed_password != old_hash
+    assert int(user.hashed_password.split("$")[2]) == get_settings().PASSWORD_HASH_ROUNDS
+
+
 @pytest.mark.asyncio
 async def test_me_endpoint(client: AsyncClient, test_user):
     """Test /me endpoint with valid token."""
@@ -88,3 +109,106 @@ async def test_me_endpoint_no_auth(client: AsyncClient):
     """Test /me endpoint without token."""
     response = await client.get("/api/v1/auth/me")
     assert response.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_deactivated_user_evicted_from_principal_cache(client: AsyncClient, db_session, test_user):
+    """Test that deactivating a user invalidates the cached principal."""
+    response = await client.get("/api/v1/auth/me", headers=test_user["headers"])
+    assert response.status_code == 200
+
+    test_user["user"].is_active = False
+    await db_session.commit()
+
+    response = await client.get("/api/v1/auth/me", headers=test_user["headers"])
+    assert response.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_owned_business_cache_follows_updates(client: AsyncClient, test_user, test_business):
+    """Test that business reads see updates and other users are rejected."""
+    url = f"/api/v1/businesses/{test_business.id}"
+    response = await client.get(url, headers=test_user["headers"])
+    assert response.status_code == 200
+
+    response = await client.patch(url, headers=test_user["headers"], json={"name": "Salon Redenumit"})
+    assert response.status_code == 200
+
+    response = await client.get(url, headers=test_user["headers"])
+    assert response.json()["name"] == "Salon Redenumit"
+
+    await client.post("/api/v1/auth/register", json={
+        "email": "intruder@test.ro",
+        "password": "SecurePass123!",
+        "full_name": "Intruder",
+    })
+    login = await client.post("/api/v1/auth/login", json={
+        "email": "intruder@test.ro",
+        "password": "SecurePass123!",
+    })
+    intruder_headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+    response = await client.get(url, headers=intruder_headers)
+    assert response.status_code == 404
+    response = await client.get(f"{url}/dashboard/", headers=intruder_headers)
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_owned_business_created_elsewhere_is_found(client: AsyncClient, db_session, test_user, test_business):
+    """Test that a business missing from the cached principal is checked against the database."""
+    from sqlalchemy import insert
+    from app.models.business import Business
+
+    response = await client.get("/api/v1/auth/me", headers=test_user["headers"])
+    assert response.status_code == 200
+
+    # Core insert: no ORM events, like a business created by another worker
+    # process whose post-commit eviction never reaches this one
+    result = await db_session.execute(
+        insert(Business)
+        .values(owner_id=test_user["user"].id, name="Salon Nou", slug="salon-nou-altundeva")
+        .returning(Business.id)
+    )
+    business_id = result.scalar_one()
+    await db_session.commit()
+
+    response = await client.get(f"/api/v1/businesses/{business_id}", headers=test_user["headers"])
+    assert response.status_code == 200
+    assert response.json()["name"] == "Salon Nou"
+
+
+@pytest.mark.asyncio
+async def test_principal_fill_racing_deactivation(db_session, monkeypatch):
+    """Test that a principal read before a deactivation commits is not cached after its invalidation."""
+    from app.core import principal as principal_module
+    from app.core.cache import delete_keys, wait_for_pending_invalidations
+    from app.core.security import hash_password
+    from app.models.user import User
+    from tests.conftest import TestSessionLocal
+
+    user = User(email="race@test.ro", hashed_password=hash_password("SecurePass123!"), full_name="Race Test")
+    db_session.add(user)
+    await db_session.commit()
+    await delete_keys(principal_module.principal_key(user.id))
+
+    query_principal = principal_module._query_principal
+
+    async def query_then_deactivate(db, user_id):
+        snapshot = await query_principal(db, user_id)
+        # The deactivation commits (and invalidates) after this fill read the
+        # user but before it stores the snapshot
+        async with TestSessionLocal() as other_session:
+            other_user = await other_session.get(User, user_id)
+            other_user.is_active = False
+            await other_session.commit()
+        await wait_for_pending_invalidations()
+        return snapshot
+
+    monkeypatch.setattr(principal_module, "_query_principal", query_then_deactivate)
+    principal = await principal_module.load_principal(db_session, user.id)
+    assert principal.user.is_active
+    monkeypatch.undo()
+
+    async with TestSessionLocal() as fresh_session:
+        principal = await principal_module.load_principal(fresh_session, user.id)
+    assert not principal.user.is_active
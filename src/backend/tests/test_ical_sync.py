@@ -0,0 +1,418 @@
+"""Tests for the iCal sync service -- feed parsing and block import."""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+
+def _calendar(*events: str, prodid: str = "-//Test//Test//EN") -> str:
+    """Wrap VEVENT/VTIMEZONE blocks in a VCALENDAR, with CRLF line endings."""
+    lines = ["BEGIN:VCALENDAR", "VERSION:2.0", f"PRODID:{prodid}"]
+    for event in events:
+        lines.extend(event.strip().splitlines())
+    lines.append("END:VCALENDAR")
+    return "\r\n".join(lines) + "\r\n"
+
+
+def _stamp(moment: datetime) -> str:
+    return moment.strftime("%Y%m%dT%H%M%SZ")
+
+
+def test_parse_folded_summary():
+    """Test that a SUMMARY folded over several lines is unfolded."""
+    from app.services.ical_sync import parse_ical_events
+
+    start = datetime.now(timezone.utc).replace(microsecond=0) + timedelta(days=2)
+    feed = _calendar(f"""
+BEGIN:VEVENT
+UID:folded@test
+DTSTART:{_stamp(start)}
+DTEND:{_stamp(start + timedelta(hours=1))}
+SUMMARY:Rezervare pentru
+  Ioana Marinescu
+END:VEVENT
+""")
+
+    events = parse_ical_events(feed)
+
+    assert len(events) == 1
+    assert events[0]["summary"] == "Rezervare pentru Ioana Marinescu"
+    assert events[0]["start"] == start
+    assert events[0]["duration_minutes"] == 60
+
+
+def test_parse_quoted_tzid_with_colon():
+    """Test that a quoted TZID containing ':' resolves against its VTIMEZONE."""
+    from app.services.ical_sync import parse_ical_events
+
+    day = (datetime.now(timezone.utc) + timedelta(days=2)).strftime("%Y%m%d")
+    feed = _calendar("""
+BEGIN:VTIMEZONE
+TZID:(UTC+02:00) Bucharest
+BEGIN:STANDARD
+DTSTART:19700101T000000
+TZOFFSETFROM:+0200
+TZOFFSETTO:+0200
+END:STANDARD
+END:VTIMEZONE
+""", f"""
+BEGIN:VEVENT
+UID:tzid@test
+DTSTART;TZID="(UTC+02:00) Bucharest":{day}T100000
+DTEND;TZID="(UTC+02:00) Bucharest":{day}T113000
+SUMMARY:Programare
+END:VEVENT
+""")
+
+    events = parse_ical_events(feed)
+
+    assert len(events) == 1
+    assert events[0]["start"].strftime("%Y%m%dT%H%M") == f"{day}T0800"
+    assert events[0]["duration_minutes"] == 90
+
+
+def test_parse_drops_events_ended_before_cutoff():
+    """Test that events that ended before the retention cutoff are dropped."""
+    from app.services.ical_sync import parse_ical_events
+
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    old_start = now - timedelta(days=30)
+    new_start = now + timedelta(days=1)
+    feed = _calendar(f"""
+BEGIN:VEVENT
+UID:old@test
+DTSTART:{_stamp(old_start)}
+DTEND:{_stamp(old_start + timedelta(hours=1))}
+SUMMARY:Vechi
+END:VEVENT
+""", f"""
+BEGIN:VEVENT
+UID:new@test
+DTSTART:{_stamp(new_start)}
+DTEND:{_stamp(new_start + timedelta(hours=1))}
+SUMMARY:Nou
+END:VEVENT
+""")
+
+    assert [event["uid"] for event in parse_ical_events(feed, past_retention_days=7)] == ["new@test"]
+    assert len(parse_ical_events(feed, skip_past_events=False)) == 2
+
+
+def test_parse_truncated_feed_raises():
+    """Test that a feed cut off before END:VCALENDAR is rejected."""
+    from app.services.ical_sync import parse_ical_events
+
+    start = datetime.now(timezone.utc) + timedelta(days=1)
+    feed = _calendar(f"""
+BEGIN:VEVENT
+UID:truncated@test
+DTSTART:{_stamp(start)}
+DTEND:{_stamp(start + timedelta(hours=1))}
+END:VEVENT
+""")
+    truncated = feed[:feed.index("END:VCALENDAR")]
+
+    with pytest.raises(ValueError, match="END:VCALENDAR"):
+        parse_ical_events(truncated)
+
+
+def test_parse_feed_with_leading_bom():
+    """Test that a UTF-8 byte order mark before BEGIN:VCALENDAR is ignored."""
+    from app.services.ical_sync import parse_ical_events
+
+    start = datetime.now(timezone.utc) + timedelta(days=1)
+    feed = "\ufeff" + _calendar(f"""
+BEGIN:VEVENT
+UID:bom@test
+DTSTART:{_stamp(start)}
+DTEND:{_stamp(start + timedelta(hours=1))}
+SUMMARY:Cu BOM
+END:VEVENT
+""", prodid="-//Airbnb Inc//Hosting Calendar 1.0//EN")
+
+    events = parse_ical_events(feed)
+
+    assert [event["uid"] for event in events] == ["bom@test"]
+    assert events[0]["source_type"] == "airbnb"
+
+
+def test_recurring_series_without_end_stays_in_window():
+    """Test that an open-ended weekly RRULE is expanded only within the retention/horizon window."""
+    from app.services.ical_sync import parse_ical_events
+
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    first_start = (now - timedelta(days=60)).replace(hour=10, minute=0, second=0)
+    feed = _calendar(f"""
+BEGIN:VEVENT
+UID:weekly@test
+DTSTART:{_stamp(first_start)}
+DTEND:{_stamp(first_start + timedelta(hours=1))}
+RRULE:FREQ=WEEKLY
+SUMMARY:Saptamanal
+END:VEVENT
+""")
+
+    events = parse_ical_events(feed, past_retention_days=7, recurrence_horizon_days=30)
+
+    cutoff, horizon_end = now - timedelta(days=7), now + timedelta(days=30)
+    expected = []
+    occurrence = first_start
+    while occurrence < horizon_end:
+        if occurrence + timedelta(hours=1) > cutoff:
+            expected.append(occurrence)
+        occurrence += timedelta(weeks=1)
+    assert sorted(event["start"] for event in events) == expected
+    assert {event["uid"] for event in events} == {f"weekly@test#{_stamp(start)}" for start in expected}
+
+
+def test_recurring_series_skips_exdate():
+    """Test that an occurrence listed in EXDATE is not imported."""
+    from app.services.ical_sync import parse_ical_events
+
+    first_start = (datetime.now(timezone.utc) + timedelta(days=1)).replace(hour=10, minute=0, second=0, microsecond=0)
+    excluded = first_start + timedelta(weeks=1)
+    feed = _calendar(f"""
+BEGIN:VEVENT
+UID:exdate@test
+DTSTART:{_stamp(first_start)}
+DTEND:{_stamp(first_start + timedelta(hours=1))}
+RRULE:FREQ=WEEKLY;COUNT=3
+EXDATE:{_stamp(excluded)}
+SUMMARY:Cu exceptie
+END:VEVENT
+""")
+
+    events = parse_ical_events(feed)
+
+    assert sorted(event["start"] for event in events) == [first_start, first_start + timedelta(weeks=2)]
+    assert f"exdate@test#{_stamp(excluded)}" not in {event["uid"] for event in events}
+
+
+def test_recurring_series_moved_instance_keeps_uid():
+    """Test that a RECURRENCE-ID instance keeps its original-start UID with the moved times."""
+    from app.services.ical_sync import parse_ical_events
+
+    first_start = (datetime.now(timezone.utc) + timedelta(days=1)).replace(hour=10, minute=0, second=0, microsecond=0)
+    original = first_start + timedelta(weeks=1)
+    moved = original + timedelta(days=1, hours=4)
+    feed = _calendar(f"""
+BEGIN:VEVENT
+UID:moved@test
+DTSTART:{_stamp(first_start)}
+DTEND:{_stamp(first_start + timedelta(hours=1))}
+RRULE:FREQ=WEEKLY;COUNT=3
+SUMMARY:Serie
+END:VEVENT
+""", f"""
+BEGIN:VEVENT
+UID:moved@test
+RECURRENCE-ID:{_stamp(original)}
+DTSTART:{_stamp(moved)}
+DTEND:{_stamp(moved + timedelta(hours=2))}
+SUMMARY:Serie (mutat)
+END:VEVENT
+""")
+
+    events = {event["uid"]: event for event in parse_ical_events(feed)}
+
+    assert len(events) == 3
+    moved_event = events[f"moved@test#{_stamp(original)}"]
+    assert moved_event["start"] == moved
+    assert moved_event["end"] == moved + timedelta(hours=2)
+    assert moved_event["summary"] == "Serie (mutat)"
+
+
+@pytest.mark.asyncio
+async def test_apply_feed_events_diffs_against_existing_blocks(db_session, test_business, test_employee):
+    """Test that re-syncing a feed only writes the blocks that changed."""
+    from sqlalchemy import select
+    from app.models.appointment import Appointment
+    from app.models.ical_source import ICalSource
+    from app.services.ical_sync import _apply_feed_events, parse_ical_events
+
+    source = ICalSource(
+        business_id=test_business.id,
+        employee_id=test_employee.id,
+        name="Airbnb Apartament",
+        source_type="airbnb",
+        ical_url="https://www.airbnb.com/calendar/ical/1.ics",
+    )
+    db_session.add(source)
+    await db_session.flush()
+
+    start = datetime.now(timezone.utc).replace(microsecond=0) + timedelta(days=3)
+
+    def event(uid: str, event_start: datetime) -> str:
+        return f"""
+BEGIN:VEVENT
+UID:{uid}
+DTSTART:{_stamp(event_start)}
+DTEND:{_stamp(event_start + timedelta(hours=2))}
+SUMMARY:Reserved
+END:VEVENT
+"""
+
+    async def sync(feed: str) -> dict:
+        sync_result = {"created": 0, "updated": 0, "deleted": 0, "errors": [], "total_events": 0}
+        await _apply_feed_events(db_session, source, parse_ical_events(feed), sync_result)
+        await db_session.commit()
+        return sync_result
+
+    async def block_starts() -> dict:
+        result = await db_session.execute(
+            select(Appointment.ical_uid, Appointment.start_time).where(Appointment.ical_source_id == source.id)
+        )
+        return dict(result.all())
+
+    feed = _calendar(event("a@test", start), event("b@test", start + timedelta(days=1)))
+    result = await sync(feed)
+    assert (result["created"], result["updated"], result["deleted"]) == (2, 0, 0)
+
+    result = await sync(feed)
+    assert (result["created"], result["updated"], result["deleted"]) == (0, 0, 0)
+    assert result["total_events"] == 2
+
+    moved_start = start + timedelta(hours=4)
+    result = await sync(_calendar(event("a@test", moved_start)))
+    assert (result["created"], result["updated"], result["deleted"]) == (0, 1, 1)
+    assert await block_starts() == {"a@test": moved_start}
+
+    result = await sync(_calendar())
+    assert (result["created"], result["updated"], result["deleted"]) == (0, 0, 1)
+    assert await block_starts() == {}
+
+
+@pytest.mark.asyncio
+async def test_apply_feed_upserts_in_chunks(db_session, monkeypatch, test_business, test_employee):
+    """Test that a feed spanning several upsert chunks is applied whole, and rolled back if truncated."""
+    import io
+    from sqlalchemy import select
+    from app.models.appointment import Appointment
+    from app.models.ical_source import ICalSource
+    from app.services import ical_sync
+
+    monkeypatch.setattr(ical_sync, "ICAL_UPSERT_CHUNK_SIZE", 2)
+    source = ICalSource(
+        business_id=test_business.id,
+        employee_id=test_employee.id,
+        name="Calendar mare",
+        source_type="other",
+        ical_url="https://calendar.test/large.ics",
+    )
+    db_session.add(source)
+    await db_session.flush()
+
+    start = datetime.now(timezone.utc).replace(microsecond=0) + timedelta(days=4)
+
+    def event(uid: str, event_start: datetime) -> str:
+        return f"""
+BEGIN:VEVENT
+UID:{uid}
+DTSTART:{_stamp(event_start)}
+DTEND:{_stamp(event_start + timedelta(hours=1))}
+SUMMARY:Reserved
+END:VEVENT
+"""
+
+    async def apply(feed_text: str) -> dict:
+        feed = ical_sync.ICalFeed(body=io.BytesIO(feed_text.encode()), content_hash=str(len(feed_text)))
+        result = await ical_sync._apply_source_feed(db_session, source, feed, datetime.now(timezone.utc))
+        await db_session.commit()
+        return result
+
+    async def block_starts() -> dict:
+        result = await db_session.execute(
+            select(Appointment.ical_uid, Appointment.start_time).where(Appointment.ical_source_id == source.id)
+        )
+        return dict(result.all())
+
+    # "a" comes back in the third chunk: the last occurrence wins and is not an update
+    feed_text = _calendar(*(
+        event(uid, start + timedelta(days=offset))
+        for offset, uid in enumerate(["a", "b", "c", "d", "a"])
+    ))
+    result = await apply(feed_text)
+    assert (result["created"], result["updated"], result["deleted"]) == (4, 0, 0)
+    assert result["total_events"] == 5
+    expected = {uid: start + timedelta(days=offset) for offset, uid in enumerate(["b", "c", "d", "a"], start=1)}
+    assert await block_starts() == expected
+
+    # Written chunks are undone when the rest of the feed is invalid
+    moved = _calendar(*(event(uid, start - timedelta(hours=2)) for uid in ["a", "b", "c"]))
+    result = await apply(moved[:moved.index("END:VCALENDAR")])
+    assert result["errors"] and result["created"] == result["updated"] == 0
+    assert await block_starts() == expected
+
+
+@pytest.mark.asyncio
+async def test_sync_due_sources_isolates_failures(db_session, monkeypatch, test_business, test_employee):
+    """Test that only due sources are synced and a failing fetch does not roll back the others."""
+    import io
+    from sqlalchemy import select
+    from app.models.appointment import Appointment
+    from app.models.ical_source import ICalSource
+    from app.services import ical_sync
+    from tests.conftest import TestSessionLocal
+
+    now = datetime.now(timezone.utc)
+    start = now.replace(microsecond=0) + timedelta(days=2)
+    feed_text = _calendar(f"""
+BEGIN:VEVENT
+UID:due@test
+DTSTART:{_stamp(start)}
+DTEND:{_stamp(start + timedelta(hours=1))}
+SUMMARY:Reserved
+END:VEVENT
+""")
+
+    def make_source(name: str, last_synced_at: datetime | None) -> ICalSource:
+        return ICalSource(
+            business_id=test_business.id,
+            employee_id=test_employee.id,
+            name=name,
+            source_type="other",
+            ical_url=f"https://calendar.test/{name}.ics",
+            sync_interval_minutes=15,
+            last_synced_at=last_synced_at,
+        )
+
+    due = make_source("due", None)
+    not_due = make_source("not-due", now - timedelta(minutes=1))
+    failing = make_source("failing", now - timedelta(hours=1))
+    db_session.add_all([due, not_due, failing])
+    await db_session.commit()
+
+    fetched_urls = []
+
+    async def fake_fetch(url, etag=None, last_modified=None):
+        fetched_urls.append(url)
+        if url == failing.ical_url:
+            raise RuntimeError("conexiune intrerupta")
+        return ical_sync.ICalFeed(body=io.BytesIO(feed_text.encode()), content_hash="hash")
+
+    monkeypatch.setattr(ical_sync, "fetch_ical_feed", fake_fetch)
+    summary = await ical_sync.sync_due_sources(TestSessionLocal)
+
+    assert not_due.ical_url not in fetched_urls
+    assert not_due.id not in summary["results"]
+    assert summary["results"][due.id]["created"] == 1
+    assert "conexiune intrerupta" in summary["results"][failing.id]["error"]
+
+    async with TestSessionLocal() as session:
+        sources = {
+            source.id: source
+            for source in (
+                await session.execute(
+                    select(ICalSource).where(ICalSource.id.in_([due.id, not_due.id, failing.id]))
+                )
+            ).scalars()
+        }
+        blocks = (
+            await session.execute(select(Appointment.ical_uid).where(Appointment.ical_source_id == due.id))
+        ).scalars().all()
+    assert blocks == ["due@test"]
+    assert sources[due.id].events_count == 1
+    assert sources[due.id].last_sync_error is None
+    assert "conexiune intrerupta" in sources[failing.id].last_sync_error
+    assert sources[failing.id].last_synced_at > now
+    assert sources[not_due.id].last_synced_at == not_due.last_synced_at
@@ -91,6 +91,33 @@ async def test_public_book(client: AsyncClient, test_business, test_service, tes
     assert data["status"] in ["confirmed", "pending"]
 
 
+@pytest.mark.asyncio
+async def test_public_book_overlapping_slot_rejected(client: AsyncClient, test_business, test_service, test_employee):
+    """Test that the exclusion constraint rejects a second booking overlapping the first."""
+    tomorrow = datetime.now(timezone.utc) + timedelta(days=1)
+    start_time = tomorrow.replace(hour=13, minute=0, second=0, microsecond=0)
+
+    booking = {
+        "service_id": test_service.id,
+        "employee_id": test_employee.id,
+        "start_time": start_time.isoformat(),
+        "client_name": "First Client",
+        "client_phone": "+40723555444",
+        "gdpr_consent": True,
+    }
+    first = await client.post(f"/api/v1/book/{test_business.slug}/book", json=booking)
+    assert first.status_code == 201
+
+    overlapping = {
+        **booking,
+        "start_time": (start_time + timedelta(minutes=30)).isoformat(),
+        "client_name": "Second Client",
+        "client_phone": "+40723555333",
+    }
+    second = await client.post(f"/api/v1/book/{test_business.slug}/book", json=overlapping)
+    assert second.status_code == 409
+
+
 @pytest.mark.asyncio
 async def test_public_book_without_gdpr(client: AsyncClient, test_business, test_service, test_employee):
     """Test that booking without GDPR consent fails."""
@@ -109,3 +136,86 @@ async def test_public_book_without_gdpr(client: AsyncClient, test_business, test
         },
     )
     assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_public_team_availability(client: AsyncClient, test_business, test_service, test_employee):
+    """Test multi-employee, multi-day availability in a single request."""
+    tomorrow = datetime.now(timezone.utc) + timedelta(days=1)
+
+    response = await client.get(
+        f"/api/v1/book/{test_business.slug}/availability/team",
+        params={
+            "service_id": test_service.id,
+            "date": tomorrow.strftime("%Y-%m-%d"),
+            "days": 14,
+        },
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["date_to"] == (tomorrow + timedelta(days=13)).strftime("%Y-%m-%d")
+    employee_ids = [emp["employee_id"] for emp in data["employees"]]
+    assert test_employee.id in employee_ids
+    assert data["first_available"] is not None
+
+
+@pytest.mark.asyncio
+async def test_public_bootstrap_etag(client: AsyncClient, test_user, test_business, test_service, test_employee):
+    """Bootstrap bundles profile, services and team; If-None-Match gets a 304 until the catalogue changes."""
+    url = f"/api/v1/book/{test_business.slug}/bootstrap"
+    response = await client.get(url)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["business"]["slug"] == "test-salon"
+    assert [svc["name"] for svc in data["services"]] == ["Tuns dama"]
+    assert data["employees"][0]["display_name"] == "Ana P."
+    etag = response.headers["etag"]
+
+    response = await client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+    response = await client.patch(
+        f"/api/v1/businesses/{test_business.id}/services/{test_service.id}",
+        json={"name": "Tuns si coafat"},
+        headers=test_user["headers"],
+    )
+    assert response.status_code == 200
+
+    response = await client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert response.json()["services"][0]["name"] == "Tuns si coafat"
+
+
+@pytest.mark.asyncio
+async def test_conditional_get_services(client: AsyncClient, test_user, test_business, test_service):
+    """Catalogue endpoints answer 304 on a matching ETag and a fresh body after an update."""
+    # A 304 rolls the shared session back, expiring the fixture rows
+    service_url = f"/api/v1/businesses/{test_business.id}/services/{test_service.id}"
+    private_url = f"/api/v1/businesses/{test_business.id}/services/"
+    public_url = f"/api/v1/book/{test_business.slug}/services"
+
+    private = await client.get(private_url, headers=test_user["headers"])
+    public = await client.get(public_url)
+    assert private.status_code == public.status_code == 200
+    assert private.headers["cache-control"] == "private, no-cache"
+    assert public.headers["cache-control"].startswith("public")
+
+    response = await client.get(
+        private_url, headers={**test_user["headers"], "If-None-Match": private.headers["etag"]}
+    )
+    assert response.status_code == 304
+    assert response.content == b""
+    response = await client.get(public_url, headers={"If-None-Match": public.headers["etag"]})
+    assert response.status_code == 304
+
+    response = await client.patch(
+        service_url,
+        json={"price": 90.0},
+        headers=test_user["headers"],
+    )
+    assert response.status_code == 200
+
+    response = await client.get(public_url, headers={"If-None-Match": public.headers["etag"]})
+    assert response.status_code == 200
+    assert response.json()[0]["price"] == 90.0
@@ -0,0 +1,38 @@
+"""Tests for the Celery worker's long-lived event loop."""
+
+
+def test_run_async_reuses_loop_and_clients():
+    """Test that consecutive tasks run on the same loop and share its pooled clients."""
+    import asyncio
+    from app.core.cache import get_redis
+    from app.core.http import get_http_client
+    from app.tasks.worker_loop import run_async, stop_loop
+
+    async def task_context():
+        return asyncio.get_running_loop(), get_http_client(), get_redis()
+
+    try:
+        first_loop, first_http, first_redis = run_async(task_context())
+        second_loop, second_http, second_redis = run_async(task_context())
+        assert first_loop is second_loop
+        assert not first_loop.is_closed()
+        assert first_http is second_http
+        assert not first_http.is_closed
+        assert first_redis is second_redis
+    finally:
+        stop_loop()
+
+    assert first_http.is_closed
+    assert first_loop.is_closed()
+
+
+def test_worker_loop_opens_http_clients_on_start():
+    """Test that the worker loop has its shared HTTP client before the first task runs."""
+    from app.core.http import _clients
+    from app.tasks.worker_loop import _start_loop, stop_loop
+
+    try:
+        loop = _start_loop()
+        assert not _clients[loop][""].is_closed
+    finally:
+        stop_loop()